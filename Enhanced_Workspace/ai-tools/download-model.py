@@ -3,10 +3,33 @@
 Download Stable Diffusion models from Hugging Face
 """
 
+import importlib.util
 import os
 import sys
 from pathlib import Path
-from huggingface_hub import hf_hub_download, snapshot_download
+
+# Use the parallel Rust downloader when it is installed (pip install hf_transfer).
+# Must be set before huggingface_hub is imported.
+if importlib.util.find_spec("hf_transfer") is not None:
+    os.environ.setdefault("HF_HUB_ENABLE_HF_TRANSFER", "1")
+
+from huggingface_hub import list_repo_files, snapshot_download
+
+# Files needed to load a model (configs, tokenizer files); weights are added per repo below
+BASE_PATTERNS = ["*.json", "*.txt", "*.model"]
+
+# Weights used when a repo has no .safetensors files
+LEGACY_WEIGHT_PATTERNS = ["*.ckpt", "*.bin"]
+
+def weight_patterns(model_name: str):
+    """Prefer .safetensors weights, only falling back to .ckpt/.bin when a repo has none"""
+    try:
+        files = list_repo_files(model_name)
+    except Exception:
+        return ["*.safetensors"] + LEGACY_WEIGHT_PATTERNS
+    if any(f.endswith(".safetensors") for f in files):
+        return ["*.safetensors"]
+    return LEGACY_WEIGHT_PATTERNS
 
 def download_sd_model(model_name: str, output_dir: str):
     """Download a Stable Diffusion model"""
@@ -18,13 +41,20 @@ def download_sd_model(model_name: str, output_dir: str):
     try:
         # Download the main model file (usually .safetensors or .ckpt)
         # Try to find the model file
+        weights = weight_patterns(model_name)
         repo_files = snapshot_download(
             repo_id=model_name,
             local_dir=output_dir,
             local_dir_use_symlinks=False,
-            resume_download=True
+            resume_download=True,
+            allow_patterns=BASE_PATTERNS + weights,
+            max_workers=8
         )
         
+        if not any(any(Path(output_dir).rglob(pattern)) for pattern in weights):
+            print(f"[ERROR] No weight files ({', '.join(weights)}) found for {model_name}")
+            return False
+        
         print(f"[OK] Successfully downloaded {model_name}")
         return True
     except Exception as e:
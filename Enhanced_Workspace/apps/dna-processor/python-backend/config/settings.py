@@ -18,16 +18,16 @@ LOGS_DIR.mkdir(exist_ok=True)
 
 # ClinVar configuration
 CLINVAR_URL = "https://ftp.ncbi.nlm.nih.gov/pub/clinvar/tab_delimited/variant_summary.txt.gz"
-CLINVAR_CACHE_FILE = CACHE_DIR / "clinvar_cache.json"
+CLINVAR_CACHE_FILE = CACHE_DIR / "clinvar_cache.arrow"
 
 # SNPedia configuration
 SNPEDIA_BASE_URL = "https://www.snpedia.com/index.php/"
 SNPEDIA_CACHE_DIR = CACHE_DIR / "snpedia"
 SNPEDIA_CACHE_DIR.mkdir(exist_ok=True)
 SNPEDIA_CHECKPOINT_FILE = CACHE_DIR / "snpedia_checkpoint.json"
-SNPEDIA_CONCURRENCY_LIMIT = 3  # Reduced to be more respectful
+SNPEDIA_CONCURRENCY_LIMIT = 16  # In-flight requests; request rate is capped separately
 SNPEDIA_MAX_RETRIES = 2  # Reduced retries for 403s (they won't succeed on retry)
-SNPEDIA_DELAY_BETWEEN_REQUESTS = 0.5  # Seconds between requests
+SNPEDIA_MAX_REQUESTS_PER_SECOND = 10.0  # Global request rate across all workers
 
 # 1000 Genomes configuration
 KG1_VCF_URL = "http://ftp.1000genomes.ebi.ac.uk/vol1/ftp/release/20130502/ALL.chr{chrom}.phase3_shapeit2_mvncall_integrated_v5a.20130502.genotypes.vcf.gz"
@@ -44,6 +44,8 @@ AI_PROVIDER = "openai"  # "openai", "anthropic", or "local"
 AI_API_KEY: Optional[str] = None
 AI_MODEL = "gpt-4"
 AI_MAX_TOKENS = 4000
+AI_MAX_CONCURRENT_REQUESTS = 8  # Summary chunks requested in parallel
+AI_SUMMARY_CACHE_FILE = CACHE_DIR / "ai_summaries.db"  # Summaries keyed by model + annotation hash
 ANTHROPIC_API_KEY: Optional[str] = None
 ANTHROPIC_MODEL = "claude-3-opus-20240229"
 
@@ -10,14 +10,88 @@ Invariants:
 - Empty result must not crash downstream
 """
 
+import csv
+import hashlib
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
 from pathlib import Path
-from typing import List, Optional, Dict
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Arrow-backed string dtype used for the text columns of the canonical table
+ARROW_STRING = pd.ArrowDtype(pa.string())
+
+# Substrings identifying each canonical column, in priority order
+COLUMN_PATTERNS = {
+    'rsid': ('rsid', 'rs_id', 'rs#', 'snp', 'variant'),
+    'chrom': ('chrom', 'chromosome', 'chr', 'contig'),
+    'pos': ('pos', 'position', 'start', 'location', 'bp'),
+    'genotype': ('genotype', 'genotypes', 'call', 'allele', 'alleles'),
+}
+
+# Exact column name -> (canonical column, rank of best matching pattern)
+_CANON_MAP = {
+    pattern: (canonical, next(i for i, p in enumerate(patterns) if p in pattern))
+    for canonical, patterns in COLUMN_PATTERNS.items()
+    for pattern in patterns
+}
+
+# Bytes of data (after the header) inspected when sniffing the delimiter
+SNIFF_BYTES = 4096
+
+# Files larger than this are parsed as a stream of record batches
+LARGE_FILE_BYTES = 50 * 1024 * 1024
+
+# Bytes of CSV text handed to each Arrow parse block
+CSV_BLOCK_SIZE = 16 << 20
+
+# Cells treated as a missing position (parsed to 0)
+POSITION_NULL_VALUES = ['', 'NA', '-', '--']
+
+# RSID pattern: starts with 'rs' (case-insensitive) followed by digits.
+# Evaluated by Arrow's RE2 engine, so it must stay RE2-compatible.
+RSID_REGEX = r'^rs\d+$'
+
+
+def _as_arrow_strings(values: pd.Series):
+    """Return a Series as Arrow strings, zero-copy when already Arrow-backed."""
+    if values.dtype == ARROW_STRING:
+        return values.array.__arrow_array__()
+    return pa.array(values.to_numpy(dtype=object), type=pa.string(), from_pandas=True)
+
+
+def _clean_text(values: pd.Series, upper: bool = False) -> pd.Series:
+    """
+    Trim (and optionally upper-case) a text column with Arrow UTF-8 kernels.
+
+    Missing values become empty strings. The result keeps the source index
+    and is stored as an Arrow-backed string column.
+    """
+    arr = _as_arrow_strings(values)
+    arr = pc.utf8_trim_whitespace(arr)
+    if upper:
+        arr = pc.ascii_upper(arr)
+    arr = pc.fill_null(arr, "")
+    return pd.Series(arr, index=values.index, dtype=ARROW_STRING)
+
+
+def _to_positions(values: pd.Series) -> np.ndarray:
+    """Convert a position column to int64, with 0 for missing/invalid cells."""
+    if pd.api.types.is_integer_dtype(values.dtype):
+        return values.fillna(0).to_numpy(dtype=np.int64)
+    numeric = pd.to_numeric(values, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    return np.nan_to_num(numeric, nan=0.0).astype(np.int64, copy=False)
+
 
 class InputNormalizer:
     """
@@ -31,91 +105,249 @@ class InputNormalizer:
     
     REQUIRED_COLUMNS = ["rsid", "chrom", "pos", "genotype"]
     
-    def __init__(self):
-        # RSID pattern: starts with 'rs' (case-insensitive) followed by digits
-        self.rsid_pattern = re.compile(r'^rs\d+$', re.IGNORECASE)
+    def __init__(self, cache_dir: Optional[Path] = None):
+        """
+        Initialize normalizer.
+        
+        Args:
+            cache_dir: Directory for normalized Parquet snapshots of input
+                files (None disables caching)
+        """
+        self.rsid_pattern = re.compile(RSID_REGEX, re.IGNORECASE)
+        self.cache_dir = cache_dir
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
     
-    def normalize_file(self, file_path: Path) -> pd.DataFrame:
+    def normalize_file(self, file_path: Path, deduplicate: bool = True) -> pd.DataFrame:
         """
         Normalize a single DNA file to canonical format.
         
+        With a cache directory configured, the result is stored as Parquet
+        keyed by the file's path, mtime and size, so unchanged inputs are
+        not re-parsed on later runs.
+        
         Args:
             file_path: Path to input file (typically .txt)
+            deduplicate: Collapse duplicate RSIDs (disable when the caller
+                deduplicates a combined table itself)
             
         Returns:
             DataFrame with columns [rsid, chrom, pos, genotype]
             Empty DataFrame if file is invalid or empty
         """
+        cache_path = self._cache_path(file_path, deduplicate)
+        if cache_path is not None and cache_path.exists():
+            try:
+                table = pq.read_table(cache_path, memory_map=True)
+                return table.to_pandas(types_mapper={pa.string(): ARROW_STRING}.get)
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable normalized cache {cache_path}: {e}")
+        
+        df = self._parse_file(file_path, deduplicate)
+        
+        if cache_path is not None and not df.empty:
+            self._write_cache(df, cache_path)
+        
+        return df
+    
+    def _cache_path(self, file_path: Path, deduplicate: bool) -> Optional[Path]:
+        """Cache location for a file's normalized table, or None if disabled."""
+        if self.cache_dir is None:
+            return None
         try:
-            # Read file, skipping comment lines
-            with open(file_path, 'r', encoding='utf-8') as f:
-                lines = []
-                for line in f:
-                    line = line.strip()
-                    # Skip empty lines and comments
-                    if line and not line.startswith('#'):
-                        lines.append(line)
-            
-            if not lines:
+            stat = file_path.stat()
+        except OSError:
+            return None
+        key = f"{file_path.resolve()}:{stat.st_mtime_ns}:{stat.st_size}:{int(deduplicate)}"
+        return self.cache_dir / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.parquet"
+    
+    def _write_cache(self, df: pd.DataFrame, cache_path: Path) -> None:
+        """Write a normalized table to the cache (atomic: temp file, then rename)."""
+        temp_path = cache_path.with_suffix('.tmp')
+        try:
+            pq.write_table(_to_table(df), temp_path)
+            temp_path.replace(cache_path)
+        except Exception as e:
+            logger.warning(f"Could not write normalized cache {cache_path}: {e}")
+            temp_path.unlink(missing_ok=True)
+    
+    def _parse_file(self, file_path: Path, deduplicate: bool) -> pd.DataFrame:
+        """Parse and normalize a file (see normalize_file)."""
+        try:
+            layout = self._sniff_layout(file_path)
+            if layout is None:
                 logger.warning(f"File {file_path} contains no data")
                 return self._empty_dataframe()
             
-            # Try to parse as TSV first (common for 23andMe)
-            df = pd.read_csv(
-                file_path,
-                sep='\t',
-                comment='#',
-                header=0,
-                dtype=str,
-                on_bad_lines='skip'
-            )
+            skip_rows, delimiter, columns = layout
+            column_types = {col: pa.string() for col in columns}
             
-            # If TSV failed or wrong shape, try CSV
-            if df.empty or len(df.columns) < 3:
-                df = pd.read_csv(
-                    file_path,
-                    sep=',',
-                    comment='#',
-                    header=0,
-                    dtype=str,
-                    on_bad_lines='skip'
-                )
+            # Type the position column as int64 while tokenizing
+            pos_col = self._detect_column_mapping(
+                pd.Index([col.strip().lower() for col in columns])
+            ).get('pos')
+            if pos_col is not None:
+                pos_source = columns[[col.strip().lower() for col in columns].index(pos_col)]
+                column_types[pos_source] = pa.int64()
             
-            return self._normalize_dataframe(df, file_path.name)
+            try:
+                frames = [
+                    self._normalize_dataframe(df, file_path.name, deduplicate)
+                    for df in self._read_frames(file_path, skip_rows, delimiter, column_types)
+                ]
+            except pa.ArrowInvalid:
+                # Non-integer positions: read as text and coerce afterwards
+                column_types = {col: pa.string() for col in columns}
+                frames = [
+                    self._normalize_dataframe(df, file_path.name, deduplicate)
+                    for df in self._read_frames(file_path, skip_rows, delimiter, column_types)
+                ]
+            
+            if len(frames) == 1:
+                return frames[0]
+            return self._combine_frames(frames, deduplicate)
             
         except Exception as e:
             logger.error(f"Error processing file {file_path}: {e}")
             return self._empty_dataframe()
     
-    def normalize_folder(self, folder_path: Path, pattern: str = "*.txt") -> pd.DataFrame:
+    def _read_frames(
+        self, file_path: Path, skip_rows: int, delimiter: str, column_types: Dict[str, pa.DataType]
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Parse a delimited file with Arrow's multithreaded reader.
+        
+        Small files are read in one go. Files above LARGE_FILE_BYTES are
+        streamed in record batches so only one block of raw text columns is
+        alive at a time. Malformed rows are dropped instead of failing the
+        whole file.
+        """
+        read_options = pacsv.ReadOptions(skip_rows=skip_rows, block_size=CSV_BLOCK_SIZE)
+        parse_options = pacsv.ParseOptions(
+            delimiter=delimiter,
+            invalid_row_handler=lambda row: 'skip'
+        )
+        convert_options = pacsv.ConvertOptions(
+            column_types=column_types,
+            null_values=POSITION_NULL_VALUES
+        )
+        
+        if file_path.stat().st_size <= LARGE_FILE_BYTES:
+            table = pacsv.read_csv(
+                file_path,
+                read_options=read_options,
+                parse_options=parse_options,
+                convert_options=convert_options
+            )
+            yield table.to_pandas(types_mapper=pd.ArrowDtype)
+            return
+        
+        with pacsv.open_csv(
+            file_path,
+            read_options=read_options,
+            parse_options=parse_options,
+            convert_options=convert_options
+        ) as reader:
+            for batch in reader:
+                yield batch.to_pandas(types_mapper=pd.ArrowDtype)
+    
+    def _sniff_layout(self, file_path: Path) -> Optional[Tuple[int, str, List[str]]]:
+        """
+        Inspect the head of a file to find where the table starts.
+        
+        Returns:
+            (number of leading comment/blank lines, delimiter, header columns),
+            or None if the file has no data lines
+        """
+        with open(file_path, 'r', encoding='utf-8') as f:
+            skip_rows = 0
+            for line in f:
+                if line.strip() and not line.startswith('#'):
+                    header = line
+                    break
+                skip_rows += 1
+            else:
+                return None
+            
+            sample = header + f.read(SNIFF_BYTES)
+        
+        try:
+            delimiter = csv.Sniffer().sniff(sample, delimiters='\t,;').delimiter
+        except csv.Error:
+            delimiter = '\t' if '\t' in header else ','
+        
+        columns = [col.strip('\r\n') for col in header.split(delimiter)]
+        return skip_rows, delimiter, columns
+    
+    def normalize_folder(
+        self, folder_path: Path, pattern: str = "*.txt", max_workers: Optional[int] = None
+    ) -> pd.DataFrame:
         """
         Normalize all matching files in a folder and combine them.
         
+        Files are parsed in parallel worker processes when there is more
+        than one; results come back as Arrow IPC buffers.
+        
         Args:
             folder_path: Path to folder containing DNA files
             pattern: File pattern to match (default: *.txt)
+            max_workers: Worker processes (default: CPU count; 1 disables
+                the process pool)
             
         Returns:
             Combined DataFrame with all variants, deduplicated
         """
-        all_dfs: List[pd.DataFrame] = []
-        
-        for file_path in folder_path.glob(pattern):
-            if file_path.is_file():
-                df = self.normalize_file(file_path)
-                if not df.empty:
-                    all_dfs.append(df)
-                    logger.info(f"Processed {file_path.name}: {len(df)} variants")
+        files = [file_path for file_path in folder_path.glob(pattern) if file_path.is_file()]
+        workers = min(len(files), max_workers or os.cpu_count() or 1)
+        
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = zip(files, (
+                    pa.ipc.open_stream(pa.py_buffer(payload)).read_all()
+                    for payload in pool.map(
+                        partial(_normalize_file_to_ipc, cache_dir=self.cache_dir), files
+                    )
+                ))
+                tables = self._collect_tables(results)
+        else:
+            results = (
+                (file_path, _to_table(self.normalize_file(file_path, deduplicate=False)))
+                for file_path in files
+            )
+            tables = self._collect_tables(results)
         
-        if not all_dfs:
+        if not tables:
             logger.warning(f"No valid files found in {folder_path}")
             return self._empty_dataframe()
         
-        # Combine and deduplicate
-        combined = pd.concat(all_dfs, ignore_index=True)
-        return self._deduplicate(combined)
+        return self._combine_tables(tables, deduplicate=True)
+    
+    def _collect_tables(self, results: Iterable[Tuple[Path, pa.Table]]) -> List[pa.Table]:
+        """Keep non-empty per-file tables, logging each file's variant count."""
+        tables = []
+        for file_path, table in results:
+            if table.num_rows:
+                tables.append(table)
+                logger.info(f"Processed {file_path.name}: {table.num_rows} variants")
+        return tables
     
-    def _normalize_dataframe(self, df: pd.DataFrame, source_name: str) -> pd.DataFrame:
+    def _combine_frames(self, frames: List[pd.DataFrame], deduplicate: bool) -> pd.DataFrame:
+        """Concatenate normalized frames as Arrow, optionally deduplicating once."""
+        tables = [_to_table(df) for df in frames if not df.empty]
+        if not tables:
+            return self._empty_dataframe()
+        return self._combine_tables(tables, deduplicate)
+    
+    def _combine_tables(self, tables: List[pa.Table], deduplicate: bool) -> pd.DataFrame:
+        """Concatenate normalized Arrow tables, optionally deduplicating once."""
+        combined = pa.concat_tables(tables, promote_options="permissive")
+        if deduplicate:
+            combined = self._deduplicate_table(combined)
+        return combined.to_pandas(types_mapper={pa.string(): ARROW_STRING}.get)
+    
+    def _normalize_dataframe(
+        self, df: pd.DataFrame, source_name: str, deduplicate: bool = True
+    ) -> pd.DataFrame:
         """
         Normalize raw DataFrame to canonical format.
         
@@ -136,7 +368,7 @@ class InputNormalizer:
         # Extract rsid
         rsid_col = column_mapping.get('rsid')
         if rsid_col and rsid_col in df.columns:
-            normalized['rsid'] = df[rsid_col].astype(str).str.strip()
+            normalized['rsid'] = _clean_text(df[rsid_col])
         else:
             logger.warning(f"Could not find rsid column in {source_name}")
             return self._empty_dataframe()
@@ -144,7 +376,7 @@ class InputNormalizer:
         # Extract chromosome
         chrom_col = column_mapping.get('chrom')
         if chrom_col and chrom_col in df.columns:
-            normalized['chrom'] = df[chrom_col].astype(str).str.strip()
+            normalized['chrom'] = _clean_text(df[chrom_col])
         else:
             # Try to infer from rsid if available
             normalized['chrom'] = ''
@@ -152,19 +384,19 @@ class InputNormalizer:
         # Extract position
         pos_col = column_mapping.get('pos')
         if pos_col and pos_col in df.columns:
-            normalized['pos'] = pd.to_numeric(df[pos_col], errors='coerce').fillna(0).astype(int)
+            normalized['pos'] = _to_positions(df[pos_col])
         else:
             normalized['pos'] = 0
         
         # Extract genotype
         genotype_col = column_mapping.get('genotype')
         if genotype_col and genotype_col in df.columns:
-            normalized['genotype'] = df[genotype_col].astype(str).str.strip().str.upper()
+            normalized['genotype'] = _clean_text(df[genotype_col], upper=True)
         else:
             # Try to find any remaining column that might be genotype
             remaining_cols = [c for c in df.columns if c not in column_mapping.values()]
             if remaining_cols:
-                normalized['genotype'] = df[remaining_cols[0]].astype(str).str.strip().str.upper()
+                normalized['genotype'] = _clean_text(df[remaining_cols[0]], upper=True)
             else:
                 normalized['genotype'] = ''
         
@@ -172,52 +404,34 @@ class InputNormalizer:
         normalized = self._validate_and_filter(normalized)
         
         # Deduplicate
-        normalized = self._deduplicate(normalized)
+        if deduplicate:
+            normalized = self._deduplicate(normalized)
         
         return normalized
     
     def _detect_column_mapping(self, columns: pd.Index) -> Dict[str, str]:
         """Detect mapping from source columns to canonical columns."""
         mapping = {}
+        ranks: Dict[str, int] = {}
         
-        # RSID variations
-        rsid_patterns = ['rsid', 'rs_id', 'rs#', 'snp', 'variant']
-        for pattern in rsid_patterns:
-            for col in columns:
-                if pattern in col:
-                    mapping['rsid'] = col
-                    break
-            if 'rsid' in mapping:
-                break
-        
-        # Chromosome variations
-        chrom_patterns = ['chrom', 'chromosome', 'chr', 'contig']
-        for pattern in chrom_patterns:
-            for col in columns:
-                if pattern in col:
-                    mapping['chrom'] = col
-                    break
-            if 'chrom' in mapping:
-                break
-        
-        # Position variations
-        pos_patterns = ['pos', 'position', 'start', 'location', 'bp']
-        for pattern in pos_patterns:
-            for col in columns:
-                if pattern in col:
-                    mapping['pos'] = col
-                    break
-            if 'pos' in mapping:
-                break
-        
-        # Genotype variations
-        genotype_patterns = ['genotype', 'genotypes', 'call', 'allele', 'alleles']
-        for pattern in genotype_patterns:
-            for col in columns:
-                if pattern in col:
-                    mapping['genotype'] = col
-                    break
-            if 'genotype' in mapping:
+        for col in columns:
+            exact = _CANON_MAP.get(col)
+            if exact is not None:
+                matches = [exact]
+            else:
+                matches = []
+                for canonical, patterns in COLUMN_PATTERNS.items():
+                    rank = next((i for i, p in enumerate(patterns) if p in col), None)
+                    if rank is not None:
+                        matches.append((canonical, rank))
+            
+            # Earlier patterns take priority; ties go to the first column
+            for canonical, rank in matches:
+                if rank < ranks.get(canonical, len(COLUMN_PATTERNS[canonical])):
+                    mapping[canonical] = col
+                    ranks[canonical] = rank
+            
+            if len(ranks) == len(COLUMN_PATTERNS) and not any(ranks.values()):
                 break
         
         # If no explicit mapping found, try positional (first 4 columns)
@@ -246,20 +460,18 @@ class InputNormalizer:
             return df
         
         # Filter: RSIDs must match pattern (start with rs)
-        mask = df['rsid'].str.match(self.rsid_pattern, na=False)
-        invalid_count = (~mask).sum()
+        matches = pc.match_substring_regex(
+            _as_arrow_strings(df['rsid']), RSID_REGEX, ignore_case=True
+        )
+        rsid_ok = pc.fill_null(matches, False).to_numpy(zero_copy_only=False)
+        invalid_count = int((~rsid_ok).sum())
         if invalid_count > 0:
             logger.warning(f"Filtered {invalid_count} rows with invalid RSIDs")
-        df = df[mask].copy()
-        
-        # Ensure positions are integers (already done in _normalize_dataframe)
-        # But ensure no negative positions
-        df = df[df['pos'] >= 0].copy()
         
-        # Remove rows with empty rsid
-        df = df[df['rsid'].notna() & (df['rsid'] != '')].copy()
-        
-        return df
+        # Combine with the position check (no negative positions) so the
+        # frame is sliced once; a matching RSID is never empty
+        mask = rsid_ok & (df['pos'].to_numpy() >= 0)
+        return df.loc[mask]
     
     def _deduplicate(self, df: pd.DataFrame) -> pd.DataFrame:
         """
@@ -272,18 +484,51 @@ class InputNormalizer:
             return df
         
         original_count = len(df)
-        df = df.drop_duplicates(subset=['rsid'], keep='first').copy()
+        # ignore_index resets the index for determinism (no index dependencies)
+        df = df.drop_duplicates(subset=['rsid'], keep='first', ignore_index=True)
         duplicate_count = original_count - len(df)
         
         if duplicate_count > 0:
             logger.info(f"Removed {duplicate_count} duplicate RSIDs")
         
-        # Reset index for determinism (no index dependencies)
-        df = df.reset_index(drop=True)
-        
         return df
     
+    def _deduplicate_table(self, table: pa.Table) -> pa.Table:
+        """
+        Deduplicate an Arrow table by RSID, keeping the first occurrence.
+        
+        Same semantics as _deduplicate, without a round-trip through pandas.
+        """
+        rsids = table.column('rsid')
+        # unique() preserves first-seen order, index_in() finds that first row
+        first_rows = pc.index_in(pc.unique(rsids), value_set=rsids)
+        
+        duplicate_count = table.num_rows - len(first_rows)
+        if duplicate_count > 0:
+            logger.info(f"Removed {duplicate_count} duplicate RSIDs")
+        
+        return table.take(first_rows)
+    
     def _empty_dataframe(self) -> pd.DataFrame:
         """Return empty DataFrame with correct schema."""
         return pd.DataFrame(columns=self.REQUIRED_COLUMNS)
 
+
+def _to_table(df: pd.DataFrame) -> pa.Table:
+    """Convert a normalized DataFrame to an Arrow table (index dropped)."""
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def _normalize_file_to_ipc(file_path: Path, cache_dir: Optional[Path] = None) -> bytes:
+    """
+    Process-pool worker: normalize one file without deduplication.
+    
+    Returns the result serialized as an Arrow IPC stream, which is cheaper
+    to send back to the parent than a pickled DataFrame.
+    """
+    normalizer = InputNormalizer(cache_dir=cache_dir)
+    table = _to_table(normalizer.normalize_file(file_path, deduplicate=False))
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
@@ -6,36 +6,64 @@ Maps RSIDs to clinical significance from ClinVar database.
 Invariants:
 - Missing data returns empty strings, not None
 - Cache writes must be atomic
-- Lookup must be O(1)
+- Lookup must not scan the table: O(log n) binary search on the sorted
+  key column (formerly an O(1) dict, which cost a Python object per entry
+  at startup)
+
+The cache is an Arrow IPC file keyed by the numeric part of the RSID
+(uint32), memory-mapped on load so startup does not allocate a Python
+object per ClinVar entry.
 """
 
-import json
 import gzip
+import io
 import shutil
 import logging
-import re
 from pathlib import Path
-from typing import Dict, Optional
+from types import MappingProxyType
+from typing import BinaryIO, Dict, Mapping, Optional
 import urllib.request
-import tempfile
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
 
 from config.settings import CLINVAR_URL, CLINVAR_CACHE_FILE
 
 logger = logging.getLogger(__name__)
 
+# On-disk layout of the ClinVar cache (one row per unique RSID)
+CACHE_SCHEMA = pa.schema([
+    ("rsid", pa.uint32()),
+    ("clinical_significance", pa.string()),
+    ("phenotype_list", pa.string()),
+    ("rcv_accession", pa.string()),
+])
+
+ANNOTATION_FIELDS = ("clinical_significance", "phenotype_list", "rcv_accession")
+
+# Shared, read-only result for RSIDs without a ClinVar entry
+_EMPTY_ANNOTATION: Mapping[str, str] = MappingProxyType({field: "" for field in ANNOTATION_FIELDS})
+
+# RSID cleanup patterns, compiled once by the Arrow regex kernels
+_PAREN_PATTERN = r'\s*\([^)]*\)'
+_RSID_DIGITS_PATTERN = r'^[^\d-]*(?P<rs>\d+)'
+_RSID_KEY_REGEX = r'^rs\d{1,10}$'
+
 
 class ClinVarAnnotator:
     """
     Annotates variants with ClinVar clinical significance.
     
     Downloads and caches ClinVar variant_summary.txt.gz locally.
-    Provides O(1) lookup by RSID.
+    Provides lookup by numeric RSID against the memory-mapped cache.
     """
     
     def __init__(self, cache_file: Path = CLINVAR_CACHE_FILE):
         self.cache_file = cache_file
-        self._annotation_cache: Dict[str, Dict[str, str]] = {}
+        self._table: Optional[pa.Table] = None
+        self._keys: np.ndarray = np.empty(0, dtype=np.uint32)
         self._loaded = False
     
     def ensure_data_downloaded(self, force_download: bool = False) -> bool:
@@ -55,19 +83,13 @@ class ClinVarAnnotator:
         logger.info(f"Downloading ClinVar data from {CLINVAR_URL}")
         
         try:
-            # Download to temporary file first (atomic write)
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.gz') as tmp_file:
-                tmp_path = Path(tmp_file.name)
-            
-            # Download
-            urllib.request.urlretrieve(CLINVAR_URL, tmp_path)
-            
-            # Extract and parse
-            logger.info("Extracting and parsing ClinVar data...")
-            self._parse_and_cache(tmp_path)
-            
-            # Clean up temp file
-            tmp_path.unlink()
+            # Decompress and parse straight off the socket (single pass, no
+            # temporary .gz on disk); the cache itself is still written atomically
+            with urllib.request.urlopen(CLINVAR_URL) as response:
+                buffered = io.BufferedReader(response, buffer_size=1 << 20)
+                with gzip.GzipFile(fileobj=buffered) as stream:
+                    logger.info("Extracting and parsing ClinVar data...")
+                    self._parse_stream(stream)
             
             logger.info(f"ClinVar data cached to {self.cache_file}")
             return True
@@ -77,112 +99,195 @@ class ClinVarAnnotator:
             return False
     
     def _parse_and_cache(self, gz_file: Path) -> None:
+        """Parse a local ClinVar gzipped file and cache as an Arrow IPC table."""
+        with gzip.open(gz_file, 'rb') as stream:
+            self._parse_stream(stream)
+    
+    def _parse_stream(self, stream: BinaryIO) -> None:
         """
-        Parse ClinVar gzipped file and cache as JSON.
+        Parse decompressed ClinVar TSV stream and cache as an Arrow IPC table.
         
         Heuristically detects relevant columns.
         Maps RSID to clinical metadata.
+        
+        Tokenizing is done by pyarrow's multi-threaded CSV reader; only the
+        four relevant columns are materialized, and RSID normalization runs
+        as vectorized Arrow compute kernels.
         """
-        # Read gzipped file
-        with gzip.open(gz_file, 'rt', encoding='utf-8') as f:
-            # Read first few lines to detect columns
-            header_line = f.readline().strip()
-            columns = header_line.split('\t')
-            
-            logger.info(f"Detected {len(columns)} columns in ClinVar file")
-            # Log first 15 columns to help with debugging
-            logger.info(f"First columns: {', '.join(columns[:15])}")
-            
-            # Find relevant column indices - try multiple possible column name patterns
-            # ClinVar uses various formats like "RS# (dbSNP)", "RS#", "rsid", etc.
-            rsid_patterns = [
-                'rs# (dbsnp)', 'rs#', 'rs_id', 'rsid', 'snp', 'rs (dbsnp)', 
-                'rs(dbsnp)', 'reference snp', 'refsnp_id', 'dbsnp rs', 'rs number'
-            ]
-            rsid_idx = self._find_column_index(columns, rsid_patterns)
-            
-            significance_patterns = [
-                'clinicalsignificance', 'clinical significance', 'clinical_significance', 
-                'significance', 'clinical significance (last reviewed)', 'review status'
-            ]
-            significance_idx = self._find_column_index(columns, significance_patterns)
-            
-            phenotype_patterns = [
-                'phenotypelist', 'phenotype list', 'phenotype_list', 'phenotypes', 
-                'condition', 'disease name', 'condition/disease', 'disease/phenotype'
-            ]
-            phenotype_idx = self._find_column_index(columns, phenotype_patterns)
-            
-            rcv_patterns = [
-                'rcvaccession', 'rcv accession', 'rcv_accession', 'accession',
-                'rcv', 'review accession', 'variant accession'
-            ]
-            rcv_idx = self._find_column_index(columns, rcv_patterns)
-            
-            if rsid_idx is None:
-                # Log available columns to help debug
-                logger.error(f"Could not find RSID column in ClinVar file")
-                logger.error(f"Available columns: {columns}")
-                logger.error("Tried patterns: " + ", ".join(rsid_patterns))
-                raise ValueError("Could not find RSID column in ClinVar file. Please check column names.")
-            
-            # Parse file and build cache
-            cache = {}
-            line_count = 0
-            
-            for line in f:
-                line_count += 1
-                if line_count % 100000 == 0:
-                    logger.info(f"Processed {line_count} lines...")
-                
-                fields = line.strip().split('\t')
-                if len(fields) <= rsid_idx:
-                    continue
-                
-                rsid = fields[rsid_idx].strip()
-                if not rsid:
-                    continue
-                
-                # Handle RSIDs that might be in format "rs123" or "rs123 (dbSNP)" or just "123"
-                # Remove parenthetical content like "(dbSNP)"
-                rsid = re.sub(r'\s*\([^)]*\)', '', rsid).strip()
-                
-                # Ensure it starts with 'rs'
-                if not rsid.startswith('rs'):
-                    # If it's just a number, add 'rs' prefix
-                    if rsid.isdigit():
-                        rsid = f'rs{rsid}'
-                    else:
-                        # Try to extract number from string like "12345" or "SNP123"
-                        number_match = re.search(r'\d+', rsid)
-                        if number_match:
-                            rsid = f'rs{number_match.group()}'
-                        else:
-                            continue  # Skip if can't extract valid RSID
-                
-                # Normalize RSID (uppercase)
-                rsid = rsid.upper()
-                
-                # Extract metadata (empty strings if not found)
-                significance = fields[significance_idx].strip() if significance_idx and significance_idx < len(fields) else ""
-                phenotype = fields[phenotype_idx].strip() if phenotype_idx and phenotype_idx < len(fields) else ""
-                rcv = fields[rcv_idx].strip() if rcv_idx and rcv_idx < len(fields) else ""
-                
-                # Store (if multiple entries for same RSID, keep first non-empty)
-                if rsid not in cache or not cache[rsid].get('clinical_significance'):
-                    cache[rsid] = {
-                        "clinical_significance": significance,
-                        "phenotype_list": phenotype,
-                        "rcv_accession": rcv
-                    }
-            
-            logger.info(f"Extracted {len(cache)} unique RSIDs from ClinVar")
-            
-            # Atomic write to cache file
-            cache_file_tmp = self.cache_file.with_suffix('.tmp')
-            with open(cache_file_tmp, 'w', encoding='utf-8') as f:
-                json.dump(cache, f, indent=2)
-            cache_file_tmp.replace(self.cache_file)  # Atomic move
+        # Read first line to detect columns (the reader continues after it)
+        header_line = stream.readline().decode('utf-8').rstrip('\r\n')
+        columns = header_line.split('\t')
+        
+        logger.info(f"Detected {len(columns)} columns in ClinVar file")
+        # Log first 15 columns to help with debugging
+        logger.info(f"First columns: {', '.join(columns[:15])}")
+        
+        # Find relevant column indices - try multiple possible column name patterns
+        # ClinVar uses various formats like "RS# (dbSNP)", "RS#", "rsid", etc.
+        rsid_patterns = [
+            'rs# (dbsnp)', 'rs#', 'rs_id', 'rsid', 'snp', 'rs (dbsnp)', 
+            'rs(dbsnp)', 'reference snp', 'refsnp_id', 'dbsnp rs', 'rs number'
+        ]
+        rsid_idx = self._find_column_index(columns, rsid_patterns)
+        
+        significance_patterns = [
+            'clinicalsignificance', 'clinical significance', 'clinical_significance', 
+            'significance', 'clinical significance (last reviewed)', 'review status'
+        ]
+        significance_idx = self._find_column_index(columns, significance_patterns)
+        
+        phenotype_patterns = [
+            'phenotypelist', 'phenotype list', 'phenotype_list', 'phenotypes', 
+            'condition', 'disease name', 'condition/disease', 'disease/phenotype'
+        ]
+        phenotype_idx = self._find_column_index(columns, phenotype_patterns)
+        
+        rcv_patterns = [
+            'rcvaccession', 'rcv accession', 'rcv_accession', 'accession',
+            'rcv', 'review accession', 'variant accession'
+        ]
+        rcv_idx = self._find_column_index(columns, rcv_patterns)
+        
+        if rsid_idx is None:
+            # Log available columns to help debug
+            logger.error(f"Could not find RSID column in ClinVar file")
+            logger.error(f"Available columns: {columns}")
+            logger.error("Tried patterns: " + ", ".join(rsid_patterns))
+            raise ValueError("Could not find RSID column in ClinVar file. Please check column names.")
+        
+        # Positional names avoid clashes between duplicate header names
+        column_names = [f"c{i}" for i in range(len(columns))]
+        field_columns = {
+            "rsid": rsid_idx,
+            "clinical_significance": significance_idx,
+            "phenotype_list": phenotype_idx,
+            "rcv_accession": rcv_idx,
+        }
+        include_columns = sorted({f"c{idx}" for idx in field_columns.values() if idx is not None})
+        
+        reader = pacsv.open_csv(
+            stream,
+            read_options=pacsv.ReadOptions(
+                column_names=column_names,
+                block_size=64 << 20
+            ),
+            parse_options=pacsv.ParseOptions(
+                delimiter='\t',
+                quote_char=False,
+                invalid_row_handler=lambda row: 'skip'
+            ),
+            convert_options=pacsv.ConvertOptions(
+                include_columns=include_columns,
+                column_types={name: pa.string() for name in include_columns},
+                strings_can_be_null=False
+            )
+        )
+        
+        # Reduce each block to unique RSIDs as it streams in, so only the
+        # current raw block plus the (much smaller) reduced blocks are held
+        total_rows = 0
+        reduced = []
+        for batch in reader:
+            total_rows += batch.num_rows
+            reduced.append(self._reduce_batch(batch, field_columns))
+        logger.info(f"Read {total_rows} ClinVar rows")
+        
+        # Per-block results are in file order, so the same reduction over
+        # their concatenation keeps the first-non-empty-significance rule
+        combined = pa.concat_tables(reduced).combine_chunks() if reduced else CACHE_SCHEMA.empty_table()
+        cache_table = self._dedupe_cache_rows(
+            combined.column("rsid").to_numpy(),
+            {field: combined.column(field) for field in ANNOTATION_FIELDS}
+        )
+        
+        logger.info(f"Extracted {cache_table.num_rows} unique RSIDs from ClinVar")
+        self._write_cache_table(cache_table)
+    
+    def _reduce_batch(self, batch: pa.RecordBatch, field_columns: Dict[str, Optional[int]]) -> pa.Table:
+        """Normalize one block of raw ClinVar rows into deduplicated cache rows."""
+        rs_ids = self._normalize_rsid_column(batch.column(f"c{field_columns['rsid']}"))
+        valid = pc.is_valid(rs_ids)
+        batch = batch.filter(valid)
+        rs_ids = rs_ids.filter(valid).to_numpy()
+        
+        # Extract metadata (empty strings if not found)
+        fields = {}
+        for field in ANNOTATION_FIELDS:
+            idx = field_columns[field]
+            if idx is None:
+                fields[field] = pa.repeat("", batch.num_rows)
+            else:
+                fields[field] = pc.utf8_trim_whitespace(batch.column(f"c{idx}"))
+        
+        return self._dedupe_cache_rows(rs_ids, fields)
+    
+    @staticmethod
+    def _dedupe_cache_rows(rs_ids: np.ndarray, fields: Dict[str, pa.Array]) -> pa.Table:
+        """
+        Collapse rows to one per RSID, sorted by RSID.
+        
+        If multiple entries exist for the same RSID, the first one (in input
+        order) with a non-empty significance wins, else the first one.
+        """
+        # Order by (rsid, empty significance last, input order), take first per rsid
+        has_significance = pc.greater(pc.utf8_length(fields["clinical_significance"]), 0)
+        order = np.lexsort((
+            np.arange(len(rs_ids)),
+            ~has_significance.to_numpy(zero_copy_only=False),
+            rs_ids
+        ))
+        rs_sorted = rs_ids[order]
+        first = np.ones(len(rs_sorted), dtype=bool)
+        first[1:] = rs_sorted[1:] != rs_sorted[:-1]
+        keep = pa.array(order[first])
+        
+        return pa.table(
+            [pa.array(rs_sorted[first].astype(np.uint32))]
+            + [fields[field].take(keep) for field in ANNOTATION_FIELDS],
+            schema=CACHE_SCHEMA
+        )
+    
+    @staticmethod
+    def _normalize_rsid_column(raw: pa.Array) -> pa.Array:
+        """
+        Convert raw ClinVar RSID strings to uint64 numeric keys (null if invalid).
+        
+        Handles RSIDs in format "rs123", "rs123 (dbSNP)" or just "123".
+        ClinVar uses -1 for "no RSID"; those rows become null.
+        """
+        rsid = pc.utf8_trim_whitespace(raw)
+        if isinstance(rsid, pa.ChunkedArray):
+            rsid = rsid.combine_chunks()
+        
+        # Fast path: plain numeric RSIDs (the common case) skip the regex kernels
+        needs_regex = pc.invert(pc.utf8_is_digit(rsid))
+        if pc.any(needs_regex).as_py():
+            messy = rsid.filter(needs_regex)
+            # Remove parenthetical content like "(dbSNP)"
+            if pc.any(pc.match_substring(messy, '(')).as_py():
+                messy = pc.replace_substring_regex(messy, pattern=_PAREN_PATTERN, replacement='')
+            # Take the first run of digits, unless the value is negative
+            extracted = pc.struct_field(pc.extract_regex(messy, pattern=_RSID_DIGITS_PATTERN), [0])
+            digits = pc.replace_with_mask(rsid, needs_regex, extracted)
+        else:
+            digits = rsid
+        
+        # Anything longer than 10 digits cannot be a uint32 key
+        digits = pc.if_else(pc.less_equal(pc.utf8_length(digits), 10), digits, None)
+        rs_ids = pc.cast(digits, pa.uint64())
+        in_range = pc.and_(
+            pc.greater(rs_ids, 0),
+            pc.less_equal(rs_ids, np.iinfo(np.uint32).max)
+        )
+        return pc.if_else(in_range, rs_ids, None)
+    
+    def _write_cache_table(self, table: pa.Table) -> None:
+        """Write cache table as Arrow IPC file (atomic: temp file, then rename)."""
+        cache_file_tmp = self.cache_file.with_suffix('.tmp')
+        with pa.OSFile(str(cache_file_tmp), 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        cache_file_tmp.replace(self.cache_file)  # Atomic move
     
     def _find_column_index(self, columns: list, possible_names: list) -> Optional[int]:
         """
@@ -191,16 +296,19 @@ class ClinVarAnnotator:
         Tries exact match first, then partial match (contains).
         """
         columns_lower = [c.lower().strip() for c in columns]
+        names_lower = [name.lower().strip() for name in possible_names]
         
-        # Try exact match first
-        for name in possible_names:
-            name_lower = name.lower().strip()
-            if name_lower in columns_lower:
-                return columns_lower.index(name_lower)
+        # Try exact match first (first column wins for duplicate names)
+        positions: Dict[str, int] = {}
+        for idx, col in enumerate(columns_lower):
+            positions.setdefault(col, idx)
+        for name_lower in names_lower:
+            idx = positions.get(name_lower)
+            if idx is not None:
+                return idx
         
         # Try partial match (column name contains the pattern)
-        for name in possible_names:
-            name_lower = name.lower().strip()
+        for name, name_lower in zip(possible_names, names_lower):
             for idx, col in enumerate(columns_lower):
                 if name_lower in col or col in name_lower:
                     logger.debug(f"Found column match: '{columns[idx]}' matches pattern '{name}'")
@@ -215,21 +323,54 @@ class ClinVarAnnotator:
         
         if not self.cache_file.exists():
             logger.warning(f"ClinVar cache file not found: {self.cache_file}")
-            self._annotation_cache = {}
+            self._reset_cache()
             self._loaded = True
             return
         
         try:
-            with open(self.cache_file, 'r', encoding='utf-8') as f:
-                self._annotation_cache = json.load(f)
-            logger.info(f"Loaded {len(self._annotation_cache)} ClinVar annotations from cache")
+            # Memory-map the IPC file: string columns stay in the page cache
+            source = pa.memory_map(str(self.cache_file), 'r')
+            table = pa.ipc.open_file(source).read_all()
+            keys = table.column('rsid').to_numpy()
+            if len(keys) > 1 and not np.all(keys[1:] > keys[:-1]):
+                # Caches are written sorted and unique; repair anything else
+                table = table.take(pc.sort_indices(table, [('rsid', 'ascending')]))
+                keys = table.column('rsid').to_numpy()
+            
+            # Lookups binary-search the mapped key column, so no per-row
+            # Python index has to be built at startup
+            self._table = table
+            self._keys = keys
+            logger.info(f"Loaded {self._table.num_rows} ClinVar annotations from cache")
             self._loaded = True
         except Exception as e:
             logger.error(f"Failed to load ClinVar cache: {e}")
-            self._annotation_cache = {}
+            self._reset_cache()
             self._loaded = True
     
-    def annotate(self, rsid: str) -> Dict[str, str]:
+    def _reset_cache(self) -> None:
+        """Drop any loaded annotations."""
+        self._table = None
+        self._keys = np.empty(0, dtype=np.uint32)
+    
+    @staticmethod
+    def _rsid_to_int(rsid: str) -> Optional[int]:
+        """Convert an RSID like "rs123" / "RS123" to its numeric cache key."""
+        rsid = rsid.strip()
+        if rsid[:2].lower() != 'rs' or not rsid[2:].isdigit():
+            return None
+        return int(rsid[2:])
+    
+    def _find_row(self, rs_int: int) -> Optional[int]:
+        """Return the cache row for a numeric RSID, or None if absent."""
+        if rs_int > np.iinfo(np.uint32).max:
+            return None
+        row = int(np.searchsorted(self._keys, rs_int))
+        if row < len(self._keys) and self._keys[row] == rs_int:
+            return row
+        return None
+    
+    def annotate(self, rsid: str) -> Mapping[str, str]:
         """
         Get ClinVar annotation for an RSID.
         
@@ -237,26 +378,27 @@ class ClinVarAnnotator:
             rsid: RSID to look up (e.g., "rs123" or "RS123")
             
         Returns:
-            Dictionary with keys: clinical_significance, phenotype_list, rcv_accession
-            All values are strings (empty string if not found)
+            Mapping with keys: clinical_significance, phenotype_list, rcv_accession
+            All values are strings (empty string if not found). Misses share
+            one read-only mapping, so callers must not mutate the result.
         """
         if not self._loaded:
             self.load_cache()
         
-        # Normalize RSID
-        rsid_upper = rsid.upper().strip()
+        # Binary search on the sorted numeric RSID keys
+        rs_int = self._rsid_to_int(rsid)
+        row = self._find_row(rs_int) if rs_int is not None else None
         
-        # O(1) lookup
-        result = self._annotation_cache.get(rsid_upper, {})
+        if row is None:
+            return _EMPTY_ANNOTATION
         
-        # Ensure all keys exist with empty string defaults
+        # Only materialize Python strings for the matching row
         return {
-            "clinical_significance": result.get("clinical_significance", ""),
-            "phenotype_list": result.get("phenotype_list", ""),
-            "rcv_accession": result.get("rcv_accession", "")
+            field: self._table.column(field)[row].as_py() or ""
+            for field in ANNOTATION_FIELDS
         }
     
-    def annotate_batch(self, rsids: list) -> Dict[str, Dict[str, str]]:
+    def annotate_batch(self, rsids: list) -> Dict[str, Mapping[str, str]]:
         """
         Annotate multiple RSIDs at once.
         
@@ -264,14 +406,68 @@ class ClinVarAnnotator:
             rsids: List of RSIDs to annotate
             
         Returns:
-            Dictionary mapping RSID → annotation dict
+            Dictionary mapping RSID → annotation mapping (read-only shared
+            empty mapping for RSIDs not in ClinVar)
+        """
+        annotated = self.annotate_dataframe(pd.DataFrame({'rsid': rsids}))
+        
+        columns = [annotated[field].tolist() for field in ANNOTATION_FIELDS]
+        return {
+            rsid: dict(zip(ANNOTATION_FIELDS, values)) if any(values) else _EMPTY_ANNOTATION
+            for rsid, *values in zip(annotated['rsid'].tolist(), *columns)
+        }
+    
+    def annotate_dataframe(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Annotate a DataFrame of variants with one vectorized key lookup.
+        
+        Args:
+            df: DataFrame with an 'rsid' column
+            
+        Returns:
+            Copy of df with clinical_significance, phenotype_list and
+            rcv_accession columns added (empty strings if not found)
         """
         if not self._loaded:
             self.load_cache()
         
-        results = {}
-        for rsid in rsids:
-            results[rsid] = self.annotate(rsid)
+        rows = self._lookup_rows(df['rsid'])
         
-        return results
-
+        annotated = df.reset_index(drop=True)
+        columns = {}
+        for field in ANNOTATION_FIELDS:
+            if self._table is None:
+                values = pa.nulls(len(rows), pa.string())
+            else:
+                # Gather straight from the mapped table; misses are null indices
+                values = self._table.column(field).take(rows)
+            columns[field] = pd.Series(
+                pc.fill_null(values, ""), index=annotated.index, dtype=pd.ArrowDtype(pa.string())
+            )
+        
+        return annotated.assign(**columns)
+    
+    def _lookup_rows(self, rsids: pd.Series) -> pa.Array:
+        """
+        Map RSIDs to cache row numbers with Arrow kernels and a binary search.
+        
+        Returns an int64 array with nulls where the RSID is malformed or
+        not in the cache.
+        """
+        if isinstance(rsids.dtype, pd.ArrowDtype):
+            arr = rsids.array.__arrow_array__()
+        else:
+            arr = pa.array(rsids.to_numpy(dtype=object), type=pa.string(), from_pandas=True)
+        arr = pc.utf8_trim_whitespace(pc.cast(arr, pa.string()))
+        
+        # Same acceptance rule as _rsid_to_int; 10 digits bound the uint64 cast
+        valid = pc.fill_null(pc.match_substring_regex(arr, _RSID_KEY_REGEX, ignore_case=True), False)
+        digits = pc.if_else(valid, pc.utf8_slice_codeunits(arr, 2), "0")
+        rs_ids = pc.cast(digits, pa.uint64()).to_numpy(zero_copy_only=False)
+        valid = valid.to_numpy(zero_copy_only=False)
+        
+        positions = np.searchsorted(self._keys, rs_ids)
+        hit = valid & (positions < len(self._keys))
+        hit[hit] = self._keys[positions[hit]] == rs_ids[hit]
+        
+        return pa.array(positions, type=pa.int64(), mask=~hit)
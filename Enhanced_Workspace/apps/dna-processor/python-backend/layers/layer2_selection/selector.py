@@ -9,11 +9,43 @@ Invariants:
 """
 
 import logging
-from typing import List, Set, Optional
+import re
+from typing import Dict, Iterable, List, Set, Optional, Tuple
+import numpy as np
 import pandas as pd
 
 logger = logging.getLogger(__name__)
 
+# Per-significance verdicts of the selection rules
+_KEEP = 0
+_EXCLUDE_BENIGN = 1
+_EXCLUDE_UNCERTAIN = 2
+
+
+def _category_pattern(categories: Iterable[str]) -> "re.Pattern[str]":
+    """Compile a regex matching any of the given category substrings."""
+    return re.compile('|'.join(re.escape(cat) for cat in sorted(categories)))
+
+
+def _category_automaton(categories_by_verdict: Dict[int, Iterable[str]]):
+    """
+    Build one Aho-Corasick automaton over all category sets (value = verdict).
+    
+    Returns None when pyahocorasick is not installed.
+    """
+    try:
+        import ahocorasick
+    except ImportError:
+        logger.debug("pyahocorasick not installed, using regex category matching. Install with: pip install pyahocorasick")
+        return None
+    
+    automaton = ahocorasick.Automaton()
+    for verdict, categories in categories_by_verdict.items():
+        for cat in categories:
+            automaton.add_word(cat, verdict)
+    automaton.make_automaton()
+    return automaton
+
 
 class CandidateSelector:
     """
@@ -70,6 +102,19 @@ class CandidateSelector:
         self.exclude_benign = exclude_benign
         self.exclude_uncertain = exclude_uncertain
         self.whitelist = whitelist or set()
+        
+        # One alternation per category set, matched against whole columns
+        self._significant_re = _category_pattern(self.SIGNIFICANT_CATEGORIES)
+        self._benign_re = _category_pattern(self.BENIGN_CATEGORIES)
+        self._uncertain_re = _category_pattern(self.UNCERTAIN_CATEGORIES)
+        
+        # Single pass over each string for all three sets, when available.
+        # Each category maps to the verdict its set leads to (significant → keep)
+        self._automaton = _category_automaton({
+            _KEEP: self.SIGNIFICANT_CATEGORIES,
+            _EXCLUDE_BENIGN: self.BENIGN_CATEGORIES,
+            _EXCLUDE_UNCERTAIN: self.UNCERTAIN_CATEGORIES,
+        })
     
     def select_candidates(
         self,
@@ -90,69 +135,23 @@ class CandidateSelector:
             logger.warning("Empty variants DataFrame provided")
             return []
         
-        # Merge variants with ClinVar annotations
-        merged = variants_df.merge(
-            clinvar_annotations[['rsid', 'clinical_significance']],
+        # Merge variants with ClinVar annotations. Only rsid is read from the
+        # variants, and one annotation per rsid keeps the join one-to-one
+        merged = variants_df[['rsid']].drop_duplicates().merge(
+            clinvar_annotations[['rsid', 'clinical_significance']].drop_duplicates('rsid'),
             on='rsid',
-            how='left'
+            how='left',
+            validate='one_to_one'
         )
         
-        # Fill missing significance with empty string
-        merged['clinical_significance'] = merged['clinical_significance'].fillna('')
-        
-        selected_rsids = []
-        exclusion_reasons = {}
-        
-        for _, row in merged.iterrows():
-            rsid = row['rsid']
-            significance = str(row['clinical_significance']).lower().strip()
-            
-            # Whitelist always included
-            if rsid in self.whitelist:
-                selected_rsids.append(rsid)
-                continue
-            
-            # Empty significance: include (no rule to exclude)
-            if not significance:
-                selected_rsids.append(rsid)
-                continue
-            
-            # Check if significant
-            is_significant = any(
-                cat in significance for cat in self.SIGNIFICANT_CATEGORIES
-            )
-            
-            if is_significant:
-                selected_rsids.append(rsid)
-                continue
-            
-            # Check if benign (and should be excluded)
-            is_benign = any(
-                cat in significance for cat in self.BENIGN_CATEGORIES
-            )
-            
-            if is_benign and self.exclude_benign:
-                exclusion_reasons[rsid] = f"Benign: {significance}"
-                continue
-            
-            # Check if uncertain (and should be excluded)
-            is_uncertain = any(
-                cat in significance for cat in self.UNCERTAIN_CATEGORIES
-            )
-            
-            if is_uncertain and self.exclude_uncertain:
-                exclusion_reasons[rsid] = f"Uncertain: {significance}"
-                continue
-            
-            # Default: include if no exclusion rule matches
-            selected_rsids.append(rsid)
+        keep, reasons = self._apply_rules(merged['rsid'], merged['clinical_significance'])
         
         # Log exclusions
-        if exclusion_reasons:
-            logger.info(f"Excluded {len(exclusion_reasons)} variants: {list(exclusion_reasons.values())[:5]}")
+        if reasons:
+            logger.info(f"Excluded {len(reasons)} variants: {list(reasons.values())[:5]}")
         
         # Sort for determinism
-        selected_rsids = sorted(set(selected_rsids))
+        selected_rsids = sorted(set(merged.loc[keep, 'rsid']))
         
         logger.info(f"Selected {len(selected_rsids)} candidate variants from {len(variants_df)} total")
         
@@ -174,61 +173,70 @@ class CandidateSelector:
         if annotations_df.empty:
             return []
         
-        selected = []
-        exclusion_reasons = {}
+        significance = annotations_df.get('clinical_significance')
+        if significance is None:
+            significance = pd.Series('', index=annotations_df.index)
         
-        for _, row in annotations_df.iterrows():
-            rsid = row['rsid']
-            significance = str(row.get('clinical_significance', '')).lower().strip()
-            
-            # Whitelist always included
-            if rsid in self.whitelist:
-                selected.append(rsid)
-                continue
-            
-            # Empty: include by default
-            if not significance:
-                selected.append(rsid)
-                continue
-            
-            # Check categories
-            is_significant = any(
-                cat in significance for cat in self.SIGNIFICANT_CATEGORIES
-            )
-            
-            if is_significant:
-                selected.append(rsid)
-                continue
-            
-            if self.exclude_benign:
-                is_benign = any(
-                    cat in significance for cat in self.BENIGN_CATEGORIES
-                )
-                if is_benign:
-                    exclusion_reasons[rsid] = f"Benign: {significance}"
-                    continue
-            
-            if self.exclude_uncertain:
-                is_uncertain = any(
-                    cat in significance for cat in self.UNCERTAIN_CATEGORIES
-                )
-                if is_uncertain:
-                    exclusion_reasons[rsid] = f"Uncertain: {significance}"
-                    continue
-            
-            # Default: include
-            selected.append(rsid)
+        keep, reasons = self._apply_rules(annotations_df['rsid'], significance)
         
-        if exclusion_reasons:
-            logger.info(f"Excluded {len(exclusion_reasons)} variants")
+        if reasons:
+            logger.info(f"Excluded {len(reasons)} variants")
         
-        return sorted(set(selected))
-
-
-
-
-
-
-
-
-
+        return sorted(set(annotations_df.loc[keep, 'rsid']))
+    
+    def _apply_rules(self, rsids: pd.Series, significance: pd.Series) -> Tuple[np.ndarray, Dict[str, str]]:
+        """
+        Evaluate the selection rules for every row at once.
+        
+        Rules, in order: whitelisted → keep; empty significance → keep;
+        significant → keep; benign → drop if exclude_benign; uncertain →
+        drop if exclude_uncertain; anything else → keep.
+        
+        Returns:
+            (boolean keep mask aligned with rsids, rsid → exclusion reason)
+        """
+        # Significance has only a few dozen distinct values: classify each
+        # distinct value once, then gather the verdict back by integer code
+        codes, uniques = pd.factorize(significance.fillna('').astype(str))
+        cleaned = [value.lower().strip() for value in uniques]
+        verdicts = np.array([self._verdict(value) for value in cleaned], dtype=np.int8)
+        
+        row_verdicts = verdicts[codes]
+        row_verdicts[rsids.isin(self.whitelist).to_numpy()] = _KEEP
+        keep = row_verdicts == _KEEP
+        
+        reasons: Dict[str, str] = {}
+        labels = {_EXCLUDE_BENIGN: "Benign", _EXCLUDE_UNCERTAIN: "Uncertain"}
+        for idx in np.flatnonzero(~keep):
+            reasons[rsids.iloc[idx]] = f"{labels[row_verdicts[idx]]}: {cleaned[codes[idx]]}"
+        
+        return keep, reasons
+    
+    def _verdict(self, significance: str) -> int:
+        """Apply the selection rules to one lowercased, stripped significance."""
+        # Empty significance: include (no rule to exclude)
+        if not significance:
+            return _KEEP
+        
+        matched = self._matched_sets(significance)
+        if _KEEP in matched:
+            return _KEEP
+        if self.exclude_benign and _EXCLUDE_BENIGN in matched:
+            return _EXCLUDE_BENIGN
+        if self.exclude_uncertain and _EXCLUDE_UNCERTAIN in matched:
+            return _EXCLUDE_UNCERTAIN
+        return _KEEP
+    
+    def _matched_sets(self, significance: str) -> Set[int]:
+        """Verdicts of every category set with a substring match in significance."""
+        if self._automaton is not None:
+            return {verdict for _, verdict in self._automaton.iter(significance)}
+        
+        matched = set()
+        if self._significant_re.search(significance):
+            matched.add(_KEEP)
+        if self._benign_re.search(significance):
+            matched.add(_EXCLUDE_BENIGN)
+        if self._uncertain_re.search(significance):
+            matched.add(_EXCLUDE_UNCERTAIN)
+        return matched
@@ -12,13 +12,17 @@ Invariants:
 
 import asyncio
 import aiohttp
-import json
 import logging
+import multiprocessing
+import orjson
+import os
+import sqlite3
+import threading
 from pathlib import Path
-from typing import Dict, List, Optional, Set
-import re
-from bs4 import BeautifulSoup
+from typing import Dict, List, Optional, Set, Union
+from selectolax.parser import HTMLParser
 import time
+from concurrent.futures import ProcessPoolExecutor
 
 from config.settings import (
     SNPEDIA_BASE_URL,
@@ -26,11 +30,43 @@ from config.settings import (
     SNPEDIA_CHECKPOINT_FILE,
     SNPEDIA_CONCURRENCY_LIMIT,
     SNPEDIA_MAX_RETRIES,
-    SNPEDIA_DELAY_BETWEEN_REQUESTS
+    SNPEDIA_MAX_REQUESTS_PER_SECOND,
+    SQLITE_BATCH_CHUNK_SIZE
 )
 
 logger = logging.getLogger(__name__)
 
+# Parse workers; selectolax parses a page in about a millisecond, so a
+# couple of processes keep up with the request rate limit
+_PARSE_WORKERS = 2
+
+
+class _RateLimiter:
+    """
+    Spaces request starts evenly across all workers.
+    
+    Only the HTTP call waits on this, so parsing and caching never hold
+    a request slot.
+    """
+    
+    def __init__(self, max_per_second: float):
+        self._interval = 1.0 / max_per_second if max_per_second > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self) -> None:
+        """Wait until the next request slot is free."""
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self._interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+    
+    def pause(self, seconds: float) -> None:
+        """Hold back all further requests for the given number of seconds."""
+        self._next_slot = max(self._next_slot, time.monotonic() + seconds)
+
 
 class SNPediaExpander:
     """
@@ -45,15 +81,19 @@ class SNPediaExpander:
         checkpoint_file: Path = SNPEDIA_CHECKPOINT_FILE,
         concurrency_limit: int = SNPEDIA_CONCURRENCY_LIMIT,
         max_retries: int = SNPEDIA_MAX_RETRIES,
-        delay_between_requests: float = SNPEDIA_DELAY_BETWEEN_REQUESTS
+        max_requests_per_second: float = SNPEDIA_MAX_REQUESTS_PER_SECOND
     ):
         self.cache_dir = cache_dir
         self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.cache_db = self.cache_dir / "snpedia_cache.db"
+        self._ensure_schema()
         self.checkpoint_file = checkpoint_file
         self.concurrency_limit = concurrency_limit
         self.max_retries = max_retries
-        self.delay_between_requests = delay_between_requests
+        self.max_requests_per_second = max_requests_per_second
+        self._rate_limiter = _RateLimiter(max_requests_per_second)
         self._session: Optional[aiohttp.ClientSession] = None
+        self._parse_pool: Optional[ProcessPoolExecutor] = None
     
     async def __aenter__(self):
         """Async context manager entry."""
@@ -62,22 +102,60 @@ class SNPediaExpander:
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
+            'Accept-Encoding': _accept_encoding(),
             'Connection': 'keep-alive',
         }
+        # Pooled keep-alive connections with cached DNS, sized to the worker count
+        connector = aiohttp.TCPConnector(
+            limit=256,
+            limit_per_host=self.concurrency_limit,
+            ttl_dns_cache=300,
+            keepalive_timeout=60
+        )
         self._session = aiohttp.ClientSession(
+            connector=connector,
             timeout=aiohttp.ClientTimeout(total=30),
             headers=headers
         )
+        # HTML parsing is CPU-bound; keep it off the event loop. Workers are
+        # spawned rather than forked, since the GUI calls this from a
+        # process that already runs Qt and worker threads
+        self._parse_pool = ProcessPoolExecutor(
+            max_workers=min(_PARSE_WORKERS, os.cpu_count() or 1),
+            mp_context=multiprocessing.get_context('spawn')
+        )
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit."""
         if self._session:
             await self._session.close()
+        if self._parse_pool:
+            self._parse_pool.shutdown(wait=False, cancel_futures=True)
+            self._parse_pool = None
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection to the cache database."""
+        conn = sqlite3.connect(self.cache_db)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+    
+    def _ensure_schema(self) -> None:
+        """Create cache table if it doesn't exist."""
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS snpedia_cache (
+                    rsid TEXT PRIMARY KEY,
+                    payload BLOB,
+                    source TEXT,
+                    fetched_at INTEGER
+                )
+            """)
+            conn.commit()
     
     def get_cache_file(self, rsid: str) -> Path:
-        """Get cache file path for an RSID."""
+        """Get legacy per-RSID cache file path (read-only, migrated on access)."""
         return self.cache_dir / f"{rsid.upper()}.json"
     
     def load_checkpoint(self) -> Set[str]:
@@ -86,49 +164,117 @@ class SNPediaExpander:
             return set()
         
         try:
-            with open(self.checkpoint_file, 'r') as f:
-                data = json.load(f)
-                return set(data.get('processed_rsids', []))
+            data = orjson.loads(self.checkpoint_file.read_bytes())
+            return set(data.get('processed_rsids', []))
         except Exception as e:
             logger.warning(f"Failed to load checkpoint: {e}")
             return set()
     
     def save_checkpoint(self, processed_rsids: Set[str]) -> None:
-        """Save checkpoint of processed RSIDs."""
+        """Save checkpoint of processed RSIDs (crash-safe: fsync, atomic replace, fsync dir)."""
+        # Unique temp name so concurrent writers never share a temp file
+        checkpoint_tmp = self.checkpoint_file.with_suffix(f'.{os.getpid()}.{threading.get_ident()}.tmp')
         try:
-            checkpoint_tmp = self.checkpoint_file.with_suffix('.tmp')
-            with open(checkpoint_tmp, 'w') as f:
-                json.dump({'processed_rsids': list(processed_rsids)}, f)
-            checkpoint_tmp.replace(self.checkpoint_file)  # Atomic move
+            with open(checkpoint_tmp, 'wb') as f:
+                f.write(orjson.dumps({'processed_rsids': list(processed_rsids)}))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(checkpoint_tmp, self.checkpoint_file)  # Atomic move
+            _fsync_dir(self.checkpoint_file.parent)
         except Exception as e:
             logger.warning(f"Failed to save checkpoint: {e}")
+            checkpoint_tmp.unlink(missing_ok=True)
     
     def get_cached(self, rsid: str) -> Optional[Dict]:
         """Get cached data for RSID."""
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT payload FROM snpedia_cache WHERE rsid = ?",
+                    (rsid.upper(),)
+                ).fetchone()
+            if row:
+                return orjson.loads(row[0])
+        except Exception as e:
+            logger.warning(f"Failed to load cache for {rsid}: {e}")
+            return None
+        
+        return self._migrate_legacy_cache(rsid)
+    
+    def get_cached_batch(self, rsids: List[str]) -> Dict[str, Dict]:
+        """
+        Get cached data for many RSIDs.
+        
+        Queries are chunked to stay under SQLite's variable limit.
+        
+        Returns:
+            Dictionary mapping RSID → cached data (RSIDs without an entry are omitted)
+        """
+        by_key = {rsid.upper(): rsid for rsid in rsids}
+        keys = list(by_key)
+        results = {}
+        
+        try:
+            with self._connect() as conn:
+                for i in range(0, len(keys), SQLITE_BATCH_CHUNK_SIZE):
+                    chunk = keys[i:i + SQLITE_BATCH_CHUNK_SIZE]
+                    placeholders = ','.join('?' * len(chunk))
+                    cursor = conn.execute(
+                        f"SELECT rsid, payload FROM snpedia_cache WHERE rsid IN ({placeholders})",
+                        chunk
+                    )
+                    for key, payload in cursor.fetchall():
+                        results[by_key[key]] = orjson.loads(payload)
+        except Exception as e:
+            logger.warning(f"Failed to load cache batch: {e}")
+        
+        for rsid in rsids:
+            if rsid not in results:
+                cached = self._migrate_legacy_cache(rsid)
+                if cached:
+                    results[rsid] = cached
+        
+        return results
+    
+    def _migrate_legacy_cache(self, rsid: str) -> Optional[Dict]:
+        """Import a per-RSID JSON file written by older versions, if present."""
         cache_file = self.get_cache_file(rsid)
         if not cache_file.exists():
             return None
         
         try:
-            with open(cache_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            data = orjson.loads(cache_file.read_bytes())
         except Exception as e:
             logger.warning(f"Failed to load cache for {rsid}: {e}")
             return None
+        
+        self.save_cache(rsid, data)
+        cache_file.unlink(missing_ok=True)
+        return data
     
     def save_cache(self, rsid: str, data: Dict) -> None:
-        """Save data to cache (atomic write)."""
-        cache_file = self.get_cache_file(rsid)
-        cache_tmp = cache_file.with_suffix('.tmp')
+        """Save data to cache."""
+        self.save_cache_batch({rsid: data})
+    
+    def save_cache_batch(self, entries: Dict[str, Dict]) -> None:
+        """Save many cache entries in one transaction."""
+        if not entries:
+            return
         
+        fetched_at = int(time.time())
+        rows = [
+            (rsid.upper(), orjson.dumps(data), data.get('source', ''), fetched_at)
+            for rsid, data in entries.items()
+        ]
         try:
-            with open(cache_tmp, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-            cache_tmp.replace(cache_file)  # Atomic move
+            with self._connect() as conn:
+                conn.executemany("""
+                    INSERT OR REPLACE INTO snpedia_cache (rsid, payload, source, fetched_at)
+                    VALUES (?, ?, ?, ?)
+                """, rows)
+                conn.commit()
         except Exception as e:
-            logger.error(f"Failed to save cache for {rsid}: {e}")
-            if cache_tmp.exists():
-                cache_tmp.unlink()
+            logger.error(f"Failed to save cache for {len(rows)} RSIDs: {e}")
     
     async def expand_rsid(self, rsid: str) -> Dict:
         """
@@ -143,27 +289,29 @@ class SNPediaExpander:
         if cached:
             return cached
         
+        result = await self._fetch(rsid)
+        self.save_cache(rsid, result)
+        return result
+    
+    async def _fetch(self, rsid: str) -> Dict:
+        """Fetch an RSID from SNPedia (no cache access)."""
         # Try API first, then HTML fallback
         result = await self._fetch_from_api(rsid)
         if result and result.get('source') == 'live':
-            self.save_cache(rsid, result)
             return result
         
         # Fallback to HTML parsing
         result = await self._fetch_from_html(rsid)
         if result:
-            self.save_cache(rsid, result)
             return result
         
         # Return empty result if both fail
-        empty_result = {
+        return {
             "extract": "",
             "categories": [],
             "url": f"{SNPEDIA_BASE_URL}{rsid}",
             "source": "failed"
         }
-        self.save_cache(rsid, empty_result)
-        return empty_result
     
     async def _fetch_from_api(self, rsid: str) -> Optional[Dict]:
         """Fetch from SNPedia API (if available)."""
@@ -183,21 +331,30 @@ class SNPediaExpander:
         
         for attempt in range(self.max_retries):
             try:
+                await self._rate_limiter.acquire()
                 async with self._session.get(url, allow_redirects=True) as response:
                     if response.status == 200:
-                        html = await response.text()
-                        return self._parse_html(html, url, rsid)
+                        # Raw bytes go straight to the parser (no charset sniffing/decode)
+                        body = await response.read()
+                        if self._parse_pool is None:
+                            return self._parse_html(body, url, rsid)
+                        return await asyncio.get_running_loop().run_in_executor(
+                            self._parse_pool, _parse_html_worker, body, url, rsid
+                        )
                     elif response.status == 404:
                         # Not found - silently skip (expected for many RSIDs)
                         return None
-                    elif response.status == 403:
-                        # Forbidden - likely rate limiting or blocking
-                        # Don't log every 403 as warning, just debug
+                    elif response.status in (403, 429):
+                        # Forbidden / Too Many Requests - likely rate limiting or blocking
+                        # Don't log every one as warning, just debug
                         if attempt == 0:  # Only log first attempt
-                            logger.debug(f"HTTP 403 for {rsid} (may be rate-limited or blocked)")
-                        # Wait longer before retry for 403s
+                            logger.debug(f"HTTP {response.status} for {rsid} (may be rate-limited or blocked)")
+                        # Back off all workers, honouring Retry-After when the server sends one
                         if attempt < self.max_retries - 1:
-                            await asyncio.sleep(5 * (attempt + 1))  # Progressive delay: 5s, 10s, 15s
+                            delay = _retry_after_seconds(response.headers.get('Retry-After'))
+                            if delay is None:
+                                delay = 5 * (attempt + 1)  # Progressive delay: 5s, 10s, 15s
+                            self._rate_limiter.pause(delay)
                         continue
                     else:
                         logger.warning(f"HTTP {response.status} for {rsid}")
@@ -214,43 +371,9 @@ class SNPediaExpander:
         
         return None
     
-    def _parse_html(self, html: str, url: str, rsid: str) -> Dict:
+    def _parse_html(self, html: Union[str, bytes], url: str, rsid: str) -> Dict:
         """Parse SNPedia HTML page."""
-        try:
-            soup = BeautifulSoup(html, 'html.parser')
-            
-            # Extract main content
-            extract = ""
-            content_div = soup.find('div', {'id': 'mw-content-text'})
-            if content_div:
-                # Get first paragraph
-                first_p = content_div.find('p')
-                if first_p:
-                    extract = first_p.get_text().strip()
-            
-            # Extract categories
-            categories = []
-            cat_links = soup.find_all('a', href=re.compile(r'/index.php/Category:'))
-            for link in cat_links:
-                cat_name = link.get_text().strip()
-                if cat_name:
-                    categories.append(cat_name)
-            
-            return {
-                "extract": extract,
-                "categories": list(set(categories)),  # Deduplicate
-                "url": url,
-                "source": "live"
-            }
-        
-        except Exception as e:
-            logger.warning(f"Failed to parse HTML for {rsid}: {e}")
-            return {
-                "extract": "",
-                "categories": [],
-                "url": url,
-                "source": "parse_failed"
-            }
+        return _parse_html_worker(html, url, rsid)
     
     async def expand_batch(self, rsids: List[str]) -> Dict[str, Dict]:
         """
@@ -271,34 +394,37 @@ class SNPediaExpander:
         if not to_process:
             logger.info("All RSIDs already processed")
             # Load from cache
-            results = {}
-            for rsid in rsids:
-                cached = self.get_cached(rsid)
-                if cached:
-                    results[rsid] = cached
-            return results
+            return self.get_cached_batch(rsids)
         
         logger.info(f"Expanding {len(to_process)} RSIDs (concurrency: {self.concurrency_limit})")
         
         # Process with semaphore for concurrency control
         semaphore = asyncio.Semaphore(self.concurrency_limit)
         results = {}
+        fetched = {}
         
         async def process_one(rsid: str):
             async with semaphore:
-                # Add delay between requests to be respectful and avoid rate limiting
-                await asyncio.sleep(self.delay_between_requests)
-                result = await self.expand_rsid(rsid)
+                # Request pacing happens in the rate limiter around the HTTP call
+                result = await self._fetch(rsid)
                 results[rsid] = result
+                fetched[rsid] = result
                 processed.add(rsid)
         
         # Process in batches for checkpoint saving
         batch_size = 100
         for i in range(0, len(to_process), batch_size):
             batch = to_process[i:i + batch_size]
-            await asyncio.gather(*[process_one(rsid) for rsid in batch])
             
-            # Save checkpoint periodically
+            cached = self.get_cached_batch(batch)
+            results.update(cached)
+            processed.update(cached)
+            
+            await asyncio.gather(*[process_one(rsid) for rsid in batch if rsid not in cached])
+            
+            # Write this batch's fetches in one transaction, then checkpoint
+            self.save_cache_batch(fetched)
+            fetched.clear()
             self.save_checkpoint(processed)
             logger.info(f"Processed {min(i + batch_size, len(to_process))}/{len(to_process)} RSIDs")
         
@@ -307,3 +433,70 @@ class SNPediaExpander:
         
         return results
 
+
+def _fsync_dir(path: Path) -> None:
+    """Flush a directory entry so a preceding rename survives a crash (no-op on Windows)."""
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+    fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given in seconds (HTTP-date values are ignored)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+def _accept_encoding() -> str:
+    """Accept-Encoding header value; brotli is only offered when aiohttp can decode it."""
+    try:
+        import brotli  # noqa: F401
+    except ImportError:
+        return 'gzip, deflate'
+    return 'br, gzip, deflate'
+
+
+def _parse_html_worker(html: Union[str, bytes], url: str, rsid: str) -> Dict:
+    """Parse SNPedia HTML page (module-level so a process pool can pickle it)."""
+    try:
+        tree = HTMLParser(html)
+        
+        # Extract main content
+        extract = ""
+        content_div = tree.css_first('#mw-content-text')
+        if content_div:
+            # Get first paragraph
+            first_p = content_div.css_first('p')
+            if first_p:
+                extract = first_p.text().strip()
+        
+        # Extract categories (set deduplicates)
+        categories = {
+            link.text().strip()
+            for link in tree.css('a[href*="/index.php/Category:"]')
+        }
+        categories.discard("")
+        
+        return {
+            "extract": extract,
+            "categories": list(categories),
+            "url": url,
+            "source": "live"
+        }
+    
+    except Exception as e:
+        logger.warning(f"Failed to parse HTML for {rsid}: {e}")
+        return {
+            "extract": "",
+            "categories": [],
+            "url": url,
+            "source": "parse_failed"
+        }
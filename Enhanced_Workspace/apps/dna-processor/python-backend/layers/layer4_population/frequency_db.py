@@ -5,6 +5,7 @@ Stores and queries allele frequencies from 1000 Genomes project.
 
 Invariants:
 - DB must be queryable independently
+- RSIDs are stored lowercase (VCF's native form); lookups ignore case
 - Missing AF is allowed (never guessed)
 - Streaming VCF parsing (never load whole file)
 - Never block GUI thread
@@ -13,16 +14,96 @@ Invariants:
 import sqlite3
 import gzip
 import logging
+import os
 from pathlib import Path
-from typing import Optional, Dict, List
+from typing import Optional, Dict, Iterable, Iterator, List, Tuple
 import urllib.request
 import tempfile
 import threading
+import time
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
 
 from config.settings import KG1_VCF_URL, KG1_DB_FILE, SQLITE_BATCH_CHUNK_SIZE
 
 logger = logging.getLogger(__name__)
 
+# INFO field keys (Arrow/RE2 patterns), anchored so e.g. EAS_AF= cannot match AF=
+_AF_PATTERN = r'(?:^|;)AF=(?P<value>[0-9.]+)'
+_AC_PATTERN = r'(?:^|;)AC=(?P<value>[0-9]+)'
+_AN_PATTERN = r'(?:^|;)AN=(?P<value>[0-9]+)'
+# Digit/dot strings that float() accepts ("1", "1.", ".5", "0.25" but not "." or "1.2.3")
+_FLOAT_PATTERN = r'^(?:[0-9]+\.?[0-9]*|\.[0-9]+)$'
+_VCF_BLOCK_SIZE = 16 << 20
+
+# Bloom filter sizing: 10 bits per key and 7 probes give ~1% false positives
+_BLOOM_BITS_PER_KEY = 10
+_BLOOM_HASHES = 7
+_BLOOM_BUILD_CHUNK = 1_000_000
+
+# Columnar snapshot of allele_freqs used for batch joins
+_PARQUET_ROW_GROUP_SIZE = 1_000_000
+_PARQUET_SIGNATURE_KEY = b'allele_freqs_signature'
+_PARQUET_SCHEMA = pa.schema([
+    ('rsid', pa.string()),
+    ('ref', pa.string()),
+    ('alt', pa.string()),
+    ('global_af', pa.float64()),
+])
+
+
+class _RsidBloomFilter:
+    """
+    Bloom filter over numeric RSIDs (rs123 → 123), backed by a numpy bit array.
+    
+    A negative answer is exact, so lookups for RSIDs absent from the DB can
+    skip SQLite. RSIDs that are not of the form rs<digits> are never filtered.
+    """
+    
+    def __init__(self, bits: np.ndarray):
+        self.bits = bits
+        self.num_bits = np.uint64(len(bits) * 8)
+    
+    @classmethod
+    def empty(cls, num_keys: int) -> "_RsidBloomFilter":
+        num_bytes = max(8, -(-num_keys * _BLOOM_BITS_PER_KEY // 8))
+        return cls(np.zeros(num_bytes, dtype=np.uint8))
+    
+    def _positions(self, keys: np.ndarray) -> Iterator[np.ndarray]:
+        # Double hashing: probe i is h1 + i * h2 (mod m); uint64 math wraps
+        h1 = _mix64(keys)
+        h2 = _mix64(keys + np.uint64(0x9E3779B97F4A7C15)) | np.uint64(1)
+        for i in range(_BLOOM_HASHES):
+            yield (h1 + np.uint64(i) * h2) % self.num_bits
+    
+    def add(self, keys: np.ndarray) -> None:
+        for pos in self._positions(keys):
+            np.bitwise_or.at(self.bits, pos >> np.uint64(3), np.left_shift(1, pos & np.uint64(7)).astype(np.uint8))
+    
+    def save(self, path: Path, signature: int) -> None:
+        """Write the bit array prefixed by the 8-byte DB signature it was built from."""
+        header = np.array([signature], dtype=np.uint64).view(np.uint8)
+        np.save(path, np.concatenate([header, self.bits]))
+    
+    @classmethod
+    def load(cls, path: Path) -> Tuple["_RsidBloomFilter", int]:
+        """Memory-map a saved filter; returns (filter, signature)."""
+        data = np.load(path, mmap_mode='r')
+        signature = int(np.asarray(data[:8]).view(np.uint64)[0])
+        return cls(data[8:]), signature
+    
+    def contains(self, keys: np.ndarray) -> np.ndarray:
+        """Return a bool array: False means the key is definitely absent."""
+        found = np.ones(len(keys), dtype=bool)
+        for pos in self._positions(keys):
+            found &= ((self.bits[pos >> np.uint64(3)] >> (pos & np.uint64(7)).astype(np.uint8)) & 1).astype(bool)
+        return found
+
 
 class PopulationFrequencyDB:
     """
@@ -35,17 +116,33 @@ class PopulationFrequencyDB:
         alt TEXT,
         global_af REAL
     )
+    indexed_chromosomes(
+        chrom TEXT PRIMARY KEY,
+        rowcount INTEGER,
+        loaded_at INTEGER
+    )
+    
+    The table is also exported, sorted by rsid, to a Parquet file next to
+    the DB; batch lookups scan it with an rsid filter while it is current.
+    download_and_index_chromosomes writes it once after all its ingests.
     """
     
     def __init__(self, db_file: Path = KG1_DB_FILE):
         self.db_file = db_file
         self.db_file.parent.mkdir(parents=True, exist_ok=True)
-        self._lock = threading.Lock()
+        self._lock = threading.Lock()  # Serializes writers only
+        self._local = threading.local()  # Per-thread read connection
+        self.filter_file = self.db_file.with_suffix('.bloom.npy')
+        self._rsid_filter: Optional[_RsidBloomFilter] = None
+        self._filter_lock = threading.Lock()
+        self.parquet_file = self.db_file.with_suffix('.parquet')
         self._ensure_schema()
     
     def _ensure_schema(self) -> None:
         """Create database schema if it doesn't exist."""
         with sqlite3.connect(self.db_file) as conn:
+            # WAL lets the per-thread readers query while an ingest is running
+            conn.execute("PRAGMA journal_mode=WAL")
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS allele_freqs (
                     rsid TEXT PRIMARY KEY,
@@ -55,12 +152,49 @@ class PopulationFrequencyDB:
                 )
             """)
             conn.execute("CREATE INDEX IF NOT EXISTS idx_rsid ON allele_freqs(rsid)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS indexed_chromosomes (
+                    chrom TEXT PRIMARY KEY,
+                    rowcount INTEGER,
+                    loaded_at INTEGER
+                )
+            """)
             conn.commit()
     
+    def is_chromosome_indexed(self, chrom: str) -> bool:
+        """Check whether a chromosome's VCF has been loaded (index lookups only, no scan)."""
+        conn = self._reader()
+        if conn.execute("SELECT 1 FROM indexed_chromosomes WHERE chrom = ?", (chrom,)).fetchone():
+            return True
+        # DBs built before per-chromosome tracking have rows but no records;
+        # treat them as indexed rather than re-downloading everything
+        return (
+            conn.execute("SELECT 1 FROM indexed_chromosomes LIMIT 1").fetchone() is None
+            and conn.execute("SELECT 1 FROM allele_freqs LIMIT 1").fetchone() is not None
+        )
+    
+    def download_and_index_chromosomes(self, chroms: Iterable[str], force: bool = False) -> Dict[str, bool]:
+        """
+        Download and index several chromosomes, then bring the Parquet snapshot up to date.
+        
+        Args:
+            chroms: Chromosome numbers (1-22, X, Y, MT)
+            force: If True, re-download even if data exists
+            
+        Returns:
+            Dictionary mapping chromosome → success
+        """
+        results = {chrom: self.download_and_index_chromosome(chrom, force) for chrom in chroms}
+        self._export_parquet()
+        return results
+    
     def download_and_index_chromosome(self, chrom: str, force: bool = False) -> bool:
         """
         Download and index 1000 Genomes VCF for a chromosome.
         
+        The Parquet snapshot is not refreshed; batch lookups use SQLite
+        until download_and_index_chromosomes (or the next one) exports it.
+        
         Args:
             chrom: Chromosome number (1-22, X, Y, MT)
             force: If True, re-download even if data exists
@@ -70,19 +204,11 @@ class PopulationFrequencyDB:
         """
         # Check if chromosome already has data
         if not force:
-            with sqlite3.connect(self.db_file) as conn:
-                # Check if we have any data for this chromosome
-                # (We can't easily check per-chromosome without position data,
-                # so we just check if DB has data at all)
-                cursor = conn.execute("SELECT COUNT(*) FROM allele_freqs")
-                count = cursor.fetchone()[0]
-                if count > 1000:  # If we have substantial data, assume chromosome is indexed
-                    logger.debug(f"Database already has {count} variants, skipping download for chrom {chrom}")
-                    return True
-                
-                # For now, we'll download if requested
-                # In a more sophisticated implementation, we'd track which chromosomes are indexed
-                logger.info(f"Downloading chromosome {chrom} VCF data...")
+            if self.is_chromosome_indexed(chrom):
+                logger.debug(f"Chromosome {chrom} already indexed, skipping download")
+                return True
+            
+            logger.info(f"Downloading chromosome {chrom} VCF data...")
         
         url = KG1_VCF_URL.format(chrom=chrom)
         logger.info(f"Downloading 1000 Genomes VCF for chromosome {chrom} from {url}")
@@ -116,173 +242,391 @@ class PopulationFrequencyDB:
         
         Extracts AF from INFO field or derives from AC/AN.
         Never loads whole file into memory.
-        """
-        batch_size = 1000
-        batch = []
         
-        with gzip.open(vcf_gz, 'rt', encoding='utf-8') as f, \
-             sqlite3.connect(self.db_file) as conn:
+        The whole file is loaded in a single transaction with the rsid
+        index dropped, so there is one fsync and one index build at the end.
+        Records are streamed into one executemany call, so the INSERT is
+        prepared once for the whole file.
+        """
+        with self._lock, sqlite3.connect(self.db_file) as conn:
+            self._configure_bulk_load(conn)
+            conn.execute("DROP INDEX IF EXISTS idx_rsid")
             
-            # Skip header lines
-            for line in f:
-                if line.startswith('#CHROM'):
-                    break
+            rowcount = self._insert_batch(conn, self._iter_vcf_records(vcf_gz))
             
-            for line in f:
-                if not line.strip():
-                    continue
-                
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_rsid ON allele_freqs(rsid)")
+            conn.execute(
+                "INSERT OR REPLACE INTO indexed_chromosomes (chrom, rowcount, loaded_at) VALUES (?, ?, ?)",
+                (chrom, rowcount, int(time.time()))
+            )
+            conn.commit()
+        
+        # The RSID set changed; rebuild the filter on next lookup
+        with self._filter_lock:
+            self._rsid_filter = None
+            self.filter_file.unlink(missing_ok=True)
+    
+    def _export_parquet(self) -> None:
+        """Write allele_freqs, sorted by rsid, to the Parquet snapshot unless it is already current."""
+        # Holding the writer lock keeps the table (and so its signature)
+        # fixed while it is read out
+        with self._lock, sqlite3.connect(self.db_file) as conn:
+            signature = conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM allele_freqs").fetchone()[0]
+            try:
+                if self._snapshot_signature() == signature:
+                    return
+            except (OSError, ValueError, pa.ArrowException) as e:
+                logger.debug(f"Replacing unreadable allele frequency snapshot: {e}")
+            self._write_parquet(conn, signature)
+    
+    def _write_parquet(self, conn: sqlite3.Connection, signature: int) -> None:
+        """Export allele_freqs from conn (zstd, with statistics), tagged with its signature."""
+        schema = _PARQUET_SCHEMA.with_metadata({_PARQUET_SIGNATURE_KEY: str(signature).encode()})
+        tmp_path = self.parquet_file.with_suffix('.parquet.tmp')
+        
+        try:
+            cursor = conn.execute("SELECT rsid, ref, alt, global_af FROM allele_freqs ORDER BY rsid")
+            with pq.ParquetWriter(tmp_path, schema, compression='zstd', write_statistics=True) as writer:
+                while True:
+                    rows = cursor.fetchmany(_PARQUET_ROW_GROUP_SIZE)
+                    if not rows:
+                        break
+                    writer.write_table(
+                        pa.Table.from_arrays(
+                            [pa.array(column, type=field.type) for column, field in zip(zip(*rows), schema)],
+                            schema=schema
+                        ),
+                        row_group_size=_PARQUET_ROW_GROUP_SIZE
+                    )
+            os.replace(tmp_path, self.parquet_file)
+        except Exception as e:
+            # The SQLite table stays authoritative; batch lookups fall back to it
+            logger.warning(f"Failed to export allele frequencies to Parquet: {e}")
+            tmp_path.unlink(missing_ok=True)
+    
+    def _iter_vcf_records(self, vcf_gz: Path) -> Iterator[Tuple[str, str, str, float]]:
+        """
+        Yield (rsid, ref, alt, af) for every VCF record with an RSID and AF.
+        
+        Uses cyvcf2 (htslib) when installed, otherwise a pure-Python parser.
+        """
+        try:
+            from cyvcf2 import VCF
+        except ImportError:
+            logger.debug("cyvcf2 not installed, using Python VCF parser. Install with: pip install cyvcf2")
+            yield from self._iter_vcf_records_python(vcf_gz)
+            return
+        
+        vcf = VCF(str(vcf_gz))
+        try:
+            for variant in vcf:
                 try:
-                    fields = line.strip().split('\t')
-                    if len(fields) < 8:
+                    # Take first RSID if multiple (format: rs123 or rs123;rs456)
+                    rsid = (variant.ID or '').split(';')[0].strip().lower()
+                    if not rsid.startswith('rs'):
                         continue
                     
-                    # Extract RSID from ID field (format: rs123 or rs123;rs456)
-                    rsid_field = fields[2]
-                    if not rsid_field.startswith('rs'):
-                        continue
+                    alt = variant.ALT[0] if variant.ALT else ''  # Take first ALT allele
                     
-                    # Take first RSID if multiple
-                    rsid = rsid_field.split(';')[0].strip()
-                    if not rsid or not rsid.startswith('rs'):
-                        continue
-                    
-                    ref = fields[3]
-                    alt = fields[4].split(',')[0]  # Take first ALT allele
-                    
-                    # Extract AF from INFO field
-                    info = fields[7]
-                    af = self._extract_af_from_info(info)
-                    
-                    # If AF not found, try to derive from AC/AN
+                    af = _first_value(variant.INFO.get('AF'))
                     if af is None:
-                        af = self._derive_af_from_info(info)
+                        # If AF not found, try to derive from AC/AN
+                        ac = _first_value(variant.INFO.get('AC'))
+                        an = variant.INFO.get('AN')
+                        if ac is not None and an:
+                            af = ac / an
                     
                     if af is not None:
-                        batch.append((rsid, ref, alt, af))
-                        
-                        if len(batch) >= batch_size:
-                            self._insert_batch(conn, batch)
-                            batch = []
-                            conn.commit()  # Periodic commit
+                        yield rsid, variant.REF, alt, float(af)
                 
                 except Exception as e:
-                    logger.debug(f"Error parsing VCF line: {e}")
+                    logger.debug(f"Error parsing VCF record: {e}")
                     continue
-            
-            # Insert remaining batch
-            if batch:
-                self._insert_batch(conn, batch)
-                conn.commit()
-    
-    def _extract_af_from_info(self, info: str) -> Optional[float]:
-        """Extract AF (allele frequency) from INFO field."""
-        # Look for AF=value pattern
-        import re
-        match = re.search(r'AF=([0-9.]+)', info)
-        if match:
-            try:
-                return float(match.group(1))
-            except ValueError:
-                pass
-        return None
-    
-    def _derive_af_from_info(self, info: str) -> Optional[float]:
-        """Derive AF from AC (allele count) and AN (allele number)."""
-        import re
-        ac_match = re.search(r'AC=([0-9]+)', info)
-        an_match = re.search(r'AN=([0-9]+)', info)
+        finally:
+            vcf.close()
+    
+    def _iter_vcf_records_python(self, vcf_gz: Path) -> Iterator[Tuple[str, str, str, float]]:
+        """
+        Fallback for _iter_vcf_records without cyvcf2.
         
-        if ac_match and an_match:
-            try:
-                ac = int(ac_match.group(1))
-                an = int(an_match.group(1))
-                if an > 0:
-                    return ac / an
-            except (ValueError, ZeroDivisionError):
-                pass
+        Tokenizes with Arrow's streaming CSV reader and extracts fields with
+        vectorized kernels, one block of records at a time.
+        """
+        # Count header lines and take the column names from #CHROM
+        skip_rows = 0
+        columns = None
+        with gzip.open(vcf_gz, 'rt') as f:
+            for line in f:
+                skip_rows += 1
+                if line.startswith('#CHROM'):
+                    columns = line.lstrip('#').rstrip('\r\n').split('\t')
+                    break
+        if not columns or len(columns) < 8:
+            logger.warning(f"No #CHROM header found in {vcf_gz}")
+            return
         
-        return None
+        id_col, ref_col, alt_col, info_col = columns[2], columns[3], columns[4], columns[7]
+        reader = pacsv.open_csv(
+            pa.input_stream(str(vcf_gz), compression='gzip'),
+            read_options=pacsv.ReadOptions(
+                skip_rows=skip_rows, column_names=columns, block_size=_VCF_BLOCK_SIZE
+            ),
+            parse_options=pacsv.ParseOptions(
+                delimiter='\t', quote_char=False, invalid_row_handler=lambda row: 'skip'
+            ),
+            convert_options=pacsv.ConvertOptions(
+                include_columns=[id_col, ref_col, alt_col, info_col],
+                column_types={col: pa.string() for col in (id_col, ref_col, alt_col, info_col)},
+                strings_can_be_null=False
+            )
+        )
+        
+        for batch in reader:
+            # Take first RSID / ALT allele if multiple (rs123;rs456, G,T)
+            ids = pc.ascii_lower(batch.column(id_col))
+            rsid = pc.utf8_trim_whitespace(pc.list_element(pc.split_pattern(ids, ';'), 0))
+            alt = pc.list_element(pc.split_pattern(batch.column(alt_col), ','), 0)
+            
+            info = batch.column(info_col)
+            af = _info_float(info, _AF_PATTERN)
+            # If AF not found, derive from AC/AN
+            ac = _info_float(info, _AC_PATTERN)
+            an = _info_float(info, _AN_PATTERN)
+            derived = pc.if_else(pc.greater(an, 0), pc.divide(ac, an), None)
+            af = pc.coalesce(af, derived)
+            
+            keep = pc.and_(
+                pc.and_(pc.starts_with(ids, 'rs'), pc.starts_with(rsid, 'rs')),
+                pc.is_valid(af)
+            )
+            yield from zip(
+                pc.filter(rsid, keep).to_pylist(),
+                pc.filter(batch.column(ref_col), keep).to_pylist(),
+                pc.filter(alt, keep).to_pylist(),
+                pc.filter(af, keep).to_pylist()
+            )
     
-    def _insert_batch(self, conn: sqlite3.Connection, batch: List[tuple]) -> None:
-        """Insert batch of records (replace on conflict)."""
-        conn.executemany("""
+    def _configure_bulk_load(self, conn: sqlite3.Connection) -> None:
+        """Set connection pragmas for a large write (WAL, relaxed sync, big cache)."""
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-262144")  # 256 MiB
+        conn.execute("PRAGMA mmap_size=268435456")  # 256 MiB
+    
+    def _insert_batch(self, conn: sqlite3.Connection, batch: Iterable[tuple]) -> int:
+        """Insert records (replace on conflict); batch may be any iterable. Returns rows written."""
+        return conn.executemany("""
             INSERT OR REPLACE INTO allele_freqs (rsid, ref, alt, global_af)
             VALUES (?, ?, ?, ?)
-        """, batch)
+        """, batch).rowcount
+    
+    def _reader(self) -> sqlite3.Connection:
+        """Get this thread's read-only connection, opening it on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(f"{self.db_file.resolve().as_uri()}?mode=ro", uri=True)
+            conn.execute("PRAGMA mmap_size=268435456")  # 256 MiB
+            self._local.conn = conn
+        return conn
+    
+    def _get_rsid_filter(self) -> _RsidBloomFilter:
+        """
+        Load the persisted RSID filter (memory-mapped), building it on first use.
+        
+        The saved filter is reused only if it matches the current table
+        signature; ingests through this instance drop the in-memory copy.
+        """
+        rsid_filter = self._rsid_filter
+        if rsid_filter is not None:
+            return rsid_filter
+        
+        with self._filter_lock:
+            if self._rsid_filter is None:
+                signature = self._table_signature()
+                if self.filter_file.exists():
+                    try:
+                        rsid_filter, saved_signature = _RsidBloomFilter.load(self.filter_file)
+                        if saved_signature == signature:
+                            self._rsid_filter = rsid_filter
+                    except (OSError, ValueError) as e:
+                        logger.debug(f"Ignoring unreadable RSID filter: {e}")
+                if self._rsid_filter is None:
+                    self._rsid_filter = self._build_rsid_filter(signature)
+            return self._rsid_filter
+    
+    def _table_signature(self) -> int:
+        """Cheap change marker for allele_freqs."""
+        # INSERT OR REPLACE always allocates a new rowid, so MAX(rowid)
+        # changes whenever the table does
+        return self._reader().execute("SELECT COALESCE(MAX(rowid), 0) FROM allele_freqs").fetchone()[0]
+    
+    def _snapshot_signature(self) -> Optional[int]:
+        """Table signature the Parquet snapshot was exported at (None if there is none)."""
+        if not self.parquet_file.exists():
+            return None
+        metadata = pq.read_schema(self.parquet_file).metadata or {}
+        value = metadata.get(_PARQUET_SIGNATURE_KEY)
+        return int(value) if value is not None else None
+    
+    def _build_rsid_filter(self, signature: int) -> _RsidBloomFilter:
+        """Stream every RSID out of the DB into a new filter and persist it."""
+        conn = self._reader()
+        count = conn.execute("SELECT COUNT(*) FROM allele_freqs").fetchone()[0]
+        rsid_filter = _RsidBloomFilter.empty(count)
+        
+        cursor = conn.execute("SELECT rsid FROM allele_freqs")
+        while True:
+            rows = cursor.fetchmany(_BLOOM_BUILD_CHUNK)
+            if not rows:
+                break
+            keys = _rsid_keys([row[0] for row in rows])
+            rsid_filter.add(keys[keys >= 0].astype(np.uint64))
+        
+        try:
+            rsid_filter.save(self.filter_file, signature)
+        except OSError as e:
+            logger.debug(f"Could not persist RSID filter: {e}")
+        logger.debug(f"Built RSID filter for {count} variants ({len(rsid_filter.bits)} bytes)")
+        return rsid_filter
+    
+    def _might_exist(self, rsids: List[str]) -> np.ndarray:
+        """Bool mask of RSIDs that may be in the DB (False = definitely absent)."""
+        keys = _rsid_keys(rsids)
+        numeric = keys >= 0
+        mask = np.ones(len(rsids), dtype=bool)
+        mask[numeric] = self._get_rsid_filter().contains(keys[numeric].astype(np.uint64))
+        return mask
     
     def get_frequency(self, rsid: str) -> Optional[float]:
         """
         Get allele frequency for an RSID.
         
         Args:
-            rsid: RSID to look up
+            rsid: RSID to look up (any case, e.g. rs123 or RS123)
             
         Returns:
             Allele frequency (0.0-1.0) or None if not found
         """
-        with self._lock, sqlite3.connect(self.db_file) as conn:
-            cursor = conn.execute(
-                "SELECT global_af FROM allele_freqs WHERE rsid = ?",
-                (rsid.upper(),)
-            )
-            result = cursor.fetchone()
-            return result[0] if result else None
+        rsid = rsid.lower()
+        if not self._might_exist([rsid])[0]:
+            return None
+        
+        cursor = self._reader().execute(
+            "SELECT global_af FROM allele_freqs WHERE rsid = ?",
+            (rsid,)
+        )
+        result = cursor.fetchone()
+        return result[0] if result else None
     
     def get_frequencies_batch(self, rsids: List[str]) -> Dict[str, Optional[float]]:
         """
         Get frequencies for multiple RSIDs.
         
-        Handles large datasets by chunking queries to avoid SQLite's variable limit.
-        SQLite has a default limit of 999 SQL variables per query, so we chunk at 900.
+        The RSIDs are looked up in the Parquet snapshot with one filtered
+        scan. If the snapshot is missing or stale they are loaded into a TEMP
+        table and joined against allele_freqs in a single SQLite query instead.
         
         Args:
-            rsids: List of RSIDs (can be any size)
+            rsids: List of RSIDs in any case (can be any size)
             
         Returns:
-            Dictionary mapping RSID → frequency (or None if not found)
+            Dictionary mapping each RSID as given → frequency (or None if not found)
         """
         if not rsids:
             return {}
         
-        results = {}
-        chunk_size = SQLITE_BATCH_CHUNK_SIZE
+        # Every RSID gets an entry (maintain invariant); hits are filled in below
+        results: Dict[str, Optional[float]] = dict.fromkeys(rsids)
         total_rsids = len(rsids)
         
-        # If we have many RSIDs, log that we're chunking
-        if total_rsids > chunk_size:
-            logger.debug(f"Chunking {total_rsids} RSIDs into batches of {chunk_size} for SQL query")
+        # Look up the lowercase form the DB stores, then map back to the caller's spelling
+        unique_rsids = list(results)
+        keys = pc.utf8_lower(pa.array(unique_rsids, type=pa.string())).to_pylist()
         
-        with self._lock, sqlite3.connect(self.db_file) as conn:
-            # Process in chunks to avoid SQLite variable limit
-            for i in range(0, total_rsids, chunk_size):
-                chunk = rsids[i:i + chunk_size]
-                
-                # Build query with placeholders for this chunk
-                placeholders = ','.join('?' * len(chunk))
-                cursor = conn.execute(
-                    f"SELECT rsid, global_af FROM allele_freqs WHERE rsid IN ({placeholders})",
-                    [rsid.upper() for rsid in chunk]
-                )
-                
-                # Build dict from results for this chunk
-                for row in cursor.fetchall():
-                    results[row[0]] = row[1]
-                
-                # Log progress for large batches
-                if total_rsids > chunk_size and (i + chunk_size) % (chunk_size * 10) == 0:
-                    processed = min(i + chunk_size, total_rsids)
-                    logger.debug(f"Processed {processed}/{total_rsids} RSIDs for frequency lookup")
-            
-            # Fill in None for missing RSIDs (maintain invariant: all RSIDs have entry)
-            for rsid in rsids:
-                rsid_upper = rsid.upper()
-                if rsid_upper not in results:
-                    results[rsid] = None
+        # Only RSIDs that pass the filter are sent to SQLite
+        unique_keys = list(dict.fromkeys(keys))
+        candidates = [
+            key for key, maybe in zip(unique_keys, self._might_exist(unique_keys)) if maybe
+        ]
+        if not candidates:
+            return results
         
-        if total_rsids > chunk_size:
+        found: Dict[str, Optional[float]] = {}
+        if not self._query_frequencies_parquet(candidates, found):
+            self._query_frequencies_sqlite(candidates, found)
+        results.update(zip(unique_rsids, map(found.get, keys)))
+        
+        if total_rsids > SQLITE_BATCH_CHUNK_SIZE:
             found_count = sum(1 for v in results.values() if v is not None)
             logger.debug(f"Frequency lookup complete: {found_count}/{total_rsids} RSIDs found in database")
         
         return results
+    
+    def _query_frequencies_parquet(self, rsids: List[str], results: Dict[str, Optional[float]]) -> bool:
+        """
+        Fill results from the Parquet snapshot; returns False if it is missing or stale.
+        
+        The snapshot is sorted by rsid, so row groups whose min/max statistics
+        exclude every queried RSID are skipped without being read.
+        """
+        try:
+            if self._snapshot_signature() != self._table_signature():
+                return False
+            hits = ds.dataset(self.parquet_file, format='parquet').to_table(
+                columns=['rsid', 'global_af'],
+                filter=pc.field('rsid').isin(pa.array(rsids, type=pa.string()))
+            )
+        except (OSError, ValueError, pa.ArrowException) as e:
+            logger.debug(f"Ignoring unreadable allele frequency snapshot: {e}")
+            return False
+        results.update(zip(hits['rsid'].to_pylist(), hits['global_af'].to_pylist()))
+        return True
+    
+    def _query_frequencies_sqlite(self, rsids: List[str], results: Dict[str, Optional[float]]) -> None:
+        """Fill results from SQLite via a TEMP table join (one query for any batch size)."""
+        conn = self._reader()
+        # Commit at the end so the connection does not keep a read snapshot open
+        with conn:
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS query_rsids (rsid TEXT PRIMARY KEY) WITHOUT ROWID")
+            try:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO query_rsids (rsid) VALUES (?)",
+                    [(rsid,) for rsid in rsids]
+                )
+                cursor = conn.execute(
+                    "SELECT a.rsid, a.global_af FROM allele_freqs a JOIN query_rsids q USING (rsid)"
+                )
+                results.update(cursor.fetchall())
+            finally:
+                conn.execute("DROP TABLE IF EXISTS temp.query_rsids")
+
+
+def _info_float(info: pa.Array, pattern: str) -> pa.Array:
+    """Numeric INFO value captured by pattern as float64 (null if absent or malformed)."""
+    value = pc.struct_field(pc.extract_regex(info, pattern), 'value')
+    well_formed = pc.fill_null(pc.match_substring_regex(value, _FLOAT_PATTERN), False)
+    return pc.cast(pc.if_else(well_formed, value, None), pa.float64())
+
+
+def _mix64(x: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer, vectorized over a uint64 array."""
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def _rsid_keys(rsids: List[str]) -> np.ndarray:
+    """Numeric part of each rs<digits> RSID as int64, or -1 for anything else."""
+    return np.fromiter(
+        (int(r[2:]) if r[:2] == 'rs' and r[2:].isdigit() else -1 for r in rsids),
+        dtype=np.int64,
+        count=len(rsids)
+    )
+
 
+def _first_value(value):
+    """Return the first element of a per-allele INFO value (Number=A), or the value itself."""
+    if isinstance(value, (tuple, list)):
+        return value[0] if value else None
+    return value
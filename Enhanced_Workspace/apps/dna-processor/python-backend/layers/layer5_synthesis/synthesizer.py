@@ -10,11 +10,20 @@ Invariants:
 """
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
 import logging
-from typing import Dict, List
+from typing import Dict, List, Union
 
 logger = logging.getLogger(__name__)
 
+# ClinVar annotation field → output column
+CLINVAR_COLUMNS = {
+    'clinical_significance': 'clinical_significance',
+    'phenotype_list': 'phenotypes',
+    'rcv_accession': 'rcv_accession',
+}
+
 
 class AnnotationSynthesizer:
     """
@@ -47,7 +56,7 @@ class AnnotationSynthesizer:
     def synthesize(
         self,
         variants_df: pd.DataFrame,
-        clinvar_annotations: Dict[str, Dict[str, str]],
+        clinvar_annotations: Union[Dict[str, Dict[str, str]], pd.DataFrame],
         snpedia_data: Dict[str, Dict],
         frequency_data: Dict[str, float]
     ) -> pd.DataFrame:
@@ -56,62 +65,48 @@ class AnnotationSynthesizer:
         
         Args:
             variants_df: DataFrame with rsid and genotype (from Layer 0)
-            clinvar_annotations: Dict mapping rsid → {clinical_significance, phenotype_list, rcv_accession}
+            clinvar_annotations: Dict mapping rsid → {clinical_significance, phenotype_list, rcv_accession},
+                or a DataFrame with those columns and rsid (ClinVarAnnotator.annotate_dataframe)
             snpedia_data: Dict mapping rsid → {extract, categories, url, source}
             frequency_data: Dict mapping rsid → frequency (float or None)
             
         Returns:
             DataFrame with all annotations merged
         """
-        # Start with variants DataFrame (include chrom and pos if available)
+        # Start with variants DataFrame (include chrom and pos if available).
+        # Columns are only added or replaced below, never written in place,
+        # so a shallow copy leaves variants_df untouched
         if 'chrom' in variants_df.columns and 'pos' in variants_df.columns:
-            result = variants_df[['rsid', 'chrom', 'pos', 'genotype']].copy()
+            result = variants_df[['rsid', 'chrom', 'pos', 'genotype']].copy(deep=False)
         else:
-            result = variants_df[['rsid', 'genotype']].copy()
+            result = variants_df[['rsid', 'genotype']].copy(deep=False)
             result['chrom'] = ''
             result['pos'] = 0
         
-        # Add ClinVar annotations
-        result['clinical_significance'] = result['rsid'].map(
-            lambda x: clinvar_annotations.get(x, {}).get('clinical_significance', '')
-        )
-        result['phenotypes'] = result['rsid'].map(
-            lambda x: clinvar_annotations.get(x, {}).get('phenotype_list', '')
-        )
-        result['rcv_accession'] = result['rsid'].map(
-            lambda x: clinvar_annotations.get(x, {}).get('rcv_accession', '')
-        )
-        
-        # Add SNPedia data
-        result['snpedia_narrative'] = result['rsid'].map(
-            lambda x: snpedia_data.get(x, {}).get('extract', '')
-        )
-        result['snpedia_categories'] = result['rsid'].map(
-            lambda x: ', '.join(snpedia_data.get(x, {}).get('categories', []))
-        )
-        result['snpedia_url'] = result['rsid'].map(
-            lambda x: snpedia_data.get(x, {}).get('url', '')
-        )
-        
-        # Add population frequency
-        result['population_frequency'] = result['rsid'].map(
-            lambda x: frequency_data.get(x)
-        )
+        # Each source becomes an rsid-indexed frame, left-joined on rsid by a
+        # hash lookup (reindex). Dict keys are unique, so the join is
+        # many-to-one by construction; unmatched rows get NaN, filled below
+        rsids = pd.Index(result['rsid'].to_numpy(dtype=object))
+        for source in (
+            self._clinvar_frame(clinvar_annotations),
+            self._snpedia_frame(snpedia_data),
+            pd.Series(frequency_data, name='population_frequency', dtype='float64').to_frame(),
+        ):
+            aligned = source.reindex(rsids)
+            # Move the backing arrays over as-is: going through to_numpy()
+            # would box every string to an object array only for pandas to
+            # convert it back to its string dtype on assignment
+            for col in aligned.columns:
+                result[col] = aligned[col].array
         
-        # Ensure all required columns exist (fill with empty/defaults)
-        for col in self.OUTPUT_COLUMNS:
-            if col not in result.columns:
-                result[col] = '' if col != 'population_frequency' else None
-        
-        # Reorder columns to match OUTPUT_COLUMNS
-        result = result[self.OUTPUT_COLUMNS]
+        # Select and order OUTPUT_COLUMNS in one pass; any missing column comes
+        # back as NaN (strings are filled with '' below, frequency stays null)
+        result = result.reindex(columns=self.OUTPUT_COLUMNS)
         
         # Ensure string columns are strings (not object dtype with None)
         string_cols = ['rsid', 'chrom', 'genotype', 'clinical_significance', 'phenotypes',
                       'rcv_accession', 'snpedia_narrative', 'snpedia_categories', 'snpedia_url']
-        for col in string_cols:
-            if col in result.columns:
-                result[col] = result[col].fillna('').astype(str)
+        result[string_cols] = result[string_cols].fillna('').astype(str)
         
         # Ensure pos is integer
         if 'pos' in result.columns:
@@ -121,6 +116,35 @@ class AnnotationSynthesizer:
         
         return result
     
+    def _clinvar_frame(self, clinvar_annotations: Union[Dict[str, Dict[str, str]], pd.DataFrame]) -> pd.DataFrame:
+        """ClinVar annotations as a DataFrame indexed by rsid."""
+        if isinstance(clinvar_annotations, pd.DataFrame):
+            frame = clinvar_annotations.drop_duplicates('rsid').set_index('rsid')
+            return frame[list(CLINVAR_COLUMNS)].rename(columns=CLINVAR_COLUMNS)
+        
+        # Walk keys and values once, in dict order, instead of re-probing
+        # the dict by rsid for every field
+        annotations = list(clinvar_annotations.values())
+        return pd.DataFrame(
+            {
+                column: [annotation.get(field, '') for annotation in annotations]
+                for field, column in CLINVAR_COLUMNS.items()
+            },
+            index=pd.Index(list(clinvar_annotations), dtype=object)
+        )
+    
+    def _snpedia_frame(self, snpedia_data: Dict[str, Dict]) -> pd.DataFrame:
+        """SNPedia data as a DataFrame indexed by rsid (categories joined once per rsid)."""
+        entries = list(snpedia_data.values())
+        return pd.DataFrame(
+            {
+                'snpedia_narrative': [entry.get('extract', '') for entry in entries],
+                'snpedia_categories': [', '.join(entry.get('categories', [])) for entry in entries],
+                'snpedia_url': [entry.get('url', '') for entry in entries],
+            },
+            index=pd.Index(list(snpedia_data), dtype=object)
+        )
+    
     def export_to_csv(self, df: pd.DataFrame, output_path: str) -> None:
         """
         Export DataFrame to CSV.
@@ -129,7 +153,13 @@ class AnnotationSynthesizer:
             df: DataFrame to export
             output_path: Path to output CSV file
         """
-        df.to_csv(output_path, index=False)
+        # Arrow's native CSV writer; NaN/None are written as empty fields.
+        # Quote only fields that need it (commas, quotes, newlines), as to_csv did
+        pacsv.write_csv(
+            pa.Table.from_pandas(df, preserve_index=False),
+            output_path,
+            write_options=pacsv.WriteOptions(quoting_style='needed')
+        )
         logger.info(f"Exported {len(df)} variants to {output_path}")
     
     def export_to_json(self, df: pd.DataFrame, output_path: str) -> None:
@@ -140,12 +170,9 @@ class AnnotationSynthesizer:
             df: DataFrame to export
             output_path: Path to output JSON file
         """
-        # Convert to records format for JSON
-        df_clean = df.copy()
-        
-        # Convert None to null for JSON
-        df_clean['population_frequency'] = df_clean['population_frequency'].fillna(None)
-        
-        df_clean.to_json(output_path, orient='records', indent=2)
+        # Records format; missing frequencies (NaN/None) are written as null.
+        # Writing to an open handle avoids the path-based write's extra buffer
+        with open(output_path, 'wb') as f:
+            df.to_json(f, orient='records', indent=2)
         logger.info(f"Exported {len(df)} variants to {output_path}")
 
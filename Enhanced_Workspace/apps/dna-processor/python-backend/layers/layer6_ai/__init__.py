@@ -7,8 +7,8 @@ AI is allowed to: summarize, rephrase, group traits, suggest follow-up
 AI is NOT allowed to: diagnose, prescribe, invent facts, override source data
 """
 
-from .interpreter import AIInterpreter
+from .interpreter import AIInterpreter, get_interpreter
 from .providers import AIProvider, OpenAIProvider, AnthropicProvider, LocalProvider, create_provider
 
-__all__ = ["AIInterpreter", "AIProvider", "OpenAIProvider", "AnthropicProvider", "LocalProvider", "create_provider"]
+__all__ = ["AIInterpreter", "get_interpreter", "AIProvider", "OpenAIProvider", "AnthropicProvider", "LocalProvider", "create_provider"]
 
@@ -11,19 +11,78 @@ Constraints:
 - Must gracefully degrade on failure
 """
 
+import asyncio
+import hashlib
 import json
 import logging
-from typing import Dict, List, Optional
+import sqlite3
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 import pandas as pd
 
 from config.settings import (
-    AI_ENABLED, AI_PROVIDER, AI_API_KEY, AI_MODEL, AI_MAX_TOKENS,
-    ANTHROPIC_API_KEY, ANTHROPIC_MODEL
+    AI_ENABLED, AI_PROVIDER, AI_API_KEY, AI_MODEL, AI_MAX_TOKENS, AI_MAX_CONCURRENT_REQUESTS,
+    AI_SUMMARY_CACHE_FILE, ANTHROPIC_API_KEY, ANTHROPIC_MODEL, SQLITE_BATCH_CHUNK_SIZE
 )
 from layers.layer6_ai.providers import create_provider, AIProvider
 
 logger = logging.getLogger(__name__)
 
+# The only fields the summary prompt uses; everything else is wasted tokens
+PROMPT_FIELDS = ['rsid', 'clinical_significance', 'phenotypes']
+
+# Fields that give the model something to summarize
+ANNOTATION_FIELDS = ['clinical_significance', 'phenotypes']
+
+
+class SummaryCache:
+    """
+    SQLite-backed store of AI summaries keyed by annotation hash.
+    
+    Identical (model, rsid, annotations) inputs are summarized once and
+    served from disk on every later run.
+    """
+    
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open the cache database on first use."""
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS summaries (key TEXT PRIMARY KEY, summary TEXT NOT NULL) WITHOUT ROWID"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+    
+    def get_many(self, keys: List[str]) -> Dict[str, str]:
+        """Return cached summaries for the keys that have one."""
+        found: Dict[str, str] = {}
+        with self._lock:
+            conn = self._connect()
+            for i in range(0, len(keys), SQLITE_BATCH_CHUNK_SIZE):
+                batch = keys[i:i + SQLITE_BATCH_CHUNK_SIZE]
+                placeholders = ','.join('?' * len(batch))
+                found.update(conn.execute(
+                    f"SELECT key, summary FROM summaries WHERE key IN ({placeholders})", batch
+                ))
+        return found
+    
+    def put_many(self, items: Iterable[Tuple[str, str]]):
+        """Store (key, summary) pairs, replacing existing entries."""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.executemany("INSERT OR REPLACE INTO summaries (key, summary) VALUES (?, ?)", items)
+
 
 class AIInterpreter:
     """
@@ -37,7 +96,8 @@ class AIInterpreter:
         self,
         provider_name: Optional[str] = None,
         api_key: Optional[str] = None,
-        model: Optional[str] = None
+        model: Optional[str] = None,
+        cache_file: Optional[Path] = None
     ):
         """
         Initialize AI interpreter.
@@ -46,11 +106,14 @@ class AIInterpreter:
             provider_name: Provider name ("openai", "anthropic", "local")
             api_key: API key (provider-specific)
             model: Model name (provider-specific)
+            cache_file: SQLite file for cached summaries (default from settings)
         """
         self.provider_name = provider_name or AI_PROVIDER
         self.api_key = api_key or AI_API_KEY
         self.model = model or (AI_MODEL if self.provider_name == "openai" else ANTHROPIC_MODEL)
         self.max_tokens = AI_MAX_TOKENS
+        self.max_concurrent_requests = AI_MAX_CONCURRENT_REQUESTS
+        self.summary_cache = SummaryCache(cache_file or AI_SUMMARY_CACHE_FILE)
         
         # Determine API key based on provider
         if self.provider_name == "anthropic":
@@ -66,10 +129,11 @@ class AIInterpreter:
             max_tokens=self.max_tokens
         )
         
-        self.enabled = AI_ENABLED and self.provider.is_available()
+        available = self.provider.is_available()
+        self.enabled = AI_ENABLED and available
         
         if not self.enabled:
-            logger.info(f"AI Interpreter is disabled (provider: {self.provider_name}, available: {self.provider.is_available()})")
+            logger.info(f"AI Interpreter is disabled (provider: {self.provider_name}, available: {available})")
     
     def summarize_variants(
         self,
@@ -89,28 +153,152 @@ class AIInterpreter:
         if not self.enabled:
             return {}
         
-        summaries = {}
+        summaries, misses, miss_keys = self._split_cached(variants_df)
+        if misses.empty:
+            return summaries
+        
+        chunks = [misses.iloc[i:i + chunk_size] for i in range(0, len(misses), chunk_size)]
+        
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # Chunks are independent: request them concurrently
+            results = asyncio.run(self._summarize_chunks(chunks))
+        else:
+            # Called from inside an event loop (asyncio.run can't nest): one at a time
+            results = [self._summarize_chunk(chunk) for chunk in chunks]
         
-        # Process in chunks
-        for i in range(0, len(variants_df), chunk_size):
-            chunk = variants_df.iloc[i:i + chunk_size]
-            chunk_summaries = self._summarize_chunk(chunk)
-            summaries.update(chunk_summaries)
+        new_summaries = {}
+        for chunk_summaries in results:
+            new_summaries.update(chunk_summaries)
+        self._cache_summaries(miss_keys, new_summaries.items())
         
+        summaries.update(new_summaries)
         return summaries
     
+    def iter_summaries(
+        self,
+        variants_df: pd.DataFrame,
+        chunk_size: int = 50
+    ) -> Iterator[Tuple[str, str]]:
+        """
+        Yield (rsid, summary) pairs as they become available.
+        
+        Cached summaries come first; the rest are streamed from the provider
+        chunk by chunk, so a caller can show each summary as soon as the
+        model has written it instead of waiting for the whole batch.
+        
+        Args:
+            variants_df: DataFrame with variant annotations
+            chunk_size: Number of variants per chunk
+        """
+        if not self.enabled:
+            return
+        
+        summaries, misses, miss_keys = self._split_cached(variants_df)
+        yield from summaries.items()
+        
+        for start in range(0, len(misses), chunk_size):
+            chunk_df = misses.iloc[start:start + chunk_size]
+            streamed = []
+            try:
+                for rsid, summary in self.provider.generate_summary_stream(self._chunk_records(chunk_df)):
+                    streamed.append((rsid, summary))
+                    yield rsid, summary
+            except Exception as e:
+                logger.warning(f"AI summarization failed: {e}")
+            finally:
+                self._cache_summaries(miss_keys, streamed)
+    
+    def _split_cached(self, variants_df: pd.DataFrame) -> Tuple[Dict[str, str], pd.DataFrame, Dict[str, str]]:
+        """
+        Split annotated variants into cached summaries and rows still to summarize.
+        
+        Returns:
+            (rsid → cached summary, uncached rows, rsid → cache key for those rows)
+        """
+        # Un-annotated variants (most of a genotype file) have nothing to
+        # summarize, so only annotated rows are sent
+        variants_df = variants_df[_annotated_mask(variants_df)]
+        if variants_df.empty:
+            return {}, variants_df, {}
+        
+        # Serve previously summarized inputs from the disk cache; only
+        # misses go to the provider
+        keys = self._summary_keys(variants_df)
+        cached = self.summary_cache.get_many(keys.unique().tolist())
+        hit = keys.isin(cached).to_numpy()
+        
+        summaries = dict(zip(variants_df.loc[hit, 'rsid'], keys[hit].map(cached)))
+        misses = variants_df.loc[~hit]
+        return summaries, misses, dict(zip(misses['rsid'], keys[~hit]))
+    
+    def _cache_summaries(self, miss_keys: Dict[str, str], summaries: Iterable[Tuple[str, str]]):
+        """Store new summaries for requested rsids (failures are only logged)."""
+        new_entries = [
+            (miss_keys[rsid], summary)
+            for rsid, summary in summaries
+            if rsid in miss_keys and isinstance(summary, str)
+        ]
+        if not new_entries:
+            return
+        
+        try:
+            self.summary_cache.put_many(new_entries)
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to cache AI summaries: {e}")
+    
+    def _summary_keys(self, variants_df: pd.DataFrame) -> pd.Series:
+        """Cache key per row: hash of model, rsid and the annotation fields."""
+        fields = [variants_df['rsid'].astype(str)]
+        for col in ANNOTATION_FIELDS:
+            if col in variants_df.columns:
+                fields.append(variants_df[col].fillna('').astype(str))
+            else:
+                fields.append(pd.Series('', index=variants_df.index))
+        
+        model = str(self.model)
+        keys = [
+            hashlib.blake2b('|'.join((model,) + row).encode(), digest_size=16).hexdigest()
+            for row in zip(*(field.to_numpy() for field in fields))
+        ]
+        return pd.Series(keys, index=variants_df.index, dtype=object)
+    
+    async def _summarize_chunks(self, chunks: List[pd.DataFrame]) -> List[Dict[str, str]]:
+        """Summarize chunks concurrently (bounded), returning results in chunk order."""
+        semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+        
+        async def summarize(chunk: pd.DataFrame) -> Dict[str, str]:
+            async with semaphore:
+                return await self._summarize_chunk_async(chunk)
+        
+        return await asyncio.gather(*(summarize(chunk) for chunk in chunks))
+    
+    async def _summarize_chunk_async(self, chunk_df: pd.DataFrame) -> Dict[str, str]:
+        """Async version of _summarize_chunk (empty dict on failure)."""
+        if not _annotated_mask(chunk_df).any():
+            return {}
+        
+        try:
+            return await self.provider.generate_summary_async(self._chunk_records(chunk_df))
+        except Exception as e:
+            logger.warning(f"AI summarization failed: {e}")
+        
+        return {}
+    
     def _summarize_chunk(self, chunk_df: pd.DataFrame) -> Dict[str, str]:
         """
         Summarize a chunk of variants using the configured provider.
         
-        Returns empty dict on failure (graceful degradation).
+        Returns empty dict on failure (graceful degradation) and without a
+        provider call when no variant in the chunk is annotated.
         """
+        if not _annotated_mask(chunk_df).any():
+            return {}
+        
         try:
-            # Convert chunk to records for provider
-            records = chunk_df.to_dict('records')
-            
             # Use provider to generate summaries
-            summaries = self.provider.generate_summary(records)
+            summaries = self.provider.generate_summary(self._chunk_records(chunk_df))
             return summaries
             
         except Exception as e:
@@ -118,7 +306,35 @@ class AIInterpreter:
         
         return {}
     
+    def _chunk_records(self, chunk_df: pd.DataFrame) -> List[Dict]:
+        """Records for the provider, projected to the fields the prompt uses."""
+        columns = [col for col in PROMPT_FIELDS if col in chunk_df.columns]
+        return chunk_df[columns].to_dict('records')
+    
     def is_enabled(self) -> bool:
         """Check if AI interpreter is enabled."""
         return self.enabled
 
+
+def _annotated_mask(df: pd.DataFrame) -> pd.Series:
+    """Rows with a non-empty clinical significance or phenotypes value."""
+    mask = pd.Series(False, index=df.index)
+    for col in ANNOTATION_FIELDS:
+        if col in df.columns:
+            mask |= df[col].fillna('').astype(bool)
+    return mask
+
+
+@lru_cache(maxsize=4)
+def get_interpreter(
+    provider_name: Optional[str] = None,
+    api_key: Optional[str] = None,
+    model: Optional[str] = None
+) -> AIInterpreter:
+    """
+    Get a shared AIInterpreter for the given settings.
+    
+    Provider SDK import and client construction happen once per
+    (provider, key, model) instead of on every widget/pipeline build.
+    """
+    return AIInterpreter(provider_name=provider_name, api_key=api_key, model=model)
@@ -4,10 +4,12 @@ AI Provider implementations for different AI services.
 Supports OpenAI, Anthropic, and provides interface for local models.
 """
 
+import asyncio
 import json
+import orjson
 import logging
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 import pandas as pd
 
 logger = logging.getLogger(__name__)
@@ -33,6 +35,88 @@ class AIProvider(ABC):
     def is_available(self) -> bool:
         """Check if provider is available (API key set, etc.)."""
         pass
+    
+    async def generate_summary_async(self, variants: List[Dict]) -> Dict[str, str]:
+        """
+        Async version of generate_summary, so chunks can be requested concurrently.
+        
+        Defaults to running generate_summary in a worker thread; providers
+        with an async SDK client override this.
+        """
+        return await asyncio.to_thread(self.generate_summary, variants)
+    
+    def generate_summary_stream(self, variants: List[Dict]) -> Iterator[Tuple[str, str]]:
+        """
+        Yield (rsid, summary) pairs as the provider produces them.
+        
+        Defaults to yielding the complete generate_summary result; providers
+        with a streaming API override this.
+        """
+        yield from self.generate_summary(variants).items()
+
+
+def _iter_json_object_items(fragments: Iterable[str]) -> Iterator[Tuple[str, str]]:
+    """
+    Incrementally parse a streamed flat JSON object, yielding each
+    (key, value) pair as soon as it is complete. Values are returned as str.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    started = False
+    
+    for fragment in fragments:
+        buffer += fragment
+        while True:
+            # Skip whitespace and separators up to the next key
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                pos += 1
+            if pos >= len(buffer):
+                break
+            if not started:
+                if buffer[pos] != '{':
+                    raise ValueError(f"Expected JSON object, got {buffer[pos]!r}")
+                started = True
+                pos += 1
+                continue
+            if buffer[pos] == '}':
+                return
+            
+            # Parse "key": value, or wait for more data if it is incomplete
+            try:
+                key, end = decoder.raw_decode(buffer, pos)
+                end = _skip_whitespace(buffer, end)
+                if end >= len(buffer):
+                    break
+                if buffer[end] != ':':
+                    raise ValueError(f"Expected ':' after key {key!r}")
+                value_start = _skip_whitespace(buffer, end + 1)
+                if value_start >= len(buffer):
+                    break
+                value, end = decoder.raw_decode(buffer, value_start)
+            except json.JSONDecodeError:
+                break
+            
+            # A number is only complete once the following separator arrived
+            # ("1." would otherwise decode as 1)
+            if not isinstance(value, (str, dict, list)):
+                next_pos = _skip_whitespace(buffer, end)
+                if next_pos >= len(buffer) or buffer[next_pos] not in ',}':
+                    break
+            
+            yield str(key), str(value)
+            pos = end
+        
+        # Drop the consumed prefix so the buffer only holds the pending pair
+        buffer = buffer[pos:]
+        pos = 0
+
+
+def _skip_whitespace(text: str, pos: int) -> int:
+    """Index of the first non-whitespace character at or after pos."""
+    while pos < len(text) and text[pos] in ' \t\r\n':
+        pos += 1
+    return pos
 
 
 class OpenAIProvider(AIProvider):
@@ -43,6 +127,8 @@ class OpenAIProvider(AIProvider):
         self.model = model
         self.max_tokens = max_tokens
         self._client = None
+        self._async_client = None
+        self._async_loop = None
         
         if api_key:
             try:
@@ -64,18 +150,24 @@ class OpenAIProvider(AIProvider):
             return {}
         
         try:
-            prompt = self._build_prompt(variants)
+            response = self._client.chat.completions.create(**self._request(variants))
             
-            response = self._client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a genomics information assistant. Provide brief, factual summaries of genetic variants based on the provided clinical data. Do not diagnose or provide medical advice."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=self.max_tokens,
-                response_format={"type": "json_object"},
-                temperature=0.3
-            )
+            content = response.choices[0].message.content
+            return self._parse_response(content)
+            
+        except Exception as e:
+            logger.error(f"OpenAI API call failed: {e}")
+            return {}
+    
+    async def generate_summary_async(self, variants: List[Dict]) -> Dict[str, str]:
+        """Generate summaries using the async OpenAI client."""
+        if not self.is_available():
+            logger.warning("OpenAI provider not available")
+            return {}
+        
+        try:
+            client = self._get_async_client()
+            response = await client.chat.completions.create(**self._request(variants))
             
             content = response.choices[0].message.content
             return self._parse_response(content)
@@ -84,6 +176,46 @@ class OpenAIProvider(AIProvider):
             logger.error(f"OpenAI API call failed: {e}")
             return {}
     
+    def generate_summary_stream(self, variants: List[Dict]) -> Iterator[Tuple[str, str]]:
+        """Stream summaries, yielding each variant's as soon as its JSON pair is complete."""
+        if not self.is_available():
+            logger.warning("OpenAI provider not available")
+            return
+        
+        try:
+            stream = self._client.chat.completions.create(**self._request(variants), stream=True)
+            fragments = (
+                chunk.choices[0].delta.content or ""
+                for chunk in stream
+                if chunk.choices
+            )
+            yield from _iter_json_object_items(fragments)
+            
+        except Exception as e:
+            logger.error(f"OpenAI streaming API call failed: {e}")
+    
+    def _get_async_client(self):
+        """Async client bound to the running event loop (recreated for a new loop)."""
+        loop = asyncio.get_running_loop()
+        if self._async_loop is not loop:
+            import openai
+            self._async_client = openai.AsyncOpenAI(api_key=self.api_key)
+            self._async_loop = loop
+        return self._async_client
+    
+    def _request(self, variants: List[Dict]) -> Dict:
+        """Keyword arguments for chat.completions.create."""
+        return dict(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": "You are a genomics information assistant. Provide brief, factual summaries of genetic variants based on the provided clinical data. Do not diagnose or provide medical advice."},
+                {"role": "user", "content": self._build_prompt(variants)}
+            ],
+            max_tokens=self.max_tokens,
+            response_format={"type": "json_object"},
+            temperature=0.3
+        )
+    
     def _build_prompt(self, variants: List[Dict]) -> str:
         """Build prompt for AI."""
         prompt = """Provide brief, factual summaries for the following genetic variants.
@@ -102,17 +234,17 @@ Please respond with a JSON object mapping each RSID to its summary:
 {{
   "rs123": "Brief summary here...",
   "rs456": "Brief summary here..."
-}}""".format(json.dumps(variants, indent=2))
+}}""".format(orjson.dumps(variants).decode())
         
         return prompt
     
     def _parse_response(self, response: str) -> Dict[str, str]:
         """Parse AI response JSON."""
         try:
-            data = json.loads(response)
+            data = orjson.loads(response)
             if isinstance(data, dict):
                 return {str(k): str(v) for k, v in data.items()}
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(f"Failed to parse AI response as JSON: {e}")
         
         return {}
@@ -126,6 +258,8 @@ class AnthropicProvider(AIProvider):
         self.model = model
         self.max_tokens = max_tokens
         self._client = None
+        self._async_client = None
+        self._async_loop = None
         
         if api_key:
             try:
@@ -147,16 +281,24 @@ class AnthropicProvider(AIProvider):
             return {}
         
         try:
-            prompt = self._build_prompt(variants)
+            message = self._client.messages.create(**self._request(variants))
             
-            message = self._client.messages.create(
-                model=self.model,
-                max_tokens=self.max_tokens,
-                temperature=0.3,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ]
-            )
+            content = message.content[0].text if message.content else ""
+            return self._parse_response(content)
+            
+        except Exception as e:
+            logger.error(f"Anthropic API call failed: {e}")
+            return {}
+    
+    async def generate_summary_async(self, variants: List[Dict]) -> Dict[str, str]:
+        """Generate summaries using the async Anthropic client."""
+        if not self.is_available():
+            logger.warning("Anthropic provider not available")
+            return {}
+        
+        try:
+            client = self._get_async_client()
+            message = await client.messages.create(**self._request(variants))
             
             content = message.content[0].text if message.content else ""
             return self._parse_response(content)
@@ -165,6 +307,26 @@ class AnthropicProvider(AIProvider):
             logger.error(f"Anthropic API call failed: {e}")
             return {}
     
+    def _get_async_client(self):
+        """Async client bound to the running event loop (recreated for a new loop)."""
+        loop = asyncio.get_running_loop()
+        if self._async_loop is not loop:
+            import anthropic
+            self._async_client = anthropic.AsyncAnthropic(api_key=self.api_key)
+            self._async_loop = loop
+        return self._async_client
+    
+    def _request(self, variants: List[Dict]) -> Dict:
+        """Keyword arguments for messages.create."""
+        return dict(
+            model=self.model,
+            max_tokens=self.max_tokens,
+            temperature=0.3,
+            messages=[
+                {"role": "user", "content": self._build_prompt(variants)}
+            ]
+        )
+    
     def _build_prompt(self, variants: List[Dict]) -> str:
         """Build prompt for AI."""
         prompt = """Provide brief, factual summaries for the following genetic variants.
@@ -184,7 +346,7 @@ Please respond with a JSON object mapping each RSID to its summary:
 {{
   "rs123": "Brief summary here...",
   "rs456": "Brief summary here..."
-}}""".format(json.dumps(variants, indent=2))
+}}""".format(orjson.dumps(variants).decode())
         
         return prompt
     
@@ -201,10 +363,10 @@ Please respond with a JSON object mapping each RSID to its summary:
                 end = response.find("```", start)
                 response = response[start:end].strip()
             
-            data = json.loads(response)
+            data = orjson.loads(response)
             if isinstance(data, dict):
                 return {str(k): str(v) for k, v in data.items()}
-        except (json.JSONDecodeError, ValueError) as e:
+        except (orjson.JSONDecodeError, ValueError) as e:
             logger.error(f"Failed to parse Anthropic response as JSON: {e}")
         
         return {}
@@ -5,75 +5,96 @@ Provides chat-style interface for asking questions about variant data.
 """
 
 import logging
-from typing import Optional, List, Dict
+import queue
+from typing import Optional, List, Dict, Tuple
 import pandas as pd
 from PyQt6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QTextEdit, QLineEdit,
+    QApplication, QWidget, QVBoxLayout, QHBoxLayout, QPlainTextEdit, QLineEdit,
     QPushButton, QLabel, QScrollArea
 )
 from PyQt6.QtCore import QThread, pyqtSignal, Qt
-from PyQt6.QtGui import QTextCharFormat, QColor
 
-from layers.layer6_ai.interpreter import AIInterpreter
+from layers.layer6_ai.interpreter import AIInterpreter, get_interpreter
 from config.settings import AI_ENABLED, AI_PROVIDER
 
 logger = logging.getLogger(__name__)
 
 
 class AIQAResponseWorker(QThread):
-    """Worker thread for generating AI responses."""
+    """
+    Long-lived worker thread for generating AI responses.
+    
+    Questions are queued with submit() and answered in order; one thread
+    serves the whole session instead of one thread per question.
+    """
     
     response_ready = pyqtSignal(str, bool)  # message, is_user
+    request_done = pyqtSignal()  # emitted after each question is handled
     
-    def __init__(self, question: str, context_df: pd.DataFrame, ai_interpreter: AIInterpreter):
+    def __init__(self, ai_interpreter: AIInterpreter):
         super().__init__()
-        self.question = question
-        self.context_df = context_df
         self.ai_interpreter = ai_interpreter
+        self.queue: "queue.Queue[Optional[Tuple[str, pd.DataFrame]]]" = queue.Queue()
+    
+    def submit(self, question: str, context_df: pd.DataFrame):
+        """Queue a question for the worker."""
+        self.queue.put((question, context_df))
+    
+    def stop(self):
+        """Ask the worker to exit after pending questions and wait for it."""
+        self.queue.put(None)
+        self.wait()
     
     def run(self):
-        """Generate AI response in background."""
-        try:
-            # Build context from DataFrame
-            context = self._build_context()
-            
-            # Generate response (simplified - in real implementation, would use question + context)
-            # For now, we'll use the AI interpreter to summarize the variants as context
-            response = self._generate_response(self.question, context)
-            
-            self.response_ready.emit(response, False)
+        """Answer queued questions in background until stopped."""
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
             
-        except Exception as e:
-            logger.error(f"AI Q&A error: {e}", exc_info=True)
-            self.response_ready.emit(
-                f"Error generating response: {str(e)}\n\nNote: AI Q&A requires API key configuration.",
-                False
-            )
+            question, context_df = item
+            try:
+                # Build context from DataFrame
+                context = self._build_context(context_df)
+                
+                # Generate response (simplified - in real implementation, would use question + context)
+                # For now, we'll use the AI interpreter to summarize the variants as context
+                response = self._generate_response(question, context)
+                
+                self.response_ready.emit(response, False)
+                
+            except Exception as e:
+                logger.error(f"AI Q&A error: {e}", exc_info=True)
+                self.response_ready.emit(
+                    f"Error generating response: {str(e)}\n\nNote: AI Q&A requires API key configuration.",
+                    False
+                )
+            finally:
+                self.request_done.emit()
     
-    def _build_context(self) -> str:
+    def _build_context(self, context_df: pd.DataFrame) -> str:
         """Build context string from DataFrame."""
-        if self.context_df.empty:
+        if context_df.empty:
             return "No variant data available."
         
         # Summarize the data
-        total = len(self.context_df)
-        sig_count = len(self.context_df[self.context_df['clinical_significance'].notna() & 
-                                       (self.context_df['clinical_significance'] != '')])
+        total = len(context_df)
+        significance = context_df['clinical_significance']
+        has_significance = significance.notna() & (significance != '')
+        sig_count = int(has_significance.sum())
         
         context = f"Analyzing {total} variants, {sig_count} with clinical significance data.\n\n"
         
         # Add sample of significant variants
-        sig_variants = self.context_df[
-            self.context_df['clinical_significance'].notna() & 
-            (self.context_df['clinical_significance'] != '')
-        ].head(10)
+        sig_variants = context_df.loc[has_significance].head(10)
         
         if not sig_variants.empty:
+            rsids = sig_variants['rsid'] if 'rsid' in sig_variants.columns else [''] * len(sig_variants)
             context += "Sample of significant variants:\n"
-            for _, row in sig_variants.iterrows():
-                rsid = row.get('rsid', '')
-                sig = row.get('clinical_significance', '')
-                context += f"- {rsid}: {sig}\n"
+            context += "".join(
+                f"- {rsid}: {sig}\n"
+                for rsid, sig in zip(rsids, sig_variants['clinical_significance'].to_numpy())
+            )
         
         return context
     
@@ -106,7 +127,7 @@ class AIQAWidget(QWidget):
     
     def __init__(self, ai_interpreter: Optional[AIInterpreter] = None):
         super().__init__()
-        self.ai_interpreter = ai_interpreter or AIInterpreter()
+        self.ai_interpreter = ai_interpreter or get_interpreter()
         self.conversation_history: List[Dict[str, str]] = []
         self.current_context_df: Optional[pd.DataFrame] = None
         self.response_worker: Optional[AIQAResponseWorker] = None
@@ -132,8 +153,8 @@ class AIQAWidget(QWidget):
         info_label.setStyleSheet("color: #666; font-style: italic;")
         layout.addWidget(info_label)
         
-        # Conversation area
-        self.conversation_area = QTextEdit()
+        # Conversation area (plain text: appends don't go through the HTML parser)
+        self.conversation_area = QPlainTextEdit()
         self.conversation_area.setReadOnly(True)
         self.conversation_area.setPlaceholderText("Ask a question about your variant data...")
         layout.addWidget(self.conversation_area)
@@ -215,34 +236,35 @@ class AIQAWidget(QWidget):
         self._add_message("You", question, is_user=True)
         self.input_field.clear()
         
-        # Start worker thread
+        # Hand the question to the (lazily started) worker thread
         context_df = self.current_context_df if self.current_context_df is not None else pd.DataFrame()
-        self.response_worker = AIQAResponseWorker(question, context_df, self.ai_interpreter)
-        self.response_worker.response_ready.connect(self._on_response_ready)
-        self.response_worker.finished.connect(lambda: self._on_worker_finished())
-        self.response_worker.start()
+        self._ensure_worker().submit(question, context_df)
+    
+    def _ensure_worker(self) -> AIQAResponseWorker:
+        """Start the persistent response worker on first use."""
+        if self.response_worker is None:
+            self.response_worker = AIQAResponseWorker(self.ai_interpreter)
+            self.response_worker.response_ready.connect(self._on_response_ready)
+            self.response_worker.request_done.connect(self._on_worker_finished)
+            app = QApplication.instance()
+            if app is not None:
+                app.aboutToQuit.connect(self.response_worker.stop)
+            self.response_worker.start()
+        return self.response_worker
     
     def _on_response_ready(self, response: str, is_user: bool):
         """Handle AI response."""
         self._add_message("AI Assistant", response, is_user=False)
     
     def _on_worker_finished(self):
-        """Handle worker thread completion."""
+        """Handle completion of a question by the worker."""
         self.input_field.setEnabled(True)
         self.send_button.setEnabled(self.ai_interpreter.enabled)
     
     def _add_message(self, sender: str, message: str, is_user: bool = False):
         """Add message to conversation."""
-        # Format message
-        if is_user:
-            formatted = f"<b>{sender}:</b> {message}<br><br>"
-            color = QColor(0, 100, 200)
-        else:
-            formatted = f"<b>{sender}:</b> {message}<br><br>"
-            color = QColor(50, 50, 50)
-        
         # Add to conversation area
-        self.conversation_area.append(formatted)
+        self.conversation_area.appendPlainText(f"{sender}: {message}\n")
         
         # Scroll to bottom
         scrollbar = self.conversation_area.verticalScrollBar()
@@ -257,7 +279,8 @@ class AIQAWidget(QWidget):
     
     def update_context(self, df: pd.DataFrame):
         """Update the context DataFrame for Q&A."""
-        self.current_context_df = df.copy()
+        # The widget only reads the context, so a shallow copy is enough
+        self.current_context_df = df.copy(deep=False)
         logger.debug(f"Updated AI Q&A context with {len(df)} variants")
     
     def clear_conversation(self):
@@ -2,233 +2,425 @@
 Data visualization widgets for variant data.
 
 Provides charts for frequency distributions, significance breakdowns, etc.
+
+Charts repaint with canvas.draw_idle(): Qt coalesces repeated requests into
+one Agg render at the next event-loop pass instead of rasterizing
+synchronously on every update/clear.
 """
 
+import numpy as np
 import pandas as pd
-import matplotlib
-# Use QtAgg backend which works with both Qt5 and Qt6
-matplotlib.use('QtAgg')
-from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QComboBox
-from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import QWidget, QVBoxLayout
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
 import logging
-from typing import Optional
+from functools import lru_cache
+from typing import Any, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+# The only columns the charts read
+CHART_COLUMNS = ['population_frequency', 'clinical_significance', 'chrom']
+
+# The significance chart shows at most this many categories; the rest become
+# one "Other" bar
+MAX_CHART_CATEGORIES = 20
+
+# Chromosomes always charted individually (with or without a "chr" prefix);
+# any other contig (chrUn_*, *_random, alt/decoy) is folded into "Other"
+PRIMARY_CHROMOSOMES = frozenset([str(i) for i in range(1, 23)] + ['X', 'Y', 'MT', 'M'])
 
-class FrequencyHistogramWidget(QWidget):
-    """Histogram widget for population frequency distribution."""
+
+@lru_cache(maxsize=None)
+def _matplotlib_classes():
+    """
+    Import matplotlib on first chart construction, not at GUI startup.
     
-    def __init__(self):
-        super().__init__()
-        self.figure = Figure(figsize=(10, 6))
-        self.canvas = FigureCanvas(self.figure)
-        self.ax = None
-        self._setup_ui()
+    Returns:
+        (Figure, FigureCanvas) classes for the QtAgg backend
+    """
+    import matplotlib
+    # Use QtAgg backend which works with both Qt5 and Qt6
+    matplotlib.use('QtAgg')
+    from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg
+    from matplotlib.figure import Figure
+    return Figure, FigureCanvasQTAgg
+
+
+def _column_fingerprint(values: pd.Series) -> Tuple[int, str, int]:
+    """
+    Cheap identity of a chart's input column: length, dtype and content hash.
     
-    def _setup_ui(self):
-        """Setup widget UI."""
-        layout = QVBoxLayout()
-        layout.setContentsMargins(0, 0, 0, 0)
-        
-        title = QLabel("Population Frequency Distribution")
-        title.setStyleSheet("font-weight: bold; font-size: 12pt;")
-        layout.addWidget(title)
-        
-        layout.addWidget(self.canvas)
-        self.setLayout(layout)
+    The hash is summed over rows, so it ignores row order, as the charts do.
+    """
+    content_hash = int(pd.util.hash_pandas_object(values, index=False).sum())
+    return len(values), str(values.dtype), content_hash
+
+
+def _label_missing(values: pd.Series, label: str) -> pd.Series:
+    """Replace missing (NaN/None) and empty-string values with label in one pass."""
+    return values.where(values.notna() & (values != ''), label)
+
+
+def _top_categories(counts: pd.Series, limit: int = MAX_CHART_CATEGORIES) -> pd.Series:
+    """Keep the `limit` largest categories (in their current order) and sum the rest into "Other"."""
+    if len(counts) <= limit:
+        return counts
     
-    def update_data(self, df: pd.DataFrame):
-        """Update histogram with new data."""
+    keep = counts.index.isin(counts.nlargest(limit, keep='first').index)
+    return pd.concat([counts[keep], pd.Series({'Other': counts[~keep].sum()})])
+
+
+def _fold_extra_contigs(counts: pd.Series) -> pd.Series:
+    """Keep primary chromosomes (and "Unknown") as-is and sum any other contigs into "Other"."""
+    names = counts.index.astype(str).str.upper().str.removeprefix('CHR')
+    keep = names.isin(PRIMARY_CHROMOSOMES) | (counts.index == 'Unknown')
+    if keep.all():
+        return counts
+    return pd.concat([counts[keep], pd.Series({'Other': counts[~keep].sum()})])
+
+
+def _draw_bar_chart(ax, bars, counts: pd.Series, color: str, xlabel: str, title: str):
+    """
+    Draw counts as a labelled bar chart on ax.
+    
+    The existing bars are updated in place when their number matches;
+    otherwise the axes is cleared and the bars are rebuilt.
+    
+    Returns:
+        The BarContainer now on the axes (pass it back on the next update)
+    """
+    heights = counts.to_numpy()
+    
+    if bars is not None and len(bars) == len(heights):
+        for bar, height in zip(bars, heights):
+            bar.set_height(height)
+        # Value labels are re-added below
+        for text in list(ax.texts):
+            text.remove()
+        ax.relim()
+        ax.autoscale_view()
+    else:
+        ax.clear()
+        positions = np.arange(len(heights))
+        bars = ax.bar(positions, heights, color=color, edgecolor='black')
+        ax.set_xticks(positions)
+        ax.set_xlabel(xlabel)
+        ax.set_ylabel('Number of Variants')
+        ax.set_title(title)
+        ax.grid(True, alpha=0.3, axis='y')
+    
+    # Stringify the categories in one vectorized pass
+    ax.set_xticklabels(counts.index.astype(str).tolist(), rotation=45)
+    
+    # Add value labels on bars (explicit labels: the container's own data
+    # values are fixed when the bars are created)
+    ax.bar_label(bars, labels=[str(height) for height in heights])
+    return bars
+
+
+class FrequencyHistogramChart:
+    """Histogram of population frequency distribution, drawn on a shared axes."""
+    
+    def __init__(self, ax):
+        # Persistent axes; updates reuse its bars when the shape allows
+        self.ax = ax
+        self._bars = None
+        self._last_fp: Optional[Tuple[int, str, int]] = None
+    
+    @staticmethod
+    def compute(df: pd.DataFrame) -> Tuple[Optional[Tuple[int, str, int]], Any]:
+        """
+        Bin the frequencies (pure, safe to run off the GUI thread).
+        
+        Returns:
+            (fingerprint, (counts, edges)), or (None, None) to clear the chart
+        """
         if df.empty or 'population_frequency' not in df.columns:
-            self._clear_chart()
-            return
+            return None, None
         
         # Filter out None/NaN frequencies
         frequencies = df['population_frequency'].dropna()
         
         if len(frequencies) == 0:
-            self._clear_chart()
-            return
+            return None, None
+        
+        # Bin with numpy and draw the bins as bars: same chart as ax.hist
+        # without matplotlib's per-bin patch bookkeeping
+        counts, edges = np.histogram(frequencies.to_numpy(dtype=np.float64), bins=50)
+        return _column_fingerprint(frequencies), (counts, edges)
+    
+    def render(self, fp: Optional[Tuple[int, str, int]], data: Any) -> bool:
+        """
+        Draw computed data on the axes (GUI thread).
         
-        self.figure.clear()
-        self.ax = self.figure.add_subplot(111)
+        Returns:
+            True if the axes changed and the canvas needs a repaint
+        """
+        if data is None:
+            return self._clear_chart()
         
-        # Create histogram
-        self.ax.hist(frequencies, bins=50, edgecolor='black', alpha=0.7)
-        self.ax.set_xlabel('Population Frequency')
-        self.ax.set_ylabel('Number of Variants')
-        self.ax.set_title('Distribution of Allele Frequencies')
-        self.ax.grid(True, alpha=0.3)
+        # Same data as the chart already shows: nothing to redraw
+        if fp == self._last_fp:
+            return False
+        self._last_fp = fp
         
-        self.canvas.draw()
-        logger.debug(f"Updated frequency histogram with {len(frequencies)} data points")
+        counts, edges = data
+        widths = np.diff(edges)
+        
+        if self._bars is None:
+            self._bars = self.ax.bar(edges[:-1], counts, width=widths, align='edge', edgecolor='black', alpha=0.7)
+            self.ax.set_xlabel('Population Frequency')
+            self.ax.set_ylabel('Number of Variants')
+            self.ax.set_title('Distribution of Allele Frequencies')
+            self.ax.grid(True, alpha=0.3)
+        else:
+            # Same number of bins every time: move the existing bars
+            for bar, x, width, height in zip(self._bars, edges[:-1], widths, counts):
+                bar.set_x(x)
+                bar.set_width(width)
+                bar.set_height(height)
+            self.ax.relim()
+            self.ax.autoscale_view()
+        
+        logger.debug(f"Updated frequency histogram with {int(counts.sum())} data points")
+        return True
+    
+    def update_data(self, df: pd.DataFrame) -> bool:
+        """Compute and draw on the calling thread (returns True if the axes changed)."""
+        return self.render(*self.compute(df))
     
-    def _clear_chart(self):
-        """Clear the chart."""
-        self.figure.clear()
-        self.canvas.draw()
+    def _clear_chart(self) -> bool:
+        """Clear the chart (returns True, the axes changed)."""
+        self._last_fp = None
+        self._bars = None
+        self.ax.clear()
+        return True
 
 
-class SignificanceBreakdownWidget(QWidget):
-    """Chart widget for clinical significance breakdown."""
+class SignificanceBreakdownChart:
+    """Bar chart of clinical significance breakdown, drawn on a shared axes."""
     
-    def __init__(self):
-        super().__init__()
-        self.figure = Figure(figsize=(10, 6))
-        self.canvas = FigureCanvas(self.figure)
-        self.ax = None
-        self._setup_ui()
+    def __init__(self, ax):
+        self.ax = ax
+        self._bars = None
+        self._last_fp: Optional[Tuple[int, str, int]] = None
     
-    def _setup_ui(self):
-        """Setup widget UI."""
-        layout = QVBoxLayout()
-        layout.setContentsMargins(0, 0, 0, 0)
-        
-        title = QLabel("Clinical Significance Breakdown")
-        title.setStyleSheet("font-weight: bold; font-size: 12pt;")
-        layout.addWidget(title)
+    @staticmethod
+    def compute(df: pd.DataFrame) -> Tuple[Optional[Tuple[int, str, int]], Any]:
+        """
+        Count significance categories (pure, safe to run off the GUI thread).
         
-        layout.addWidget(self.canvas)
-        self.setLayout(layout)
-    
-    def update_data(self, df: pd.DataFrame):
-        """Update chart with new data."""
+        Returns:
+            (fingerprint, counts), or (None, None) to clear the chart
+        """
         if df.empty or 'clinical_significance' not in df.columns:
-            self._clear_chart()
-            return
+            return None, None
         
-        # Count significance categories
-        significance = df['clinical_significance'].fillna('Not annotated')
-        significance = significance.replace('', 'Not annotated')
-        
-        # Get counts
-        counts = significance.value_counts()
+        # Count significance categories. The fingerprint is taken after
+        # normalization, so equivalent inputs (None vs '') don't force a redraw
+        significance = _label_missing(df['clinical_significance'], 'Not annotated')
+        counts = _top_categories(significance.value_counts())
         
         if len(counts) == 0:
-            self._clear_chart()
-            return
+            return None, None
+        return _column_fingerprint(significance), counts
+    
+    def render(self, fp: Optional[Tuple[int, str, int]], counts: Optional[pd.Series]) -> bool:
+        """
+        Draw computed counts on the axes (GUI thread).
         
-        self.figure.clear()
-        self.ax = self.figure.add_subplot(111)
+        Returns:
+            True if the axes changed and the canvas needs a repaint
+        """
+        if counts is None:
+            return self._clear_chart()
         
-        # Create bar chart
-        counts.plot(kind='bar', ax=self.ax, color='steelblue', edgecolor='black')
-        self.ax.set_xlabel('Clinical Significance')
-        self.ax.set_ylabel('Number of Variants')
-        self.ax.set_title('Variants by Clinical Significance')
-        self.ax.tick_params(axis='x', rotation=45)
-        self.ax.grid(True, alpha=0.3, axis='y')
+        if fp == self._last_fp:
+            return False
+        self._last_fp = fp
         
-        # Add value labels on bars
-        for i, v in enumerate(counts):
-            self.ax.text(i, v, str(v), ha='center', va='bottom')
+        # Create bar chart (directly on the axes, without pandas' plotting layer)
+        self._bars = _draw_bar_chart(
+            self.ax, self._bars, counts, color='steelblue',
+            xlabel='Clinical Significance', title='Variants by Clinical Significance'
+        )
         
-        self.figure.tight_layout()
-        self.canvas.draw()
         logger.debug(f"Updated significance breakdown with {len(counts)} categories")
+        return True
     
-    def _clear_chart(self):
-        """Clear the chart."""
-        self.figure.clear()
-        self.canvas.draw()
+    def update_data(self, df: pd.DataFrame) -> bool:
+        """Compute and draw on the calling thread (returns True if the axes changed)."""
+        return self.render(*self.compute(df))
+    
+    def _clear_chart(self) -> bool:
+        """Clear the chart (returns True, the axes changed)."""
+        self._last_fp = None
+        self._bars = None
+        self.ax.clear()
+        return True
 
 
-class ChromosomeDistributionWidget(QWidget):
-    """Chart widget for variant distribution by chromosome."""
+class ChromosomeDistributionChart:
+    """Bar chart of variant distribution by chromosome, drawn on a shared axes."""
     
-    def __init__(self):
-        super().__init__()
-        self.figure = Figure(figsize=(10, 6))
-        self.canvas = FigureCanvas(self.figure)
-        self.ax = None
-        self._setup_ui()
+    def __init__(self, ax):
+        self.ax = ax
+        self._bars = None
+        self._last_fp: Optional[Tuple[int, str, int]] = None
     
-    def _setup_ui(self):
-        """Setup widget UI."""
-        layout = QVBoxLayout()
-        layout.setContentsMargins(0, 0, 0, 0)
-        
-        title = QLabel("Variants by Chromosome")
-        title.setStyleSheet("font-weight: bold; font-size: 12pt;")
-        layout.addWidget(title)
+    @staticmethod
+    def compute(df: pd.DataFrame) -> Tuple[Optional[Tuple[int, str, int]], Any]:
+        """
+        Count variants per chromosome (pure, safe to run off the GUI thread).
         
-        layout.addWidget(self.canvas)
-        self.setLayout(layout)
-    
-    def update_data(self, df: pd.DataFrame):
-        """Update chart with new data."""
+        Returns:
+            (fingerprint, counts), or (None, None) to clear the chart
+        """
         if df.empty or 'chrom' not in df.columns:
-            self._clear_chart()
-            return
+            return None, None
         
         # Count variants per chromosome
-        chrom = df['chrom'].fillna('Unknown')
-        chrom = chrom.replace('', 'Unknown')
+        chrom = _label_missing(df['chrom'], 'Unknown')
         
-        counts = chrom.value_counts().sort_index()
+        # Ordered by chromosome below, so skip value_counts' sort by count
+        counts = _fold_extra_contigs(chrom.value_counts(sort=False).sort_index())
         
         if len(counts) == 0:
-            self._clear_chart()
-            return
+            return None, None
+        return _column_fingerprint(chrom), counts
+    
+    def render(self, fp: Optional[Tuple[int, str, int]], counts: Optional[pd.Series]) -> bool:
+        """
+        Draw computed counts on the axes (GUI thread).
         
-        self.figure.clear()
-        self.ax = self.figure.add_subplot(111)
+        Returns:
+            True if the axes changed and the canvas needs a repaint
+        """
+        if counts is None:
+            return self._clear_chart()
         
-        # Create bar chart
-        counts.plot(kind='bar', ax=self.ax, color='coral', edgecolor='black')
-        self.ax.set_xlabel('Chromosome')
-        self.ax.set_ylabel('Number of Variants')
-        self.ax.set_title('Variant Distribution by Chromosome')
-        self.ax.tick_params(axis='x', rotation=45)
-        self.ax.grid(True, alpha=0.3, axis='y')
+        if fp == self._last_fp:
+            return False
+        self._last_fp = fp
         
-        # Add value labels on bars
-        for i, v in enumerate(counts):
-            self.ax.text(i, v, str(v), ha='center', va='bottom')
+        # Create bar chart (directly on the axes, without pandas' plotting layer)
+        self._bars = _draw_bar_chart(
+            self.ax, self._bars, counts, color='coral',
+            xlabel='Chromosome', title='Variant Distribution by Chromosome'
+        )
         
-        self.figure.tight_layout()
-        self.canvas.draw()
         logger.debug(f"Updated chromosome distribution with {len(counts)} chromosomes")
+        return True
     
-    def _clear_chart(self):
-        """Clear the chart."""
-        self.figure.clear()
-        self.canvas.draw()
+    def update_data(self, df: pd.DataFrame) -> bool:
+        """Compute and draw on the calling thread (returns True if the axes changed)."""
+        return self.render(*self.compute(df))
+    
+    def _clear_chart(self) -> bool:
+        """Clear the chart (returns True, the axes changed)."""
+        self._last_fp = None
+        self._bars = None
+        self.ax.clear()
+        return True
+
+
+class _ChartSignals(QObject):
+    """Signals for _ChartWorker (QRunnable is not a QObject)."""
+    
+    computed = pyqtSignal(int, object)  # sequence number, [(fingerprint, data)] per chart
+
+
+class _ChartWorker(QRunnable):
+    """Runs the charts' compute step on a thread pool thread."""
+    
+    def __init__(self, sequence: int, df: pd.DataFrame, charts: List[Any]):
+        super().__init__()
+        self.sequence = sequence
+        self.df = df
+        self.charts = charts
+        self.signals = _ChartSignals()
+    
+    def run(self):
+        """Compute every chart's data and hand it back to the GUI thread."""
+        try:
+            results = [chart.compute(self.df) for chart in self.charts]
+        except Exception as e:
+            logger.error(f"Chart computation failed: {e}", exc_info=True)
+            return
+        self.signals.computed.emit(self.sequence, results)
 
 
 class ChartsTabWidget(QWidget):
-    """Tab widget containing all chart visualizations."""
+    """
+    Tab widget containing all chart visualizations.
+    
+    The charts share one Figure (three stacked subplots) and one canvas, so
+    an update is a single Agg buffer and a single repaint. Binning and
+    counting run on a thread pool; only drawing happens on the GUI thread.
+    """
     
     def __init__(self):
         super().__init__()
+        # Snapshot of the charted columns of the last update
         self.current_df: Optional[pd.DataFrame] = None
+        # Figure, canvas and charts are created (and matplotlib imported) on first data
+        self.figure = None
+        self.canvas = None
+        self.freq_hist: Optional[FrequencyHistogramChart] = None
+        self.sig_breakdown: Optional[SignificanceBreakdownChart] = None
+        self.chrom_dist: Optional[ChromosomeDistributionChart] = None
+        # Latest update; results of older, superseded updates are dropped
+        self._sequence = 0
+        self._worker: Optional[_ChartWorker] = None
         self._setup_ui()
     
     def _setup_ui(self):
         """Setup charts tab UI."""
         layout = QVBoxLayout()
         layout.setContentsMargins(10, 10, 10, 10)
+        self.setLayout(layout)
+    
+    def _ensure_charts(self):
+        """Create the shared figure, its canvas and the charts on first use."""
+        if self.figure is not None:
+            return
         
-        # Chart widgets
-        self.freq_hist = FrequencyHistogramWidget()
-        self.sig_breakdown = SignificanceBreakdownWidget()
-        self.chrom_dist = ChromosomeDistributionWidget()
+        Figure, FigureCanvas = _matplotlib_classes()
+        self.figure = Figure(figsize=(10, 18))
+        self.canvas = FigureCanvas(self.figure)
+        freq_ax, sig_ax, chrom_ax = self.figure.subplots(3, 1)
         
-        layout.addWidget(self.freq_hist)
-        layout.addWidget(self.sig_breakdown)
-        layout.addWidget(self.chrom_dist)
+        self.freq_hist = FrequencyHistogramChart(freq_ax)
+        self.sig_breakdown = SignificanceBreakdownChart(sig_ax)
+        self.chrom_dist = ChromosomeDistributionChart(chrom_ax)
         
-        layout.addStretch()
-        self.setLayout(layout)
+        self.layout().addWidget(self.canvas)
+    
+    def _charts(self) -> List[Any]:
+        """Charts in display order."""
+        return [self.freq_hist, self.sig_breakdown, self.chrom_dist]
     
     def update_data(self, df: pd.DataFrame):
-        """Update all charts with new data."""
-        self.current_df = df.copy()
-        self.freq_hist.update_data(df)
-        self.sig_breakdown.update_data(df)
-        self.chrom_dist.update_data(df)
-        logger.info(f"Updated all charts with {len(df)} variants")
-
+        """Update all charts with new data (computed in the background)."""
+        # Snapshot just the charted columns for the worker, instead of
+        # deep-copying every column of the table
+        self.current_df = df[[col for col in CHART_COLUMNS if col in df.columns]]
+        self._ensure_charts()
+        
+        self._sequence += 1
+        worker = _ChartWorker(self._sequence, self.current_df, self._charts())
+        worker.signals.computed.connect(self._on_charts_computed)
+        self._worker = worker
+        QThreadPool.globalInstance().start(worker)
+    
+    def _on_charts_computed(self, sequence: int, results: list):
+        """Draw computed chart data (GUI thread), unless a newer update is pending."""
+        if sequence != self._sequence:
+            return
+        
+        changed = [chart.render(*result) for chart, result in zip(self._charts(), results)]
+        if any(changed):
+            self.figure.tight_layout()
+            self.canvas.draw_idle()
+        
+        logger.info(f"Updated all charts with {len(self.current_df)} variants")
@@ -4,105 +4,176 @@ Filter widgets for table columns.
 Provides UI components for filtering variant data by column.
 """
 
-from typing import Optional, Callable
+from typing import Dict, List, Optional, Any
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QLineEdit, QComboBox, QLabel,
-    QPushButton, QHBoxLayout
+    QPushButton, QListView, QAbstractItemView, QStyledItemDelegate
+)
+from PyQt6.QtCore import (
+    pyqtSignal, Qt, QTimer, QAbstractListModel, QModelIndex
 )
-from PyQt6.QtCore import pyqtSignal, Qt
 import pandas as pd
 
+# Quiet period after the last keystroke before a text filter is applied
+TEXT_FILTER_DEBOUNCE_MS = 300
+
+# Columns with at most this many distinct values get a dropdown filter
+MAX_CATEGORICAL_VALUES = 50
+
+# Leading rows checked first to rule out categorical columns cheaply
+CATEGORICAL_SAMPLE_ROWS = 10000
+
+
+def _categorical_values(column_data: pd.Series) -> Optional[List[str]]:
+    """Sorted distinct values of a categorical column, or None for text (or all-null) columns."""
+    unique_values = column_data.dropna().unique()
+    if not 0 < len(unique_values) <= MAX_CATEGORICAL_VALUES:
+        return None
+    return sorted(str(v) for v in unique_values)
+
 
-class ColumnFilterWidget(QWidget):
+class FilterListModel(QAbstractListModel):
     """
-    Filter widget for a single column.
+    List model with one row per column holding that column's filter string.
     
-    Supports text input for string columns and dropdown for categorical columns.
+    Display role shows "column: value" for filtered columns; edit role is
+    the raw filter value.
     """
     
-    filter_changed = pyqtSignal(str, str)  # column_name, filter_value
-    
-    def __init__(self, column_name: str, column_data: pd.Series):
-        """
-        Initialize filter widget.
-        
-        Args:
-            column_name: Name of the column
-            column_data: Sample data from the column
-        """
-        super().__init__()
-        self.column_name = column_name
-        self.column_data = column_data
+    def __init__(self, df: pd.DataFrame, parent=None):
+        super().__init__(parent)
+        self.df = df
+        self.columns: List[str] = list(df.columns)
+        self.filter_values: Dict[str, str] = {}
         
-        self._setup_ui()
+        # One nunique pass over the leading rows rules out every column with
+        # too many values up front; the remaining candidates (including ones
+        # whose sample is all null) get their full unique pass on first edit
+        sample_counts = df.iloc[:CATEGORICAL_SAMPLE_ROWS].nunique(dropna=True)
+        self._categories: Dict[str, Optional[List[str]]] = {
+            col: None
+            for col, count in sample_counts.items()
+            if count > MAX_CATEGORICAL_VALUES
+        }
     
-    def _setup_ui(self):
-        """Setup filter widget UI."""
-        layout = QVBoxLayout()
-        layout.setContentsMargins(2, 2, 2, 2)
+    def rowCount(self, parent=QModelIndex()) -> int:
+        """Number of filterable columns."""
+        if parent.isValid():
+            return 0
+        return len(self.columns)
+    
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        """Filter value (edit role) or label (display role) for a column."""
+        if not index.isValid() or index.row() >= len(self.columns):
+            return None
         
-        # Column name label
-        label = QLabel(self.column_name)
-        label.setStyleSheet("font-weight: bold;")
-        layout.addWidget(label)
+        col = self.columns[index.row()]
+        value = self.filter_values.get(col, "")
+        if role == Qt.ItemDataRole.EditRole:
+            return value
+        if role == Qt.ItemDataRole.DisplayRole:
+            return f"{col}: {value}" if value else col
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return value or "Click to filter"
+        return None
+    
+    def setData(self, index: QModelIndex, value: Any, role: int = Qt.ItemDataRole.EditRole) -> bool:
+        """Set a column's filter value (dataChanged only on an actual change)."""
+        if not index.isValid() or role != Qt.ItemDataRole.EditRole:
+            return False
         
-        # Determine if column is categorical or text
-        unique_values = self.column_data.dropna().unique()
-        is_categorical = len(unique_values) <= 50 and len(unique_values) > 0
+        col = self.columns[index.row()]
+        value = value or ""
+        if self.filter_values.get(col, "") == value:
+            return False
         
-        if is_categorical:
-            # Dropdown for categorical
-            self.filter_combo = QComboBox()
-            self.filter_combo.addItem("(All)", "")
-            
-            # Add unique values sorted
-            for val in sorted([str(v) for v in unique_values if pd.notna(v)]):
-                self.filter_combo.addItem(val, val)
-            
-            self.filter_combo.currentTextChanged.connect(self._on_filter_changed)
-            layout.addWidget(self.filter_combo)
-            self.filter_input = None
+        if value:
+            self.filter_values[col] = value
         else:
-            # Text input for text/numeric columns
-            self.filter_input = QLineEdit()
-            self.filter_input.setPlaceholderText("Filter...")
-            self.filter_input.textChanged.connect(self._on_text_filter_changed)
-            layout.addWidget(self.filter_input)
-            self.filter_combo = None
+            self.filter_values.pop(col, None)
+        self.dataChanged.emit(index, index, [Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole])
+        return True
+    
+    def flags(self, index: QModelIndex) -> Qt.ItemFlag:
+        """Every row is editable."""
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable | Qt.ItemFlag.ItemIsEditable
+    
+    def categories(self, row: int) -> Optional[List[str]]:
+        """Dropdown values for a column (None for free text), cached after first use."""
+        col = self.columns[row]
+        if col not in self._categories:
+            self._categories[col] = _categorical_values(self.df[col])
+        return self._categories[col]
+    
+    def clear_filters(self):
+        """Clear every filter with a single dataChanged for the whole list."""
+        if not self.columns:
+            return
+        self.filter_values.clear()
+        self.dataChanged.emit(
+            self.index(0), self.index(len(self.columns) - 1),
+            [Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole]
+        )
+
+
+class FilterItemDelegate(QStyledItemDelegate):
+    """
+    Editor for a filter row: a dropdown for categorical columns, a line edit otherwise.
+    
+    Dropdown choices are applied immediately; typed text is committed once
+    typing has paused (and when the editor closes).
+    """
+    
+    def createEditor(self, parent: QWidget, option, index: QModelIndex) -> QWidget:
+        """Create the editor matching the column's categorical-ness."""
+        values = index.model().categories(index.row())
+        if values is not None:
+            combo = QComboBox(parent)
+            combo.addItem("(All)", "")
+            for val in values:
+                combo.addItem(val, val)
+            combo.currentIndexChanged.connect(lambda _index: self.commitData.emit(combo))
+            return combo
         
-        self.setLayout(layout)
+        line_edit = QLineEdit(parent)
+        line_edit.setPlaceholderText("Filter...")
+        # Collapses a burst of keystrokes into one commit
+        debounce = QTimer(line_edit)
+        debounce.setSingleShot(True)
+        debounce.setInterval(TEXT_FILTER_DEBOUNCE_MS)
+        debounce.timeout.connect(lambda: self.commitData.emit(line_edit))
+        line_edit.textEdited.connect(lambda _text: debounce.start())
+        return line_edit
     
-    def _on_filter_changed(self):
-        """Handle dropdown filter change."""
-        if self.filter_combo:
-            current_data = self.filter_combo.currentData()
-            filter_value = current_data if current_data else ""
-            self.filter_changed.emit(self.column_name, filter_value)
-    
-    def _on_text_filter_changed(self, text: str):
-        """Handle text filter change."""
-        if self.filter_input:
-            self.filter_changed.emit(self.column_name, text)
-    
-    def get_filter_value(self) -> str:
-        """Get current filter value."""
-        if self.filter_combo:
-            return self.filter_combo.currentData() or ""
-        elif self.filter_input:
-            return self.filter_input.text()
-        return ""
-    
-    def clear_filter(self):
-        """Clear the filter."""
-        if self.filter_combo:
-            self.filter_combo.setCurrentIndex(0)
-        elif self.filter_input:
-            self.filter_input.clear()
+    def setEditorData(self, editor: QWidget, index: QModelIndex):
+        """Load the current filter value into the editor."""
+        value = index.data(Qt.ItemDataRole.EditRole) or ""
+        if isinstance(editor, QComboBox):
+            editor.blockSignals(True)
+            try:
+                editor.setCurrentIndex(max(editor.findData(value), 0))
+            finally:
+                editor.blockSignals(False)
+        elif editor.text() != value:
+            editor.setText(value)
+    
+    def setModelData(self, editor: QWidget, model: QAbstractListModel, index: QModelIndex):
+        """Write the editor's value back to the model."""
+        if isinstance(editor, QComboBox):
+            value = editor.currentData() or ""
+        else:
+            value = editor.text()
+        model.setData(index, value, Qt.ItemDataRole.EditRole)
 
 
 class FilterPanel(QWidget):
     """
-    Panel containing filter widgets for all columns.
+    Panel listing a filter for every column.
+    
+    Columns are rows of a QListView, so only the visible rows are painted
+    and an editor widget exists only for the row being edited.
     """
     
     filters_changed = pyqtSignal()  # Emitted when any filter changes
@@ -116,7 +187,8 @@ class FilterPanel(QWidget):
         """
         super().__init__()
         self.df = df
-        self.filter_widgets: dict[str, ColumnFilterWidget] = {}
+        self.model = FilterListModel(df, self)
+        self.model.dataChanged.connect(self._on_filter_changed)
         
         self._setup_ui()
     
@@ -135,38 +207,38 @@ class FilterPanel(QWidget):
         clear_btn.clicked.connect(self.clear_all_filters)
         layout.addWidget(clear_btn)
         
-        # Create filter widget for each column
-        for col in self.df.columns:
-            filter_widget = ColumnFilterWidget(col, self.df[col])
-            filter_widget.filter_changed.connect(self._on_filter_changed)
-            self.filter_widgets[col] = filter_widget
-            layout.addWidget(filter_widget)
+        # One row per column; the delegate supplies the editor on demand
+        self.filter_list = QListView()
+        self.filter_list.setModel(self.model)
+        self.filter_list.setItemDelegate(FilterItemDelegate(self.filter_list))
+        self.filter_list.setUniformItemSizes(True)
+        self.filter_list.setEditTriggers(
+            QAbstractItemView.EditTrigger.CurrentChanged
+            | QAbstractItemView.EditTrigger.SelectedClicked
+            | QAbstractItemView.EditTrigger.DoubleClicked
+        )
+        layout.addWidget(self.filter_list)
         
-        layout.addStretch()
         self.setLayout(layout)
     
-    def _on_filter_changed(self, column: str, value: str):
-        """Handle filter change from any widget."""
+    def _on_filter_changed(self, *args):
+        """Handle a filter change in the model."""
         self.filters_changed.emit()
     
     def get_filters(self) -> dict[str, str]:
-        """Get all current filter values."""
-        return {
-            col: widget.get_filter_value()
-            for col, widget in self.filter_widgets.items()
-        }
+        """Get the active filters (columns with a non-empty filter value)."""
+        values = self.model.filter_values
+        return {col: values[col] for col in self.model.columns if col in values}
+    
+    @property
+    def active_columns(self) -> list[str]:
+        """Columns that currently have a filter set."""
+        return list(self.get_filters())
     
     def clear_all_filters(self):
-        """Clear all filters."""
-        for widget in self.filter_widgets.values():
-            widget.clear_filter()
-        self.filters_changed.emit()
-
-
-
-
-
-
-
-
-
+        """Clear all filters, emitting filters_changed once at the end."""
+        # Close an open editor first so it can't write its value back afterwards
+        self.filter_list.setCurrentIndex(QModelIndex())
+        
+        # One dataChanged for the whole list -> one filters_changed
+        self.model.clear_filters()
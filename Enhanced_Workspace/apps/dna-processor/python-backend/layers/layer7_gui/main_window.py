@@ -7,7 +7,9 @@ Communication via Qt signals only.
 """
 
 import sys
+import time
 import logging
+from collections import deque
 from pathlib import Path
 from typing import Optional
 from PyQt6.QtWidgets import (
@@ -16,13 +18,14 @@ from PyQt6.QtWidgets import (
     QTextEdit, QLabel, QProgressBar, QMessageBox, QSpinBox,
     QLineEdit, QSplitter, QToolBar, QTabWidget
 )
-from PyQt6.QtCore import QThread, pyqtSignal, Qt
+from PyQt6.QtCore import QThread, QTimer, pyqtSignal, Qt
 import pandas as pd
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from pipeline import DNAAnnotationPipeline
+from layers.layer5_synthesis.synthesizer import AnnotationSynthesizer
 from layers.layer7_gui.variant_table_model import VariantTableModel
 from layers.layer7_gui.filter_widget import FilterPanel
 from layers.layer7_gui.charts import ChartsTabWidget
@@ -30,6 +33,18 @@ from layers.layer7_gui.ai_qa_widget import AIQAWidget
 
 logger = logging.getLogger(__name__)
 
+# Quiet period after the last keystroke before the global search is applied
+SEARCH_DEBOUNCE_MS = 150
+
+# Minimum spacing of percentage-only progress signals (~30 per second)
+PROGRESS_EMIT_INTERVAL_S = 1 / 30
+
+# Log panel: how often queued records are written, how many may be queued
+# between writes, and how many lines the panel keeps
+LOG_FLUSH_INTERVAL_MS = 100
+LOG_BUFFER_MAX_RECORDS = 10000
+LOG_MAX_LINES = 5000
+
 
 class PipelineWorker(QThread):
     """
@@ -44,19 +59,46 @@ class PipelineWorker(QThread):
     finished = pyqtSignal(pd.DataFrame)
     error = pyqtSignal(str)
     
-    def __init__(self, file_path: Path, pipeline: DNAAnnotationPipeline):
+    def __init__(self, file_path: Path, pipeline: DNAAnnotationPipeline, is_folder: bool = False):
         super().__init__()
         self.file_path = file_path
         self.pipeline = pipeline
+        self.is_folder = is_folder
+        self._last_message: Optional[str] = None
+        self._last_emit = 0.0
+    
+    def _emit_progress(self, message: str, percentage: int):
+        """
+        Forward pipeline progress to the GUI, rate-limited.
+        
+        A new status message and 100% are always sent; percentage-only
+        updates are coalesced so fine-grained progress can't flood the
+        GUI thread's event queue.
+        """
+        now = time.monotonic()
+        if message != self._last_message:
+            self._last_message = message
+            self.progress_update.emit(message)
+        elif percentage < 100 and now - self._last_emit < PROGRESS_EMIT_INTERVAL_S:
+            return
+        
+        self._last_emit = now
+        self.progress_percentage.emit(percentage)
     
     def run(self):
         """Execute pipeline in background thread."""
         try:
-            self.progress_update.emit("Normalizing input file...")
-            result_df = self.pipeline.process_file(self.file_path)
+            if self.is_folder:
+                # Files are parsed in parallel inside Layer 0; annotation
+                # then runs once on the combined, deduplicated variants
+                self._emit_progress("Processing folder...", 0)
+                result_df = self.pipeline.process_folder(self.file_path)
+                self._emit_progress("Pipeline complete!", 100)
+            else:
+                result_df = self.pipeline.process_file_with_progress(self.file_path, self._emit_progress)
             
             if result_df.empty:
-                self.error.emit("No variants found in file")
+                self.error.emit(f"No variants found in {'folder' if self.is_folder else 'file'}")
                 return
             
             self.progress_update.emit("Processing complete!")
@@ -67,6 +109,38 @@ class PipelineWorker(QThread):
             self.error.emit(str(e))
 
 
+class ExportWorker(QThread):
+    """
+    Worker thread for exporting results to CSV or JSON.
+    
+    Writes go through the synthesizer's Arrow-based exporters, off the
+    GUI thread, so a large export doesn't freeze the window.
+    """
+    
+    finished = pyqtSignal(int, str)  # rows written, output path
+    error = pyqtSignal(str)
+    
+    def __init__(self, df: pd.DataFrame, file_path: str, file_format: str, synthesizer: AnnotationSynthesizer):
+        super().__init__()
+        self.df = df
+        self.file_path = file_path
+        self.file_format = file_format
+        self.synthesizer = synthesizer
+    
+    def run(self):
+        """Write the export file in background thread."""
+        try:
+            if self.file_format == "csv":
+                self.synthesizer.export_to_csv(self.df, self.file_path)
+            else:
+                self.synthesizer.export_to_json(self.df, self.file_path)
+            self.finished.emit(len(self.df), self.file_path)
+            
+        except Exception as e:
+            logger.error(f"Export error: {e}", exc_info=True)
+            self.error.emit(str(e))
+
+
 class MainWindow(QMainWindow):
     """
     Main application window.
@@ -83,8 +157,15 @@ class MainWindow(QMainWindow):
         self.pipeline = DNAAnnotationPipeline()
         self.current_data: Optional[pd.DataFrame] = None
         self.worker: Optional[PipelineWorker] = None
+        self.export_worker: Optional[ExportWorker] = None
+        # Filter-panel state last applied to the table (None: not applied yet)
+        self._last_filters_key: Optional[tuple] = None
         self.table_model: Optional[VariantTableModel] = None
         
+        # Charts and AI Q&A context are refreshed only while their tab is shown
+        self._charts_dirty = False
+        self._ai_context_df: Optional[pd.DataFrame] = None
+        
         # Setup UI
         self._setup_ui()
         
@@ -154,7 +235,12 @@ class MainWindow(QMainWindow):
         toolbar.addWidget(QLabel("Search:"))
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("Search all columns...")
-        self.search_input.textChanged.connect(self._on_search_changed)
+        # Typing restarts the timer; only the last keystroke triggers a search
+        self._search_debounce = QTimer(self)
+        self._search_debounce.setSingleShot(True)
+        self._search_debounce.setInterval(SEARCH_DEBOUNCE_MS)
+        self._search_debounce.timeout.connect(self._apply_search)
+        self.search_input.textChanged.connect(lambda _text: self._search_debounce.start())
         toolbar.addWidget(self.search_input)
         
         layout.addWidget(toolbar)
@@ -235,6 +321,7 @@ class MainWindow(QMainWindow):
         # AI Q&A tab
         self.ai_qa_tab = AIQAWidget()
         self.tabs.addTab(self.ai_qa_tab, "AI Q&A")
+        self.tabs.currentChanged.connect(self._on_tab_changed)
         
         # Log output
         log_label = QLabel("Log Output:")
@@ -287,6 +374,7 @@ class MainWindow(QMainWindow):
         # Reset UI
         self.table.setModel(None)
         self.table_model = None
+        self._last_filters_key = None
         self.current_data = None
         self.export_csv_btn.setEnabled(False)
         self.export_json_btn.setEnabled(False)
@@ -298,9 +386,7 @@ class MainWindow(QMainWindow):
         self.progress_bar.setVisible(True)
         self.progress_label.setText("Processing folder...")
         
-        # Process folder (using same worker pattern)
-        # For now, we'll use a simple approach - process synchronously in worker
-        # In a more sophisticated implementation, we could process files in parallel
+        # Process folder (using same worker pattern; files are parsed in parallel)
         self.worker = PipelineWorker(folder_path, self.pipeline, is_folder=True)
         self.worker.progress_update.connect(self._on_progress_update)
         self.worker.progress_percentage.connect(self._on_progress_percentage)
@@ -321,6 +407,7 @@ class MainWindow(QMainWindow):
         # Reset UI
         self.table.setModel(None)  # Clear model
         self.table_model = None
+        self._last_filters_key = None
         self.current_data = None
         self.export_csv_btn.setEnabled(False)
         self.export_json_btn.setEnabled(False)
@@ -376,6 +463,7 @@ class MainWindow(QMainWindow):
         # Create model with pagination
         page_size = self.page_size_spin.value()
         self.table_model = VariantTableModel(df, page_size=page_size)
+        self._last_filters_key = ()  # a new model starts unfiltered
         
         # Create filter panel
         filter_layout = QVBoxLayout()
@@ -397,14 +485,12 @@ class MainWindow(QMainWindow):
         self.export_json_btn.setEnabled(True)
         self.filter_toggle_btn.setEnabled(True)
         
-        # Update charts
-        self.charts_tab.update_data(df)
+        # Update charts and AI Q&A context (deferred until their tab is shown)
+        self._refresh_charts()
+        self._set_ai_context(df)
         
-        # Update AI Q&A context
-        self.ai_qa_tab.update_context(df)
-        
-        # Resize columns to content
-        self.table.resizeColumnsToContents()
+        # Resize columns to content once the first page has been shown
+        QTimer.singleShot(0, self.table.resizeColumnsToContents)
         
         logger.info(f"Displayed {len(df)} variants in paginated table (page size: {page_size})")
     
@@ -445,94 +531,83 @@ class MainWindow(QMainWindow):
     def _on_page_size_changed(self, value: int):
         """Handle page size change."""
         if self.table_model:
-            self.table_model.page_size = value
-            self.table_model.current_page = 0
-            self.table_model.layoutChanged.emit()
+            self.table_model.set_page_size(value)
             self._update_pagination_controls()
     
-    def _on_search_changed(self, text: str):
-        """Handle search text change - global search across all columns."""
+    def _apply_search(self):
+        """Apply the search box text - global search across all columns."""
         if not self.table_model:
             return
         
-        # Set global search filter
-        if text.strip():
-            self.table_model.set_filter("_global_search", text.strip())
-        else:
-            # Clear global search filter only
-            if "_global_search" in self.table_model._filters:
-                del self.table_model._filters["_global_search"]
-                self.table_model.current_page = 0
-                self.table_model._update_filtered_data()
-                self.table_model.layoutChanged.emit()
+        # Set (or, for empty text, clear) the global search filter
+        self.table_model.set_filter("_global_search", self.search_input.text())
         
         self._update_pagination_controls()
         
         # Update charts with filtered data
-        if self.current_data is not None and self.table_model:
-            filtered_df = self.table_model.get_filtered_dataframe()
-            self.charts_tab.update_data(filtered_df)
+        self._refresh_charts()
     
     def _export_csv(self):
         """Export current data to CSV."""
-        if self.current_data is None or self.current_data.empty:
-            QMessageBox.warning(self, "Export", "No data to export")
-            return
-        
-        file_path, _ = QFileDialog.getSaveFileName(
-            self,
-            "Export to CSV",
-            "",
-            "CSV Files (*.csv);;All Files (*)"
-        )
-        
-        if file_path:
-            try:
-                # Export filtered data if filters are active, otherwise all data
-                if self.table_model:
-                    export_df = self.table_model.get_filtered_dataframe()
-                else:
-                    export_df = self.current_data
-                
-                export_df.to_csv(file_path, index=False)
-                QMessageBox.information(
-                    self,
-                    "Export Successful",
-                    f"Exported {len(export_df)} variants to {file_path}"
-                )
-            except Exception as e:
-                QMessageBox.critical(self, "Export Error", f"Failed to export: {e}")
+        self._start_export("csv", "Export to CSV", "CSV Files (*.csv);;All Files (*)")
     
     def _export_json(self):
         """Export current data to JSON."""
+        self._start_export("json", "Export to JSON", "JSON Files (*.json);;All Files (*)")
+    
+    def _start_export(self, file_format: str, caption: str, file_filter: str):
+        """Ask for a destination and write the export in a background thread."""
         if self.current_data is None or self.current_data.empty:
             QMessageBox.warning(self, "Export", "No data to export")
             return
         
-        file_path, _ = QFileDialog.getSaveFileName(
+        if self.export_worker and self.export_worker.isRunning():
+            QMessageBox.warning(self, "Export", "An export is already in progress")
+            return
+        
+        file_path, _ = QFileDialog.getSaveFileName(self, caption, "", file_filter)
+        if not file_path:
+            return
+        
+        # Export filtered data if filters are active, otherwise all data
+        if self.table_model:
+            export_df = self.table_model.get_filtered_dataframe()
+        else:
+            export_df = self.current_data
+        
+        self.export_csv_btn.setEnabled(False)
+        self.export_json_btn.setEnabled(False)
+        self.progress_bar.setRange(0, 0)  # busy indicator
+        self.progress_bar.setVisible(True)
+        self.progress_label.setText(f"Exporting {len(export_df)} variants...")
+        
+        self.export_worker = ExportWorker(export_df, file_path, file_format, self.pipeline.synthesizer)
+        self.export_worker.finished.connect(self._on_export_finished)
+        self.export_worker.error.connect(self._on_export_error)
+        self.export_worker.start()
+    
+    def _on_export_finished(self, row_count: int, file_path: str):
+        """Handle export completion."""
+        self._end_export("Export complete")
+        QMessageBox.information(
             self,
-            "Export to JSON",
-            "",
-            "JSON Files (*.json);;All Files (*)"
+            "Export Successful",
+            f"Exported {row_count} variants to {file_path}"
         )
-        
-        if file_path:
-            try:
-                # Export filtered data if filters are active, otherwise all data
-                if self.table_model:
-                    export_df = self.table_model.get_filtered_dataframe()
-                else:
-                    export_df = self.current_data
-                
-                # Convert to records format
-                export_df.to_json(file_path, orient='records', indent=2)
-                QMessageBox.information(
-                    self,
-                    "Export Successful",
-                    f"Exported {len(export_df)} variants to {file_path}"
-                )
-            except Exception as e:
-                QMessageBox.critical(self, "Export Error", f"Failed to export: {e}")
+    
+    def _on_export_error(self, error_message: str):
+        """Handle export failure."""
+        self._end_export("Export failed")
+        QMessageBox.critical(self, "Export Error", f"Failed to export: {error_message}")
+    
+    def _end_export(self, status: str):
+        """Restore progress and export controls after an export."""
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setVisible(False)
+        self.progress_label.setText(status)
+        has_data = self.current_data is not None and not self.current_data.empty
+        self.export_csv_btn.setEnabled(has_data)
+        self.export_json_btn.setEnabled(has_data)
     
     def _toggle_filters(self, checked: bool):
         """Toggle filter panel visibility."""
@@ -544,26 +619,86 @@ class MainWindow(QMainWindow):
         """Handle filter changes from filter panel."""
         if self.filter_panel and self.table_model:
             filters = self.filter_panel.get_filters()
+            
+            # Nothing to do if the panel ended up back in the applied state
+            filters_key = tuple(sorted(filters.items()))
+            if filters_key == self._last_filters_key:
+                return
+            self._last_filters_key = filters_key
+            
             self.table_model.set_filters(filters)
             self._update_pagination_controls()
             
             # Update charts with filtered data
-            if self.current_data is not None:
-                filtered_df = self.table_model.get_filtered_dataframe()
-                self.charts_tab.update_data(filtered_df)
+            self._refresh_charts()
+    
+    def _refresh_charts(self):
+        """Mark the charts stale; redraw now only if the Charts tab is showing."""
+        self._charts_dirty = True
+        if self.tabs.currentWidget() is self.charts_tab:
+            self._flush_charts()
+    
+    def _flush_charts(self):
+        """Redraw the charts from the table's current filtered rows."""
+        self._charts_dirty = False
+        if self.current_data is not None and self.table_model:
+            self.charts_tab.update_data(self.table_model.get_filtered_dataframe())
+    
+    def _set_ai_context(self, df: pd.DataFrame):
+        """Set the AI Q&A context, applied once the AI Q&A tab is showing."""
+        self._ai_context_df = df
+        if self.tabs.currentWidget() is self.ai_qa_tab:
+            self._flush_ai_context()
+    
+    def _flush_ai_context(self):
+        """Hand a pending context DataFrame to the AI Q&A tab."""
+        if self._ai_context_df is not None:
+            self.ai_qa_tab.update_context(self._ai_context_df)
+            self._ai_context_df = None
+    
+    def _on_tab_changed(self, index: int):
+        """Bring a tab up to date when it becomes visible."""
+        widget = self.tabs.widget(index)
+        if widget is self.charts_tab and self._charts_dirty:
+            self._flush_charts()
+        elif widget is self.ai_qa_tab:
+            self._flush_ai_context()
 
 
 class TextEditLogHandler(logging.Handler):
-    """Log handler that writes to QTextEdit widget."""
+    """
+    Log handler that writes to QTextEdit widget.
+    
+    Records (from any thread) are queued and written in one append per
+    LOG_FLUSH_INTERVAL_MS on the GUI thread, so a burst of log lines costs
+    one text layout instead of one per line. Must be created on the GUI thread.
+    """
     
     def __init__(self, text_edit):
         super().__init__()
         self.text_edit = text_edit
+        self.text_edit.setUndoRedoEnabled(False)
+        self.text_edit.document().setMaximumBlockCount(LOG_MAX_LINES)
+        self._buffer: deque = deque(maxlen=LOG_BUFFER_MAX_RECORDS)
+        
+        self._flush_timer = QTimer(text_edit)
+        self._flush_timer.setInterval(LOG_FLUSH_INTERVAL_MS)
+        self._flush_timer.timeout.connect(self._flush)
+        self._flush_timer.start()
     
     def emit(self, record):
-        """Emit log record to text edit."""
-        msg = self.format(record)
-        self.text_edit.append(msg)
+        """Queue log record for the text edit."""
+        self._buffer.append(self.format(record))
+    
+    def _flush(self):
+        """Write queued records to the text edit (GUI thread)."""
+        if not self._buffer:
+            return
+        
+        lines = []
+        while self._buffer:
+            lines.append(self._buffer.popleft())
+        self.text_edit.append("\n".join(lines))
 
 
 def run_gui():
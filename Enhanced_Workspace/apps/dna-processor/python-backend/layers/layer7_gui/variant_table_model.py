@@ -4,8 +4,12 @@ Custom table model for variant data with pagination support.
 Provides efficient virtual scrolling for large datasets.
 """
 
-from typing import Optional
+import functools
+from typing import Dict, List, Optional, Tuple
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 from PyQt6.QtCore import QAbstractTableModel, Qt, QModelIndex
 import logging
 
@@ -31,63 +35,98 @@ class VariantTableModel(QAbstractTableModel):
         self._df = df.copy()
         self.page_size = page_size
         self.current_page = 0
+        # Positions of the rows passing the filters (None: every row); the
+        # filtered DataFrame itself is only built when someone asks for it
+        self._filtered_rows: Optional[np.ndarray] = None
         self._filtered_df: Optional[pd.DataFrame] = None
         self._filters: dict = {}  # Column name -> filter value
+        # Lower-cased Arrow string form of each column, built on first filter
+        self._search_columns: Optional[Dict[str, pa.Array]] = None
+        # Current page slice and its display strings (column-major), keyed by
+        # (page, page size); reset on every refilter
+        self._page_cache: Optional[Tuple[Tuple[int, int], pd.DataFrame, List[List[str]]]] = None
         
         # Calculate total pages
         self._update_filtered_data()
     
     def _update_filtered_data(self):
         """Apply current filters to DataFrame."""
-        self._filtered_df = self._df.copy()
-        
-        # Check for global search filter (special key "_global_search")
-        global_search = self._filters.pop("_global_search", None)
-        
-        if global_search and global_search.strip():
-            # Global search: filter rows where ANY column contains the text
-            search_lower = str(global_search).lower()
-            mask = pd.Series([False] * len(self._filtered_df))
-            for col in self._filtered_df.columns:
-                col_mask = self._filtered_df[col].astype(str).str.lower().str.contains(
-                    search_lower, na=False, regex=False
-                )
-                mask = mask | col_mask
-            self._filtered_df = self._filtered_df[mask] if mask.any() else pd.DataFrame(columns=self._df.columns)
-        
-        # Apply column-specific filters
+        # Every filter is a case-insensitive substring match over the cached
+        # string columns; the masks are combined into one set of row positions
+        mask = None
         for column, filter_value in self._filters.items():
-            if column in self._filtered_df.columns and filter_value:
-                filter_str = str(filter_value).lower()
-                # Text search in string columns
-                mask = self._filtered_df[column].astype(str).str.lower().str.contains(
-                    filter_str, na=False, regex=False
-                )
-                self._filtered_df = self._filtered_df[mask]
+            if column == "_global_search":
+                # Global search: rows where ANY column contains the text
+                column_mask = self._global_search_mask(filter_value)
+            elif column in self._df.columns and filter_value:
+                column_mask = self._contains_mask(column, filter_value)
+            else:
+                continue
+            mask = column_mask if mask is None else pc.and_(mask, column_mask)
         
-        # Restore global search filter if it was removed
-        if global_search:
-            self._filters["_global_search"] = global_search
+        if mask is None:
+            self._filtered_rows = None
+        else:
+            self._filtered_rows = np.flatnonzero(np.asarray(mask, dtype=bool))
+        self._filtered_df = None
+        self._page_cache = None
         
         # Reset to first page if needed
         total_pages = self._get_total_pages()
         if self.current_page >= total_pages and total_pages > 0:
             self.current_page = total_pages - 1
     
+    def _get_search_columns(self) -> Dict[str, pa.Array]:
+        """Searchable string columns, converted once per underlying DataFrame."""
+        if self._search_columns is None:
+            self._search_columns = {col: _search_array(self._df[col]) for col in self._df.columns}
+        return self._search_columns
+    
+    def _contains_mask(self, column: str, text: str) -> pa.Array:
+        """Rows whose column value contains text (case-insensitive)."""
+        matches = pc.match_substring(self._get_search_columns()[column], str(text).lower())
+        return pc.fill_null(matches, False)
+    
+    def _global_search_mask(self, text: str) -> pa.Array:
+        """Rows where any column contains text (case-insensitive)."""
+        if len(self._df.columns) == 0:
+            return pa.array(np.zeros(len(self._df), dtype=bool))
+        return functools.reduce(pc.or_, (self._contains_mask(col, text) for col in self._df.columns))
+    
     def _get_total_pages(self) -> int:
         """Calculate total number of pages."""
-        if self._filtered_df is None or len(self._filtered_df) == 0:
+        total_rows = self.get_total_rows()
+        if total_rows == 0:
             return 1
-        return (len(self._filtered_df) + self.page_size - 1) // self.page_size
+        return (total_rows + self.page_size - 1) // self.page_size
     
     def _get_current_page_data(self) -> pd.DataFrame:
-        """Get DataFrame slice for current page."""
-        if self._filtered_df is None or len(self._filtered_df) == 0:
-            return pd.DataFrame(columns=self._df.columns)
+        """Get DataFrame slice for current page (sliced once per page, not per cell)."""
+        key = (self.current_page, self.page_size)
+        if self._page_cache is not None and self._page_cache[0] == key:
+            return self._page_cache[1]
         
         start_idx = self.current_page * self.page_size
         end_idx = start_idx + self.page_size
-        return self._filtered_df.iloc[start_idx:end_idx].copy()
+        if self.get_total_rows() == 0:
+            page_data = pd.DataFrame(columns=self._df.columns)
+        elif self._filtered_rows is None:
+            page_data = self._df.iloc[start_idx:end_idx].copy()
+        else:
+            page_data = self._df.iloc[self._filtered_rows[start_idx:end_idx]]
+        
+        # Format every cell once per page so data() is a plain list lookup
+        cells = [
+            ["" if pd.isna(value) else str(value) for value in page_data[col].to_numpy(dtype=object)]
+            for col in page_data.columns
+        ]
+        self._page_cache = (key, page_data, cells)
+        return page_data
+    
+    def _get_current_page_cells(self) -> List[List[str]]:
+        """Display strings for the current page, indexed [column][row]."""
+        self._get_current_page_data()
+        return self._page_cache[2]
     
     def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
         """Return number of rows in current page."""
@@ -104,17 +143,11 @@ class VariantTableModel(QAbstractTableModel):
             return None
         
         if role == Qt.ItemDataRole.DisplayRole or role == Qt.ItemDataRole.EditRole:
-            page_data = self._get_current_page_data()
-            if index.row() >= len(page_data):
+            cells = self._get_current_page_cells()
+            if index.column() >= len(cells) or index.row() >= len(cells[index.column()]):
                 return None
             
-            col_name = self._df.columns[index.column()]
-            value = page_data.iloc[index.row(), index.column()]
-            
-            # Convert to string, handle NaN
-            if pd.isna(value):
-                return ""
-            return str(value)
+            return cells[index.column()][index.row()]
         
         return None
     
@@ -131,10 +164,11 @@ class VariantTableModel(QAbstractTableModel):
                     return self._df.columns[section]
             elif orientation == Qt.Orientation.Vertical:
                 # Show actual row number from full dataset
-                if self._filtered_df is not None and len(self._filtered_df) > 0:
+                total_rows = self.get_total_rows()
+                if total_rows > 0:
                     start_idx = self.current_page * self.page_size
                     actual_row = start_idx + section
-                    if actual_row < len(self._filtered_df):
+                    if actual_row < total_rows:
                         return actual_row + 1  # 1-indexed for display
                 return section + 1
         
@@ -176,6 +210,14 @@ class VariantTableModel(QAbstractTableModel):
             return True
         return False
     
+    def set_page_size(self, page_size: int):
+        """Change rows per page and go back to the first page."""
+        # The row count changes, so this is a model reset (not a layout change)
+        self.beginResetModel()
+        self.page_size = page_size
+        self.current_page = 0
+        self.endResetModel()
+    
     def get_current_page(self) -> int:
         """Get current page number (0-indexed)."""
         return self.current_page
@@ -186,9 +228,9 @@ class VariantTableModel(QAbstractTableModel):
     
     def get_total_rows(self) -> int:
         """Get total number of rows (filtered)."""
-        if self._filtered_df is None:
+        if self._filtered_rows is None:
             return len(self._df)
-        return len(self._filtered_df)
+        return len(self._filtered_rows)
     
     # Filtering methods
     def set_filter(self, column: str, value: str):
@@ -236,11 +278,17 @@ class VariantTableModel(QAbstractTableModel):
     
     def get_filtered_dataframe(self) -> pd.DataFrame:
         """Get full filtered DataFrame (not just current page)."""
-        return self._filtered_df.copy() if self._filtered_df is not None else pd.DataFrame()
+        if self._filtered_df is None:
+            if self._filtered_rows is None:
+                self._filtered_df = self._df
+            else:
+                self._filtered_df = self._df.iloc[self._filtered_rows]
+        return self._filtered_df.copy()
     
     def update_dataframe(self, df: pd.DataFrame):
         """Update the underlying DataFrame."""
         self._df = df.copy()
+        self._search_columns = None
         self._update_filtered_data()
         self.layoutChanged.emit()
     
@@ -253,8 +301,28 @@ class VariantTableModel(QAbstractTableModel):
         col_name = self._df.columns[column]
         ascending = (order == Qt.SortOrder.AscendingOrder)
         
-        self._df = self._df.sort_values(by=col_name, ascending=ascending, na_position='last')
-        self._update_filtered_data()
+        # Data already in the requested order (e.g. a file sorted by position,
+        # or the view re-applying its sort indicator) is left untouched, which
+        # keeps the search columns and filtered rows instead of rebuilding them
+        values = self._df[col_name]
+        if not (values.is_monotonic_increasing if ascending else values.is_monotonic_decreasing):
+            self._df = self._df.sort_values(by=col_name, ascending=ascending, na_position='last')
+            self._search_columns = None
+            self._update_filtered_data()
+        
         self.current_page = 0
         self.layoutChanged.emit()
 
+
+def _search_array(values: pd.Series) -> pa.Array:
+    """
+    Lower-cased Arrow string form of a column for substring search.
+    
+    Non-string columns are cast by Arrow (missing values stay null and
+    never match); columns Arrow can't convert fall back to str().
+    """
+    try:
+        strings = pc.cast(pa.array(values, from_pandas=True), pa.large_string())
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        strings = pa.array(values.astype(str), type=pa.large_string())
+    return pc.utf8_lower(strings)
@@ -6,6 +6,7 @@ Orchestrates the annotation pipeline following strict layer separation.
 
 import sys
 import logging
+import multiprocessing
 from pathlib import Path
 
 # Setup logging
@@ -31,5 +32,7 @@ def main():
 
 
 if __name__ == "__main__":
+    # Required for the input layer's process pool in frozen Windows builds
+    multiprocessing.freeze_support()
     main()
 
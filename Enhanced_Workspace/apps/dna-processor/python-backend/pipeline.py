@@ -16,11 +16,14 @@ from layers.layer2_selection import CandidateSelector
 from layers.layer3_snpedia import SNPediaExpander
 from layers.layer4_population import PopulationFrequencyDB
 from layers.layer5_synthesis import AnnotationSynthesizer
-from layers.layer6_ai import AIInterpreter
+from layers.layer6_ai import get_interpreter
 from layers.layer8_persistence import PersistenceManager
 
 logger = logging.getLogger(__name__)
 
+# Rows per ClinVar annotation call; progress is reported between calls
+CLINVAR_PROGRESS_CHUNK = 100_000
+
 
 class DNAAnnotationPipeline:
     """
@@ -45,13 +48,13 @@ class DNAAnnotationPipeline:
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         
         # Initialize layers
-        self.normalizer = InputNormalizer()
+        self.normalizer = InputNormalizer(cache_dir=self.cache_dir / "normalized")
         self.clinvar = ClinVarAnnotator()
         self.selector = CandidateSelector()
         self.freq_db = PopulationFrequencyDB()
         self.synthesizer = AnnotationSynthesizer()
         self.persistence = PersistenceManager(self.cache_dir)
-        self.ai_interpreter = AIInterpreter() if ai_enabled else None
+        self.ai_interpreter = get_interpreter() if ai_enabled else None
     
     def process_file_with_progress(
         self, 
@@ -120,23 +123,13 @@ class DNAAnnotationPipeline:
         self.clinvar.ensure_data_downloaded()
         self.clinvar.load_cache()
         
-        clinvar_data = {}
-        total_rsids = len(variants_df)
-        for idx, rsid in enumerate(variants_df['rsid']):
-            clinvar_data[rsid] = self.clinvar.annotate(rsid)
-            if (idx + 1) % 10000 == 0:
-                progress(f"Annotated {idx + 1}/{total_rsids} variants with ClinVar...", 30 + int(20 * (idx + 1) / total_rsids))
+        clinvar_df = self._annotate_clinvar(variants_df, progress)
         
-        logger.info(f"Annotated {len(clinvar_data)} variants with ClinVar")
-        progress(f"Annotated {len(clinvar_data)} variants with ClinVar", 50)
+        logger.info(f"Annotated {len(clinvar_df)} variants with ClinVar")
+        progress(f"Annotated {len(clinvar_df)} variants with ClinVar", 50)
         
         # Layer 2: Candidate selection
         progress("Selecting candidate variants...", 60)
-        clinvar_df = pd.DataFrame([
-            {'rsid': rsid, 'clinical_significance': data['clinical_significance']}
-            for rsid, data in clinvar_data.items()
-        ])
-        
         candidates = self.selector.select_from_annotations(clinvar_df)
         
         if len(candidates) == len(variants_df) and len(variants_df) > 10000:
@@ -156,10 +149,8 @@ class DNAAnnotationPipeline:
             max_snpedia_variants = 1000
             if len(candidates) > max_snpedia_variants:
                 logger.warning(f"Limiting SNPedia expansion to {max_snpedia_variants} variants")
-                candidates_with_clinvar = [
-                    rsid for rsid in candidates 
-                    if clinvar_data.get(rsid, {}).get('clinical_significance')
-                ]
+                with_significance = set(clinvar_df.loc[clinvar_df['clinical_significance'] != '', 'rsid'])
+                candidates_with_clinvar = [rsid for rsid in candidates if rsid in with_significance]
                 if candidates_with_clinvar:
                     candidates_to_expand = candidates_with_clinvar[:max_snpedia_variants]
                 else:
@@ -180,14 +171,13 @@ class DNAAnnotationPipeline:
         # Layer 4: Population frequency lookup
         progress("Retrieving population frequencies...", 85)
         if 'chrom' in variants_df.columns:
-            unique_chroms = variants_df['chrom'].dropna().unique()
-            for chrom in unique_chroms:
-                chrom_str = str(chrom).strip()
-                if chrom_str and chrom_str not in ['', 'Unknown', 'MT']:
-                    try:
-                        self.freq_db.download_and_index_chromosome(chrom_str, force=False)
-                    except Exception as e:
-                        logger.warning(f"Failed to ensure chromosome {chrom_str} data: {e}")
+            chroms = [str(chrom).strip() for chrom in variants_df['chrom'].dropna().unique()]
+            try:
+                self.freq_db.download_and_index_chromosomes(
+                    [chrom for chrom in chroms if chrom not in ['', 'Unknown', 'MT']], force=False
+                )
+            except Exception as e:
+                logger.warning(f"Failed to ensure population frequency data: {e}")
         
         frequency_data = self.freq_db.get_frequencies_batch(variants_df['rsid'].tolist())
         logger.info(f"Retrieved frequencies for {sum(1 for v in frequency_data.values() if v is not None)} variants")
@@ -197,7 +187,7 @@ class DNAAnnotationPipeline:
         progress("Synthesizing annotations...", 95)
         result_df = self.synthesizer.synthesize(
             variants_df,
-            clinvar_data,
+            clinvar_df,
             snpedia_data,
             frequency_data
         )
@@ -207,6 +197,26 @@ class DNAAnnotationPipeline:
         
         return result_df
     
+    def _annotate_clinvar(
+        self,
+        variants_df: pd.DataFrame,
+        progress: Callable[[str, int], None]
+    ) -> pd.DataFrame:
+        """
+        Annotate variants with ClinVar in chunks, reporting progress between them.
+        
+        Returns:
+            variants_df with the ClinVar annotation columns added
+        """
+        total = len(variants_df)
+        chunks = []
+        for start in range(0, total, CLINVAR_PROGRESS_CHUNK):
+            chunks.append(self.clinvar.annotate_dataframe(variants_df.iloc[start:start + CLINVAR_PROGRESS_CHUNK]))
+            done = min(start + CLINVAR_PROGRESS_CHUNK, total)
+            if done < total:
+                progress(f"Annotated {done}/{total} variants with ClinVar...", 30 + int(20 * done / total))
+        return pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+    
     def process_folder(self, folder_path: Path, pattern: str = "*.txt") -> pd.DataFrame:
         """
         Process all matching files in a folder.
@@ -233,18 +243,11 @@ class DNAAnnotationPipeline:
         self.clinvar.ensure_data_downloaded()
         self.clinvar.load_cache()
         
-        clinvar_data = {}
-        for rsid in variants_df['rsid']:
-            clinvar_data[rsid] = self.clinvar.annotate(rsid)
+        clinvar_df = self._annotate_clinvar(variants_df, lambda msg, pct: logger.info(msg))
         
-        logger.info(f"Annotated {len(clinvar_data)} variants with ClinVar")
+        logger.info(f"Annotated {len(clinvar_df)} variants with ClinVar")
         
         # Layer 2: Candidate selection
-        clinvar_df = pd.DataFrame([
-            {'rsid': rsid, 'clinical_significance': data['clinical_significance']}
-            for rsid, data in clinvar_data.items()
-        ])
-        
         candidates = self.selector.select_from_annotations(clinvar_df)
         logger.info(f"Selected {len(candidates)} candidate variants")
         
@@ -256,10 +259,8 @@ class DNAAnnotationPipeline:
             max_snpedia_variants = 1000
             if len(candidates) > max_snpedia_variants:
                 logger.warning(f"Limiting SNPedia expansion to {max_snpedia_variants} variants")
-                candidates_with_clinvar = [
-                    rsid for rsid in candidates 
-                    if clinvar_data.get(rsid, {}).get('clinical_significance')
-                ]
+                with_significance = set(clinvar_df.loc[clinvar_df['clinical_significance'] != '', 'rsid'])
+                candidates_with_clinvar = [rsid for rsid in candidates if rsid in with_significance]
                 if candidates_with_clinvar:
                     candidates_to_expand = candidates_with_clinvar[:max_snpedia_variants]
                 else:
@@ -277,14 +278,13 @@ class DNAAnnotationPipeline:
         
         # Layer 4: Population frequency lookup
         if 'chrom' in variants_df.columns:
-            unique_chroms = variants_df['chrom'].dropna().unique()
-            for chrom in unique_chroms:
-                chrom_str = str(chrom).strip()
-                if chrom_str and chrom_str not in ['', 'Unknown', 'MT']:
-                    try:
-                        self.freq_db.download_and_index_chromosome(chrom_str, force=False)
-                    except Exception as e:
-                        logger.warning(f"Failed to ensure chromosome {chrom_str} data: {e}")
+            chroms = [str(chrom).strip() for chrom in variants_df['chrom'].dropna().unique()]
+            try:
+                self.freq_db.download_and_index_chromosomes(
+                    [chrom for chrom in chroms if chrom not in ['', 'Unknown', 'MT']], force=False
+                )
+            except Exception as e:
+                logger.warning(f"Failed to ensure population frequency data: {e}")
         
         frequency_data = self.freq_db.get_frequencies_batch(variants_df['rsid'].tolist())
         logger.info(f"Retrieved frequencies for {sum(1 for v in frequency_data.values() if v is not None)} variants")
@@ -292,7 +292,7 @@ class DNAAnnotationPipeline:
         # Layer 5: Synthesis
         result_df = self.synthesizer.synthesize(
             variants_df,
-            clinvar_data,
+            clinvar_df,
             snpedia_data,
             frequency_data
         )
@@ -12,9 +12,12 @@ setup(
     install_requires=[
         "pandas>=2.0.0",
         "numpy>=1.24.0",
+        "pyarrow>=14.0.0",
         "aiohttp>=3.9.0",
+        "Brotli>=1.1.0",
         "aiofiles>=23.2.0",
-        "beautifulsoup4>=4.12.0",
+        "selectolax>=0.3.17",
+        "orjson>=3.9.0",
         "lxml>=4.9.0",
         "PyQt6>=6.6.0",
         "pydantic>=2.0.0",
@@ -114,6 +114,26 @@ rs456	2	67890	GT"""
         os.unlink(temp_path)
 
 
+
+def test_normalized_cache_reuse():
+    """Normalized output should be cached and reused for an unchanged file."""
+    content = """rsid	chromosome	position	genotype
+rs123	1	12345	aa
+rs456	2	67890	GT"""
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        temp_path = Path(tmp) / "sample.txt"
+        temp_path.write_text(content)
+        normalizer = InputNormalizer(cache_dir=Path(tmp) / "normalized")
+        
+        first = normalizer.normalize_file(temp_path)
+        assert len(list((Path(tmp) / "normalized").glob("*.parquet"))) == 1
+        
+        second = normalizer.normalize_file(temp_path)
+        assert second.equals(first)
+        assert second['genotype'].iloc[0] == 'AA'
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
 
@@ -0,0 +1,114 @@
+"""
+Tests for Layer 1: ClinVar Annotation
+"""
+
+import gzip
+import pytest
+import pandas as pd
+from pathlib import Path
+import tempfile
+
+from layers.layer1_clinvar import ClinVarAnnotator
+
+
+CLINVAR_HEADER = (
+    "#AlleleID\tType\tName\tClinicalSignificance\tRS# (dbSNP)\tRCVaccession\tPhenotypeList"
+)
+
+
+def _write_variant_summary(path: Path, rows: list) -> None:
+    """Write a minimal gzipped variant_summary.txt."""
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        f.write(CLINVAR_HEADER + "\n")
+        for row in rows:
+            f.write("\t".join(row) + "\n")
+
+
+def _build_annotator(tmp_dir: Path, rows: list) -> ClinVarAnnotator:
+    gz_path = tmp_dir / "variant_summary.txt.gz"
+    _write_variant_summary(gz_path, rows)
+    annotator = ClinVarAnnotator(cache_file=tmp_dir / "clinvar_cache.arrow")
+    annotator._parse_and_cache(gz_path)
+    annotator.load_cache()
+    return annotator
+
+
+def test_cache_roundtrip():
+    """Parsed annotations should be retrievable from the cache by RSID."""
+    with tempfile.TemporaryDirectory() as tmp:
+        annotator = _build_annotator(Path(tmp), [
+            ["1", "snv", "a", "Pathogenic", "123", "RCV1", "Disease A"],
+            ["2", "snv", "b", "Benign", "456", "RCV2", "Disease B"],
+        ])
+        
+        result = annotator.annotate("rs123")
+        assert result == {
+            "clinical_significance": "Pathogenic",
+            "phenotype_list": "Disease A",
+            "rcv_accession": "RCV1"
+        }
+        assert annotator.annotate("RS456")["clinical_significance"] == "Benign"
+
+
+def test_missing_rsid_returns_empty_strings():
+    """Unknown RSIDs must return empty strings, not None."""
+    with tempfile.TemporaryDirectory() as tmp:
+        annotator = _build_annotator(Path(tmp), [
+            ["1", "snv", "a", "Pathogenic", "123", "RCV1", "Disease A"],
+        ])
+        
+        for rsid in ["rs999", "not_an_rsid"]:
+            result = annotator.annotate(rsid)
+            assert result == {
+                "clinical_significance": "",
+                "phenotype_list": "",
+                "rcv_accession": ""
+            }
+
+
+def test_first_non_empty_significance_wins():
+    """Duplicate RSIDs keep the first entry with a clinical significance."""
+    with tempfile.TemporaryDirectory() as tmp:
+        annotator = _build_annotator(Path(tmp), [
+            ["1", "snv", "a", "", "123", "RCV1", "Disease A"],
+            ["2", "snv", "b", "Pathogenic", "123", "RCV2", "Disease B"],
+            ["3", "snv", "c", "Benign", "123", "RCV3", "Disease C"],
+        ])
+        
+        result = annotator.annotate("rs123")
+        assert result["clinical_significance"] == "Pathogenic"
+        assert result["rcv_accession"] == "RCV2"
+
+
+def test_annotate_dataframe_matches_annotate():
+    """Vectorized annotation should agree with scalar lookups."""
+    with tempfile.TemporaryDirectory() as tmp:
+        annotator = _build_annotator(Path(tmp), [
+            ["1", "snv", "a", "Pathogenic", "123", "RCV1", "Disease A"],
+            ["2", "snv", "b", "Benign", "456", "RCV2", "Disease B"],
+        ])
+        
+        variants = pd.DataFrame({'rsid': ['rs123', 'rs789', 'RS456'], 'genotype': ['AA', 'GT', 'CC']})
+        result = annotator.annotate_dataframe(variants)
+        
+        assert list(result['rsid']) == ['rs123', 'rs789', 'RS456']
+        assert list(result['genotype']) == ['AA', 'GT', 'CC']
+        for _, row in result.iterrows():
+            expected = annotator.annotate(row['rsid'])
+            for field, value in expected.items():
+                assert row[field] == value
+        
+        batch = annotator.annotate_batch(['rs123', 'rs789'])
+        assert batch['rs123']['phenotype_list'] == "Disease A"
+        assert batch['rs789']['clinical_significance'] == ""
+
+
+def test_missing_cache_file():
+    """Missing cache should not crash lookups."""
+    with tempfile.TemporaryDirectory() as tmp:
+        annotator = ClinVarAnnotator(cache_file=Path(tmp) / "missing.arrow")
+        assert annotator.annotate("rs123")["clinical_significance"] == ""
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,88 @@
+"""
+Tests for Layer 2: Candidate Selection
+"""
+
+import pytest
+import pandas as pd
+
+from layers.layer2_selection import CandidateSelector
+
+
+SIGNIFICANCES = [
+    'Pathogenic',
+    ' Likely benign ',
+    'BENIGN',
+    'Uncertain significance',
+    'Pathogenic/Likely benign',
+    'not provided',
+    'risk factor',
+    'Something else',
+    '',
+    None,
+]
+
+
+def _clean(value) -> str:
+    """Significance as the rules see it (lowercased, stripped, '' for missing)."""
+    return '' if pd.isna(value) else value.lower().strip()
+
+
+def _annotations(repeats: int = 1) -> pd.DataFrame:
+    significance = SIGNIFICANCES * repeats
+    return pd.DataFrame({
+        'rsid': [f"rs{i}" for i in range(len(significance))],
+        'clinical_significance': significance,
+    })
+
+
+@pytest.mark.parametrize("exclude_benign,exclude_uncertain", [(True, False), (True, True), (False, True)])
+def test_factorized_rules_match_per_row_rules(exclude_benign, exclude_uncertain):
+    """Classifying each distinct value once gives the same verdicts as classifying every row."""
+    selector = CandidateSelector(exclude_benign=exclude_benign, exclude_uncertain=exclude_uncertain)
+    annotations = _annotations(repeats=50)
+
+    keep, reasons = selector._apply_rules(annotations['rsid'], annotations['clinical_significance'])
+
+    expected = [
+        selector._verdict(_clean(value)) == 0
+        for value in annotations['clinical_significance']
+    ]
+    assert keep.tolist() == expected
+    assert set(reasons) == set(annotations.loc[~keep, 'rsid'])
+
+
+def test_each_distinct_significance_classified_once(monkeypatch):
+    """Repeated significance values are not re-classified per row."""
+    selector = CandidateSelector()
+    seen = []
+    verdict = selector._verdict
+    monkeypatch.setattr(selector, '_verdict', lambda value: seen.append(value) or verdict(value))
+
+    annotations = _annotations(repeats=100)
+    selector._apply_rules(annotations['rsid'], annotations['clinical_significance'])
+
+    assert len(seen) == len(set(seen)) == len({_clean(v) for v in SIGNIFICANCES})
+
+
+def test_select_from_annotations_rules():
+    """Benign is dropped, significant and unannotated are kept, whitelist overrides."""
+    annotations = _annotations()
+    selected = CandidateSelector().select_from_annotations(annotations)
+    excluded = {f"rs{SIGNIFICANCES.index(value)}" for value in (' Likely benign ', 'BENIGN')}
+
+    assert set(selected) == set(annotations['rsid']) - excluded
+    assert selected == sorted(selected)
+
+    whitelisted = CandidateSelector(whitelist={'rs2'}).select_from_annotations(annotations)
+    assert 'rs2' in whitelisted and 'rs1' not in whitelisted
+
+
+def test_select_candidates_keeps_unannotated_variants():
+    """Variants missing from the annotations are kept (never silently dropped)."""
+    variants = pd.DataFrame({'rsid': ['rs1', 'rs2', 'rs3', 'rs3']})
+    annotations = pd.DataFrame({
+        'rsid': ['rs1', 'rs2', 'rs2'],
+        'clinical_significance': ['Benign', 'Pathogenic', 'Benign'],
+    })
+
+    assert CandidateSelector().select_candidates(variants, annotations) == ['rs2', 'rs3']
@@ -0,0 +1,94 @@
+"""
+Tests for Layer 3: SNPedia Expansion (SQLite cache and legacy JSON migration)
+"""
+
+import sqlite3
+import pytest
+from pathlib import Path
+import tempfile
+
+import orjson
+
+pytest.importorskip("aiohttp")
+pytest.importorskip("selectolax")
+
+from layers.layer3_snpedia import SNPediaExpander
+
+
+def _entry(rsid: str) -> dict:
+    return {
+        "extract": f"About {rsid}",
+        "categories": ["Cat1"],
+        "url": f"https://www.snpedia.com/index.php/{rsid}",
+        "source": "live",
+    }
+
+
+def _build_expander(tmp_dir: Path) -> SNPediaExpander:
+    return SNPediaExpander(cache_dir=tmp_dir / "snpedia", checkpoint_file=tmp_dir / "checkpoint.json")
+
+
+def _write_legacy_file(expander: SNPediaExpander, rsid: str) -> Path:
+    """Write a per-RSID JSON cache file as older versions did."""
+    path = expander.get_cache_file(rsid)
+    path.write_bytes(orjson.dumps(_entry(rsid)))
+    return path
+
+
+def _db_rows(expander: SNPediaExpander) -> dict:
+    with sqlite3.connect(expander.cache_db) as conn:
+        return {
+            rsid: orjson.loads(payload)
+            for rsid, payload in conn.execute("SELECT rsid, payload FROM snpedia_cache")
+        }
+
+
+def test_cache_roundtrip():
+    """Saved entries come back by RSID, case-insensitively."""
+    with tempfile.TemporaryDirectory() as tmp:
+        expander = _build_expander(Path(tmp))
+        expander.save_cache_batch({"rs1": _entry("rs1"), "rs2": _entry("rs2")})
+
+        assert expander.get_cached("RS1") == _entry("rs1")
+        assert expander.get_cached("rs3") is None
+        assert expander.get_cached_batch(["rs2", "Rs1", "rs3"]) == {
+            "rs2": _entry("rs2"), "Rs1": _entry("rs1")
+        }
+
+
+def test_legacy_file_migrated_on_single_lookup():
+    """A legacy JSON file is imported into SQLite and removed on first access."""
+    with tempfile.TemporaryDirectory() as tmp:
+        expander = _build_expander(Path(tmp))
+        legacy = _write_legacy_file(expander, "rs10")
+
+        assert expander.get_cached("rs10") == _entry("rs10")
+        assert not legacy.exists()
+        assert _db_rows(expander) == {"RS10": _entry("rs10")}
+        assert expander.get_cached("rs10") == _entry("rs10")
+
+
+def test_legacy_files_migrated_on_batch_lookup():
+    """Batch lookups merge SQLite rows with migrated legacy files."""
+    with tempfile.TemporaryDirectory() as tmp:
+        expander = _build_expander(Path(tmp))
+        expander.save_cache_batch({"rs1": _entry("rs1")})
+        legacy = [_write_legacy_file(expander, rsid) for rsid in ("rs2", "rs3")]
+
+        assert expander.get_cached_batch(["rs1", "rs2", "rs3", "rs4"]) == {
+            "rs1": _entry("rs1"), "rs2": _entry("rs2"), "rs3": _entry("rs3")
+        }
+        assert not any(path.exists() for path in legacy)
+        assert set(_db_rows(expander)) == {"RS1", "RS2", "RS3"}
+
+
+def test_unreadable_legacy_file_is_left_alone():
+    """A corrupt legacy file is reported as a miss and not deleted."""
+    with tempfile.TemporaryDirectory() as tmp:
+        expander = _build_expander(Path(tmp))
+        legacy = expander.get_cache_file("rs5")
+        legacy.write_bytes(b"{not json")
+
+        assert expander.get_cached("rs5") is None
+        assert legacy.exists()
+        assert _db_rows(expander) == {}
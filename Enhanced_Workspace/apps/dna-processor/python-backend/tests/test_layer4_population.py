@@ -0,0 +1,133 @@
+"""
+Tests for Layer 4: Population Context (1000 Genomes frequency DB)
+"""
+
+import gzip
+import pytest
+from pathlib import Path
+import tempfile
+
+from layers.layer4_population import PopulationFrequencyDB
+from layers.layer4_population import frequency_db
+
+
+def _write_vcf(path: Path, chrom: str, rows: list) -> None:
+    """Write a minimal gzipped VCF; rows are (rsid, ref, alt, info)."""
+    with gzip.open(path, 'wt') as f:
+        f.write("##fileformat=VCFv4.1\n")
+        f.write('##INFO=<ID=AF,Number=A,Type=Float,Description="Allele Frequency">\n')
+        f.write("#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO\n")
+        for pos, (rsid, ref, alt, info) in enumerate(rows, start=1):
+            f.write(f"{chrom}\t{pos}\t{rsid}\t{ref}\t{alt}\t100\tPASS\t{info}\n")
+
+
+def _af_rows(start: int, count: int) -> list:
+    """count VCF rows rs<start>..., each with AF = (i % 100) / 100."""
+    return [(f"rs{i}", "A", "G", f"AC=1;AF={(i % 100) / 100};AN=2") for i in range(start, start + count)]
+
+
+def _build_db(tmp_dir: Path, monkeypatch, vcfs: dict) -> PopulationFrequencyDB:
+    """DB whose download URL points at local VCFs; vcfs maps chromosome → rows."""
+    for chrom, rows in vcfs.items():
+        _write_vcf(tmp_dir / f"chr{chrom}.vcf.gz", chrom, rows)
+    monkeypatch.setattr(frequency_db, "KG1_VCF_URL", "file://" + str(tmp_dir / "chr{chrom}.vcf.gz"))
+    return PopulationFrequencyDB(tmp_dir / "kg.db")
+
+
+def test_index_and_batch_lookup(monkeypatch):
+    """Indexed AFs come back by RSID; AF is derived from AC/AN and never guessed."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = _build_db(Path(tmp), monkeypatch, {"1": [
+            ("rs1", "A", "G", "AF=0.25;EAS_AF=0.9"),
+            ("rs2", "C", "T", "AC=3;AN=4"),
+            ("rs3;rs33", "G", "A,C", "EAS_AF=0.5"),
+            (".", "T", "C", "AF=0.1"),
+        ]})
+
+        assert db.download_and_index_chromosomes(["1"]) == {"1": True}
+
+        assert db.get_frequencies_batch(["rs1", "rs2", "rs3", "rs4"]) == {
+            "rs1": 0.25, "rs2": 0.75, "rs3": None, "rs4": None
+        }
+        assert db.get_frequency("rs1") == 0.25
+        assert db.get_frequency("rs4") is None
+
+
+def test_bloom_filter_has_no_false_negatives(monkeypatch):
+    """Every indexed RSID passes the filter."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = _build_db(Path(tmp), monkeypatch, {"1": _af_rows(1, 5000)})
+        db.download_and_index_chromosomes(["1"])
+
+        present = [f"rs{i}" for i in range(1, 5001)]
+        assert db._might_exist(present).all()
+        # Most absent RSIDs are rejected (~1% false positives by design)
+        assert db._might_exist([f"rs{i}" for i in range(10001, 15001)]).sum() < 250
+
+        # A reloaded filter (from the persisted file) gives the same answers
+        reopened = PopulationFrequencyDB(db.db_file)
+        assert reopened._might_exist(present).all()
+
+
+def test_parquet_and_sqlite_agree(monkeypatch):
+    """The snapshot scan and the SQLite join return the same frequencies."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = _build_db(Path(tmp), monkeypatch, {"1": _af_rows(1, 3000)})
+        db.download_and_index_chromosomes(["1"])
+        query = [f"rs{i}" for i in range(0, 6000, 7)]
+
+        from_parquet = dict.fromkeys(query)
+        assert db._query_frequencies_parquet(query, from_parquet)
+        from_sqlite = dict.fromkeys(query)
+        db._query_frequencies_sqlite(query, from_sqlite)
+
+        assert from_parquet == from_sqlite
+        assert db.get_frequencies_batch(query) == from_sqlite
+
+
+def test_stale_snapshot_falls_back_to_sqlite(monkeypatch):
+    """Rows ingested after the export are still found; the next export catches up."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = _build_db(Path(tmp), monkeypatch, {"1": _af_rows(1, 100), "2": _af_rows(1001, 100)})
+        db.download_and_index_chromosomes(["1"])
+        assert db._snapshot_signature() == db._table_signature()
+
+        # A single-chromosome ingest leaves the snapshot stale
+        assert db.download_and_index_chromosome("2")
+        assert db._snapshot_signature() != db._table_signature()
+        assert not db._query_frequencies_parquet(["rs1001"], {})
+        assert db.get_frequencies_batch(["rs1", "rs1001"]) == {"rs1": 0.01, "rs1001": 0.01}
+
+        db.download_and_index_chromosomes([])
+        assert db._snapshot_signature() == db._table_signature()
+        results = {}
+        assert db._query_frequencies_parquet(["rs1", "rs1001"], results)
+        assert results == {"rs1": 0.01, "rs1001": 0.01}
+
+
+def test_indexed_chromosome_is_not_downloaded_again(monkeypatch):
+    """Chromosomes recorded in indexed_chromosomes are skipped unless forced."""
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        db = _build_db(tmp_dir, monkeypatch, {"1": _af_rows(1, 10)})
+        db.download_and_index_chromosomes(["1"])
+        assert db.is_chromosome_indexed("1")
+        assert not db.is_chromosome_indexed("2")
+
+        # With the source gone, only a skipped download can succeed
+        (tmp_dir / "chr1.vcf.gz").unlink()
+        assert db.download_and_index_chromosome("1")
+        assert not db.download_and_index_chromosome("1", force=True)
+        assert db.get_frequency("rs5") == 0.05
+
+
+def test_lookup_ignores_rsid_case(monkeypatch):
+    """Upper-case RSIDs find the lowercase rows and are keyed as given."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = _build_db(Path(tmp), monkeypatch, {"1": _af_rows(1, 10)})
+        db.download_and_index_chromosomes(["1"])
+
+        assert db.get_frequency("RS5") == 0.05
+        assert db.get_frequencies_batch(["RS5", "rs5", "Rs6", "RS99"]) == {
+            "RS5": 0.05, "rs5": 0.05, "Rs6": 0.06, "RS99": None
+        }
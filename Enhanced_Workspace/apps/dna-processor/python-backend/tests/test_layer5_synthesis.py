@@ -0,0 +1,95 @@
+"""
+Tests for Layer 5: Annotation Synthesis
+"""
+
+import pytest
+import pandas as pd
+from pathlib import Path
+import tempfile
+
+from layers.layer5_synthesis import AnnotationSynthesizer
+
+
+def _variants() -> pd.DataFrame:
+    return pd.DataFrame({
+        'rsid': ['rs1', 'rs2', 'rs3'],
+        'chrom': ['1', '2', 'X'],
+        'pos': [100, 200, 300],
+        'genotype': ['AA', 'AG', 'GG'],
+    })
+
+
+def _synthesized() -> pd.DataFrame:
+    return AnnotationSynthesizer().synthesize(
+        _variants(),
+        {
+            'rs1': {'clinical_significance': 'Pathogenic', 'phenotype_list': 'Disease A, type 1',
+                    'rcv_accession': 'RCV1'},
+            'rs3': {'clinical_significance': 'Benign', 'phenotype_list': 'Trait "B"',
+                    'rcv_accession': 'RCV3'},
+        },
+        {'rs2': {'extract': 'Line one\nline two', 'categories': ['Cat1', 'Cat2'], 'url': 'https://x/rs2'}},
+        {'rs1': 0.25, 'rs3': None}
+    )
+
+
+def test_csv_export_roundtrip():
+    """CSV export reads back to the same table; numeric fields are written unquoted."""
+    synthesizer = AnnotationSynthesizer()
+    result = _synthesized()
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / "out.csv"
+        synthesizer.export_to_csv(result, str(csv_path))
+
+        rs1_line = csv_path.read_text().splitlines()[1]
+        assert ',100,' in rs1_line
+        assert rs1_line.endswith(',0.25')
+
+        loaded = pd.read_csv(csv_path, dtype=str, keep_default_na=False)
+        expected = result.astype(object).fillna('').astype(str)
+        pd.testing.assert_frame_equal(loaded, expected, check_dtype=False)
+
+
+def test_sources_join_onto_variants_by_rsid():
+    """Each source lands on its rsid's row, whatever its order; misses stay empty."""
+    variants = _variants()
+    original = variants.copy()
+    result = AnnotationSynthesizer().synthesize(
+        variants,
+        {
+            'rs3': {'clinical_significance': 'Benign', 'phenotype_list': 'B', 'rcv_accession': 'RCV3'},
+            'rs9': {'clinical_significance': 'Pathogenic', 'phenotype_list': 'Z', 'rcv_accession': 'RCV9'},
+            'rs1': {'clinical_significance': 'Pathogenic'},
+        },
+        {'rs2': {'extract': 'Text', 'categories': ['Cat1', 'Cat2'], 'url': 'https://x/rs2'}},
+        {'rs3': 0.5, 'rs1': None}
+    )
+
+    assert list(result.columns) == AnnotationSynthesizer.OUTPUT_COLUMNS
+    assert result['rsid'].tolist() == ['rs1', 'rs2', 'rs3']
+    assert result['clinical_significance'].tolist() == ['Pathogenic', '', 'Benign']
+    assert result['phenotypes'].tolist() == ['', '', 'B']
+    assert result['snpedia_categories'].tolist() == ['', 'Cat1, Cat2', '']
+    assert result['population_frequency'].isna().tolist() == [True, True, False]
+    assert result['population_frequency'].iloc[2] == 0.5
+    pd.testing.assert_frame_equal(variants, original)
+
+
+def test_clinvar_frame_and_dict_synthesize_alike():
+    """An annotate_dataframe-style frame gives the same output as the rsid dict."""
+    variants = _variants()
+    clinvar = {
+        'rs1': {'clinical_significance': 'Pathogenic', 'phenotype_list': 'A', 'rcv_accession': 'RCV1'},
+        'rs2': {'clinical_significance': '', 'phenotype_list': '', 'rcv_accession': ''},
+        'rs3': {'clinical_significance': 'Benign', 'phenotype_list': 'B', 'rcv_accession': 'RCV3'},
+    }
+    clinvar_df = variants.assign(**{
+        field: [clinvar[rsid][field] for rsid in variants['rsid']]
+        for field in ('clinical_significance', 'phenotype_list', 'rcv_accession')
+    })
+    synthesizer = AnnotationSynthesizer()
+
+    pd.testing.assert_frame_equal(
+        synthesizer.synthesize(variants, clinvar_df, {}, {}),
+        synthesizer.synthesize(variants, clinvar, {}, {})
+    )
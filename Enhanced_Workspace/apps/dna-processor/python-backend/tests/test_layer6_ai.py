@@ -0,0 +1,158 @@
+"""
+Tests for Layer 6: Interpretive AI (streaming summaries and summary cache)
+"""
+
+import json
+import pytest
+import pandas as pd
+from pathlib import Path
+import tempfile
+
+from layers.layer6_ai import AIInterpreter, AIProvider
+from layers.layer6_ai.providers import _iter_json_object_items
+
+
+STREAMED_OBJECT = (
+    '{\n'
+    '  "rs1": "Benign \\"per\\" ClinVar, see \\\\notes\\u00e9",\n'
+    '  "rs2" : 12,\n'
+    '  "rs3": -0.5e-3,\n'
+    '  "rs4": {"nested": [1, {"deep": "x,}"}]},\n'
+    '  "rs5": true,\n'
+    '  "rs6": null,\n'
+    '  "r\\"s7": "ends with a number 1."\n'
+    '}'
+)
+
+
+def _fragments(text: str, size: int) -> list:
+    """Split text into fragments of `size` characters."""
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def _expected_items(text: str) -> list:
+    """Pairs as the non-streaming providers return them (values stringified)."""
+    return [(str(k), str(v)) for k, v in json.loads(text).items()]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, len(STREAMED_OBJECT)])
+def test_stream_parser_matches_full_parse(size):
+    """Any fragmentation should yield the same pairs, in order, as parsing the whole text."""
+    items = list(_iter_json_object_items(_fragments(STREAMED_OBJECT, size)))
+    assert items == _expected_items(STREAMED_OBJECT)
+
+
+def test_stream_parser_waits_for_number_separator():
+    """A number at the end of a fragment is only yielded once its separator arrives."""
+    parser = _iter_json_object_items(iter(['{"rs1": 1', '2', '.5', '}']))
+    assert list(parser) == [("rs1", "12.5")]
+
+
+def test_stream_parser_yields_pairs_before_stream_ends():
+    """Each pair is yielded as soon as it is complete, not after the whole object."""
+    seen = []
+
+    def fragments():
+        yield '{"rs1": "first", '
+        seen.append("second fragment requested")
+        yield '"rs2": "second"}'
+
+    parser = _iter_json_object_items(fragments())
+    assert next(parser) == ("rs1", "first")
+    assert seen == []
+    assert list(parser) == [("rs2", "second")]
+
+
+def test_stream_parser_truncated_stream():
+    """A pair cut off by the end of the stream is not yielded."""
+    items = list(_iter_json_object_items(_fragments('{"rs1": "done", "rs2": "trunc', 4)))
+    assert items == [("rs1", "done")]
+
+
+def test_stream_parser_rejects_non_object():
+    """The streamed response must be a JSON object."""
+    with pytest.raises(ValueError):
+        list(_iter_json_object_items(['["rs1"]']))
+
+
+class _StubProvider(AIProvider):
+    """Provider returning a fixed summary per rsid, recording each request."""
+
+    def __init__(self, fail_after: int = None):
+        self.requests = []
+        self.fail_after = fail_after
+
+    def generate_summary(self, variants):
+        return {v['rsid']: f"summary of {v['rsid']}" for v in variants}
+
+    def generate_summary_stream(self, variants):
+        self.requests.append([v['rsid'] for v in variants])
+        for i, variant in enumerate(variants):
+            if self.fail_after is not None and i >= self.fail_after:
+                raise RuntimeError("stream dropped")
+            yield variant['rsid'], f"summary of {variant['rsid']}"
+
+    def is_available(self):
+        return True
+
+
+def _build_interpreter(tmp_dir: Path, provider: AIProvider) -> AIInterpreter:
+    interpreter = AIInterpreter(provider_name="local", cache_file=tmp_dir / "summaries.db")
+    interpreter.provider = provider
+    interpreter.enabled = True
+    return interpreter
+
+
+def _variants(rsids: list) -> pd.DataFrame:
+    return pd.DataFrame({
+        'rsid': rsids,
+        'clinical_significance': ['Pathogenic'] * len(rsids),
+        'phenotypes': ['Disease A'] * len(rsids),
+    })
+
+
+def test_iter_summaries_yields_cache_hits_first():
+    """Cached summaries come first; only misses go to the provider and get cached."""
+    with tempfile.TemporaryDirectory() as tmp:
+        provider = _StubProvider()
+        interpreter = _build_interpreter(Path(tmp), provider)
+
+        assert list(interpreter.iter_summaries(_variants(['rs2']))) == [("rs2", "summary of rs2")]
+
+        provider.requests.clear()
+        items = list(interpreter.iter_summaries(_variants(['rs1', 'rs2', 'rs3'])))
+
+        assert items[0] == ("rs2", "summary of rs2")
+        assert sorted(items[1:]) == [("rs1", "summary of rs1"), ("rs3", "summary of rs3")]
+        assert provider.requests == [['rs1', 'rs3']]
+
+        keys = interpreter._summary_keys(_variants(['rs1', 'rs2', 'rs3']))
+        assert len(interpreter.summary_cache.get_many(keys.tolist())) == 3
+
+
+def test_iter_summaries_caches_only_streamed_subset_on_failure():
+    """A stream that fails part-way caches the pairs it delivered and nothing else."""
+    with tempfile.TemporaryDirectory() as tmp:
+        interpreter = _build_interpreter(Path(tmp), _StubProvider(fail_after=1))
+        variants = _variants(['rs1', 'rs2', 'rs3'])
+
+        assert list(interpreter.iter_summaries(variants)) == [("rs1", "summary of rs1")]
+
+        keys = interpreter._summary_keys(variants)
+        cached = interpreter.summary_cache.get_many(keys.tolist())
+        assert list(cached.values()) == ["summary of rs1"]
+
+
+def test_iter_summaries_skips_unannotated_variants():
+    """Variants without annotations are never sent to the provider."""
+    with tempfile.TemporaryDirectory() as tmp:
+        provider = _StubProvider()
+        interpreter = _build_interpreter(Path(tmp), provider)
+        variants = pd.DataFrame({
+            'rsid': ['rs1', 'rs2'],
+            'clinical_significance': ['', 'Benign'],
+            'phenotypes': ['', ''],
+        })
+
+        assert list(interpreter.iter_summaries(variants)) == [("rs2", "summary of rs2")]
+        assert provider.requests == [['rs2']]